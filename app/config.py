@@ -8,14 +8,35 @@ class Settings(BaseSettings):
     APP_ENV: str = "development"
     DEBUG: bool = False
     SECRET_KEY: str = "your-secret-key-here"
+    # Base URL of the running app; scripts that write data call its /api/cache/invalidate
+    APP_URL: str = ""
 
     # NASA FIRMS API
     FIRMS_MAP_KEY: str = ""
+    # Pool of keys, optionally weighted ("key1:2,key2"); overrides FIRMS_MAP_KEY when set
+    FIRMS_MAP_KEYS: str = ""
+    # Per-key transactions allowed per rolling window, and how long an invalid key sits out
+    FIRMS_KEY_QUOTA: int = 5000
+    FIRMS_KEY_QUOTA_WINDOW_SECONDS: float = 600.0
+    FIRMS_KEY_INVALID_QUARANTINE_SECONDS: float = 3600.0
+    FIRMS_BASE_URL: str = "https://firms.modaps.eosdis.nasa.gov/api/area/csv"
+    # Comma-separated products from app/services/source_registry.py
+    FIRMS_SOURCES: str = "VIIRS_SNPP_NRT,VIIRS_NOAA20_NRT,VIIRS_NOAA21_NRT"
+    # Data-availability probe before area pulls; empty URL derives it from FIRMS_BASE_URL
+    # Off by default: dates only, so it can skip a stalled product but never a same-day repeat,
+    # and costs one MAP_KEY transaction per TTL. Worth it when an enabled source often has
+    # nothing in the window (LANDSAT_NRT, or a product outage).
+    FIRMS_AVAILABILITY_PROBE: bool = False
+    FIRMS_AVAILABILITY_URL: str = ""
+    FIRMS_AVAILABILITY_TTL_SECONDS: float = 300.0
     
     # LINE Messaging API
     LINE_CHANNEL_ACCESS_TOKEN: str = ""
     LINE_CHANNEL_SECRET: str = ""
     LINE_GROUP_ID: str = ""
+    LINE_API_BASE_URL: str = "https://api.line.me"
+    # HTTP timeout for one push; keep it under CHECK_DEADLINE_RESERVE_SECONDS
+    LINE_PUSH_TIMEOUT_SECONDS: float = 8.0
 
     # Database (Railway provides DATABASE_URL automatically for Postgres)
     DATABASE_URL: str = "sqlite+aiosqlite:///./firms_bot.db"
@@ -30,6 +51,35 @@ class Settings(BaseSettings):
     TIMEZONE: str = "Asia/Bangkok"
     CHECK_INTERVAL_PEAK: int = 10
     CHECK_INTERVAL_OFFPEAK: int = 30
+    # Learned arrival windows: dense checks inside them, sparse outside (minutes, divisors of 60)
+    ARRIVAL_MODEL_ENABLED: bool = True
+    ARRIVAL_LOOKBACK_DAYS: int = 30
+    ARRIVAL_MIN_PASSES: int = 5
+    CHECK_INTERVAL_DENSE: int = 5
+    CHECK_INTERVAL_SPARSE: int = 30
+
+    # Budget for one whole check; the last RESERVE seconds are kept for commit and notify
+    CHECK_DEADLINE_SECONDS: float = 50.0
+    CHECK_DEADLINE_RESERVE_SECONDS: float = 10.0
+
+    # Check ingest pipeline: inbox size and workers per stage
+    PIPELINE_QUEUE_SIZE: int = 2
+    # 0: one fetch worker per enabled source
+    PIPELINE_FETCH_WORKERS: int = 0
+    PIPELINE_PARSE_WORKERS: int = 1
+    PIPELINE_ENRICH_WORKERS: int = 1
+
+    # CPU-heavy work (CSV parsing) above this payload size runs in a process pool; 0 workers keeps it inline
+    OFFLOAD_WORKERS: int = 2
+    OFFLOAD_THRESHOLD_BYTES: int = 256 * 1024
+
+    # Recent detections kept in memory for dedup and the today view (Thai-local days)
+    HOT_WINDOW_DAYS: int = 3
+    HOT_WINDOW_RESYNC_MINUTES: int = 30
+
+    # Fire Event Clustering
+    FIRE_EVENT_DISTANCE_KM: float = 1.0
+    FIRE_EVENT_GAP_HOURS: int = 24
 
     # Notification Settings
     MIN_CONFIDENCE: str = "nominal"
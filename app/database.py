@@ -1,6 +1,13 @@
+import logging
+import time
+from sqlalchemy import inspect
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from .config import get_settings
+from .utils.metrics import DB_POOL_CHECKOUT_WAIT, DB_POOL_CHECKED_OUT
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
@@ -9,10 +16,27 @@ database_url = settings.DATABASE_URL
 if database_url and database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql+asyncpg://", 1)
 
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+engine_options = {}
+if ":memory:" not in database_url:
+    # In-memory SQLite keeps its single-connection StaticPool
+    engine_options["poolclass"] = TimedQueuePool
+
 engine = create_async_engine(
     database_url,
     echo=settings.DEBUG,
+    **engine_options
 )
+DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -23,6 +47,37 @@ AsyncSessionLocal = async_sessionmaker(
 class Base(DeclarativeBase):
     pass
 
+def sync_schema(conn):
+    """
+    Create missing tables, then add any nullable columns that were added to
+    the models after the table was first created (create_all never alters
+    existing tables). Missing indexes are created as well.
+    Run via: await conn.run_sync(sync_schema)
+    """
+    Base.metadata.create_all(conn)
+    
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        added = []
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {col_type}"
+            )
+            added.append(column.name)
+        if added:
+            logger.info(f"Added columns to {table.name}: {', '.join(added)}")
+        
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
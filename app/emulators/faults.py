@@ -0,0 +1,38 @@
+import asyncio
+import random
+from typing import Optional
+
+
+class FaultInjector:
+    """
+    Seeded latency and failure injection shared by the emulators.
+    The n-th request always gets the same delay/outcome for a given seed.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._rng = random.Random(f"{seed}:faults")
+        self.requests = 0
+        self.failures = 0
+
+    async def apply(self) -> bool:
+        """Sleep for the injected latency; True if this request should fail"""
+        self.requests += 1
+        delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        fail = self._rng.random() < self.failure_rate
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        if fail:
+            self.failures += 1
+        return fail
+
+    def stats(self, extra: Optional[dict] = None) -> dict:
+        return {"requests": self.requests, "injected_failures": self.failures, **(extra or {})}
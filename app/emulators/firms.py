@@ -0,0 +1,151 @@
+"""
+Local stand-in for the FIRMS area API.
+
+    GET /api/area/csv/{map_key}/{source}/{area}/{day_range}[/{date}]
+    GET /api/data_availability/csv/{map_key}/{sensor|ALL}
+
+Serves synthetic VIIRS CSV from SyntheticFireModel with the same URL
+layout and error bodies as the real service. Point the bot at it with
+FIRMS_BASE_URL=http://127.0.0.1:9001/api/area/csv
+"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Deque, Dict, Optional, Tuple
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from .faults import FaultInjector
+from ..utils.synthetic import SyntheticFireModel, VIIRS_OVERPASSES_UTC, rows_to_csv
+
+MAX_DAY_RANGE = 10
+QUOTA_WINDOW_SECONDS = 600
+
+
+@dataclass
+class FIRMSEmulatorConfig:
+    bbox: Tuple[float, float, float, float] = (98.0, 13.4, 100.0, 15.8)
+    fires_per_day: float = 40.0
+    seed: int = 0
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+    # NRT products appear some time after the overpass
+    publish_delay_minutes: int = 60
+    # Freeze the clock (naive UTC) for reproducible runs; None follows real time
+    now: Optional[datetime] = None
+    map_key: Optional[str] = None
+    # Further accepted keys, and transactions each key may make per 10 minutes
+    map_keys: Tuple[str, ...] = ()
+    key_quota: Optional[int] = None
+    # Cap rows per response (benchmarks use it to pin the check volume)
+    max_rows: Optional[int] = None
+    sources: Tuple[str, ...] = field(default_factory=lambda: tuple(VIIRS_OVERPASSES_UTC))
+
+
+def _parse_area(area: str, default: Tuple[float, float, float, float]):
+    if area == "world":
+        return default
+    west, south, east, north = (float(v) for v in area.split(","))
+    return west, south, east, north
+
+
+def create_app(config: Optional[FIRMSEmulatorConfig] = None) -> FastAPI:
+    config = config or FIRMSEmulatorConfig()
+    model = SyntheticFireModel(config.bbox, config.fires_per_day, config.seed)
+    faults = FaultInjector(config.latency_ms, config.jitter_ms, config.failure_rate, config.seed)
+    app = FastAPI(title="FIRMS emulator")
+    app.state.config = config
+    app.state.faults = faults
+    # With a frozen clock every response is fixed, so render each only once
+    responses: Dict[Tuple, str] = {}
+    valid_keys = {k for k in (config.map_key, *config.map_keys) if k}
+    key_calls: Dict[str, Deque[float]] = {}
+
+    def key_refusal(map_key: str) -> Optional[PlainTextResponse]:
+        if valid_keys and map_key not in valid_keys:
+            return PlainTextResponse("Invalid MAP_KEY.", status_code=200)
+        if config.key_quota is not None:
+            calls = key_calls.setdefault(map_key, deque())
+            now = time.monotonic()
+            while calls and calls[0] <= now - QUOTA_WINDOW_SECONDS:
+                calls.popleft()
+            if len(calls) >= config.key_quota:
+                return PlainTextResponse("Exceeding allowed transaction limit.", status_code=429)
+            calls.append(now)
+        return None
+
+    def utcnow() -> datetime:
+        return config.now or datetime.now(timezone.utc).replace(tzinfo=None)
+
+    async def area_csv(map_key: str, source: str, area: str, day_range: int, start: Optional[str] = None):
+        if await faults.apply():
+            return PlainTextResponse("Service temporarily unavailable", status_code=503)
+        refusal = key_refusal(map_key)
+        if refusal is not None:
+            return refusal
+        if source not in config.sources:
+            return PlainTextResponse(f"Invalid source: {source}", status_code=400)
+        if not 1 <= day_range <= MAX_DAY_RANGE:
+            return PlainTextResponse(f"Invalid day range. Expects [1..{MAX_DAY_RANGE}].", status_code=400)
+        try:
+            west, south, east, north = _parse_area(area, config.bbox)
+        except ValueError:
+            return PlainTextResponse("Invalid area coordinates.", status_code=400)
+
+        cache_key = (source, west, south, east, north, day_range, start)
+        if config.now is not None and cache_key in responses:
+            return PlainTextResponse(responses[cache_key], media_type="text/csv")
+
+        published_until = utcnow() - timedelta(minutes=config.publish_delay_minutes)
+        if start:
+            try:
+                first = date.fromisoformat(start)
+            except ValueError:
+                return PlainTextResponse("Invalid date. Expects YYYY-MM-DD.", status_code=400)
+        else:
+            first = published_until.date() - timedelta(days=day_range - 1)
+
+        rows = []
+        for offset in range(day_range):
+            rows.extend(model.detections(source, first + timedelta(days=offset), until=published_until))
+        rows = [
+            r for r in rows
+            if west <= float(r["longitude"]) <= east and south <= float(r["latitude"]) <= north
+        ]
+        if config.max_rows is not None:
+            rows = rows[:config.max_rows]
+        body = rows_to_csv(rows)
+        if config.now is not None:
+            responses[cache_key] = body
+        return PlainTextResponse(body, media_type="text/csv")
+
+    @app.get("/api/area/csv/{map_key}/{source}/{area}/{day_range}")
+    async def area_recent(map_key: str, source: str, area: str, day_range: int):
+        return await area_csv(map_key, source, area, day_range)
+
+    @app.get("/api/area/csv/{map_key}/{source}/{area}/{day_range}/{start}")
+    async def area_from_date(map_key: str, source: str, area: str, day_range: int, start: str):
+        return await area_csv(map_key, source, area, day_range, start)
+
+    @app.get("/api/data_availability/csv/{map_key}/{sensor}")
+    async def data_availability(map_key: str, sensor: str):
+        if await faults.apply():
+            return PlainTextResponse("Service temporarily unavailable", status_code=503)
+        refusal = key_refusal(map_key)
+        if refusal is not None:
+            return refusal
+        products = config.sources if sensor == "ALL" else (sensor,)
+        if any(p not in config.sources for p in products):
+            return PlainTextResponse(f"Invalid sensor: {sensor}", status_code=400)
+        # Dates only, like the real endpoint
+        latest = (utcnow() - timedelta(minutes=config.publish_delay_minutes)).date()
+        lines = ["data_id,min_date,max_date"]
+        lines += [f"{p},{latest - timedelta(days=60)},{latest}" for p in products]
+        return PlainTextResponse("\n".join(lines) + "\n", media_type="text/csv")
+
+    @app.get("/_emulator/stats")
+    async def stats():
+        return faults.stats({"now": utcnow().isoformat()})
+
+    return app
@@ -0,0 +1,117 @@
+"""
+Local stand-in for the LINE Messaging API push endpoint.
+
+    POST /v2/bot/message/push
+
+Records every accepted push for inspection and enforces a per-token
+rate limit (token bucket) the way LINE does, answering 429 when it is
+exceeded. Point the bot at it with LINE_API_BASE_URL=http://127.0.0.1:9002
+"""
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from .faults import FaultInjector
+
+MAX_MESSAGES_PER_PUSH = 5
+
+
+@dataclass
+class LINEEmulatorConfig:
+    # LINE's documented push limit is 2,000 requests/second per channel
+    rate_limit_per_second: float = 2000.0
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+    seed: int = 0
+    max_recorded: int = 10000
+
+
+class TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse({"message": message}, status_code=status_code)
+
+
+def create_app(config: Optional[LINEEmulatorConfig] = None) -> FastAPI:
+    config = config or LINEEmulatorConfig()
+    faults = FaultInjector(config.latency_ms, config.jitter_ms, config.failure_rate, config.seed)
+    buckets: Dict[str, TokenBucket] = {}
+    pushes: List[Dict[str, Any]] = []
+    counters = {"accepted": 0, "rate_limited": 0, "rejected": 0}
+
+    app = FastAPI(title="LINE Messaging API emulator")
+    app.state.config = config
+    app.state.pushes = pushes
+
+    @app.post("/v2/bot/message/push")
+    async def push(request: Request):
+        auth = request.headers.get("authorization", "")
+        if not auth.startswith("Bearer ") or not auth[7:].strip():
+            counters["rejected"] += 1
+            return _error(401, "Authentication failed. Confirm that the access token in the authorization header is valid.")
+
+        bucket = buckets.setdefault(auth, TokenBucket(config.rate_limit_per_second))
+        if not bucket.take():
+            counters["rate_limited"] += 1
+            return _error(429, "The API rate limit has been exceeded. Try again later.")
+
+        if await faults.apply():
+            return _error(500, "Internal server error")
+
+        try:
+            body = await request.json()
+        except ValueError:
+            counters["rejected"] += 1
+            return _error(400, "The request body has 1 error(s)")
+        messages = body.get("messages") or []
+        if not body.get("to") or not 1 <= len(messages) <= MAX_MESSAGES_PER_PUSH:
+            counters["rejected"] += 1
+            return _error(400, "The request body has 1 error(s)")
+
+        counters["accepted"] += 1
+        if len(pushes) < config.max_recorded:
+            pushes.append({
+                "received_at": time.time(),
+                "to": body["to"],
+                "retry_key": request.headers.get("x-line-retry-key"),
+                "messages": messages
+            })
+        sent = [{"id": str(10**17 + counters["accepted"] * 10 + i), "quoteToken": uuid.uuid4().hex} for i in range(len(messages))]
+        return JSONResponse(
+            {"sentMessages": sent},
+            headers={"x-line-request-id": str(uuid.uuid4())}
+        )
+
+    @app.get("/_emulator/pushes")
+    async def recorded_pushes(limit: int = 100):
+        return {"total": len(pushes), "pushes": pushes[-limit:]}
+
+    @app.delete("/_emulator/pushes")
+    async def reset_pushes():
+        pushes.clear()
+        for key in counters:
+            counters[key] = 0
+        return {"status": "cleared"}
+
+    @app.get("/_emulator/stats")
+    async def stats():
+        return faults.stats(counters)
+
+    return app
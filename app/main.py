@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from pathlib import Path
@@ -5,12 +6,16 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
-from .database import engine, Base, AsyncSessionLocal
-from .routers import health, dashboard, webhook
-from .services.notification_service import NotificationService
+from .database import engine, AsyncSessionLocal, sync_schema
+from .routers import health, dashboard, webhook, maps, analytics
 from .services.firms_service import FIRMSService
 from .services.line_service import LINEService
 from .services.scheduler_service import SchedulerService
+from .services.map_service import MapService
+from .services.stats_service import StatsService
+from .services.offload_service import process_offloader
+from .services.hot_window import hot_window
+from .utils.metrics import monitor_event_loop
 from .config import get_settings
 
 # Logging setup
@@ -29,27 +34,38 @@ async def lifespan(app: FastAPI):
     
     # 1. Database initialization
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(sync_schema)
     logger.info("Database initialized successfully.")
     
+    # Fill map grid cells for rows stored before the grid columns existed,
+    # and build the daily stats rollup if it is still empty
+    async with AsyncSessionLocal() as session:
+        await MapService(session).backfill_grid()
+        await StatsService(session).rebuild_if_empty()
+        # Recent detections for in-memory dedup and the today view
+        await hot_window.warm(session)
+    
     # 2. Services setup
     firms = FIRMSService()
     line = LINEService()
     
     # 3. Start Scheduler (Railway runs 24/7 so this works!)
     logger.info("Starting scheduler...")
-    async with AsyncSessionLocal() as session:
-        notif_service = NotificationService(firms, line, session)
-        app.state.scheduler = SchedulerService(notif_service)
-        app.state.scheduler.start()
+    app.state.scheduler = SchedulerService(AsyncSessionLocal, firms, line)
+    app.state.scheduler.start()
+    
+    app.state.loop_monitor = asyncio.create_task(monitor_event_loop())
+    await process_offloader.start()
     
     logger.info("Application startup complete.")
     yield
     
     # Shutdown logic
     logger.info("Cleaning up application...")
+    app.state.loop_monitor.cancel()
     if hasattr(app.state, "scheduler"):
         app.state.scheduler.shutdown()
+    process_offloader.shutdown()
     logger.info("Shutdown complete.")
 
 app = FastAPI(
@@ -74,6 +90,8 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 app.include_router(health.router)
 app.include_router(dashboard.router)
 app.include_router(webhook.router)
+app.include_router(maps.router)
+app.include_router(analytics.router)
 
 @app.get("/")
 async def root(request: Request):
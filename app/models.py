@@ -1,8 +1,17 @@
-from sqlalchemy import Column, Integer, Float, String, Boolean, Date, Time, DateTime, func, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, String, Boolean, Date, Time, DateTime, JSON, func, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from .database import Base
+from .utils.geo_utils import lonlat_to_grid
 import datetime
 
+def _grid_x_default(context):
+    params = context.get_current_parameters()
+    return lonlat_to_grid(params["longitude"], params["latitude"])[0]
+
+def _grid_y_default(context):
+    params = context.get_current_parameters()
+    return lonlat_to_grid(params["longitude"], params["latitude"])[1]
+
 class Hotspot(Base):
     __tablename__ = "hotspots"
 
@@ -27,6 +36,13 @@ class Hotspot(Base):
     district = Column(String)
     land_type = Column(String)
     
+    # Web-mercator cell at GRID_ZOOM, filled on insert (map tiles/clustering)
+    grid_x = Column(Integer, default=_grid_x_default)
+    grid_y = Column(Integer, default=_grid_y_default)
+    
+    # Fire event this detection was clustered into
+    fire_event_id = Column(Integer, index=True)
+    
     # Metadata
     notified = Column(Boolean, default=False)
     notified_at = Column(DateTime)
@@ -34,6 +50,85 @@ class Hotspot(Base):
 
     __table_args__ = (
         UniqueConstraint('latitude', 'longitude', 'acq_date', 'acq_time', 'satellite', name='_hotspot_uc'),
+        # Keyset pagination order for /api/hotspots
+        Index('ix_hotspots_acq_date_time_id', 'acq_date', 'acq_time', 'id'),
+        # Tile range scans and grid clustering
+        Index('ix_hotspots_grid', 'grid_x', 'grid_y'),
+    )
+
+class FireEvent(Base):
+    """A single fire: detections clustered across passes and satellites"""
+    __tablename__ = "fire_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Detection times (Thai local, same basis as Hotspot.acq_date/acq_time)
+    first_seen = Column(DateTime, nullable=False)
+    last_seen = Column(DateTime, nullable=False, index=True)
+    hotspot_count = Column(Integer, default=0)
+    max_frp = Column(Float, default=0.0)
+    satellites = Column(String)
+    
+    # Centroid and bounding box of member detections
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    min_latitude = Column(Float)
+    max_latitude = Column(Float)
+    min_longitude = Column(Float)
+    max_longitude = Column(Float)
+    area_km2 = Column(Float)
+    
+    province = Column(String)
+    district = Column(String)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class HotspotDailyStats(Base):
+    """Per-day rollup of hotspots, maintained on ingest (see StatsService)"""
+    __tablename__ = "hotspot_daily_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    acq_date = Column(Date, nullable=False)
+    satellite = Column(String, nullable=False)
+    # Empty string rather than NULL so the unique key always matches
+    province = Column(String, nullable=False, default="")
+    district = Column(String, nullable=False, default="")
+    hotspot_count = Column(Integer, nullable=False, default=0)
+    high_confidence_count = Column(Integer, nullable=False, default=0)
+    frp_sum = Column(Float, nullable=False, default=0.0)
+    frp_max = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('acq_date', 'satellite', 'province', 'district', name='_daily_stats_uc'),
+    )
+
+class HotspotHourlyStats(Base):
+    """Detections per day, satellite and hour of day (Thai time)"""
+    __tablename__ = "hotspot_hourly_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    acq_date = Column(Date, nullable=False)
+    satellite = Column(String, nullable=False)
+    hour = Column(Integer, nullable=False)
+    hotspot_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('acq_date', 'satellite', 'hour', name='_hourly_stats_uc'),
+    )
+
+class HotspotGridStats(Base):
+    """Detections per day and web-mercator cell at STATS_GRID_ZOOM (heat maps)"""
+    __tablename__ = "hotspot_grid_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    acq_date = Column(Date, nullable=False)
+    cell_x = Column(Integer, nullable=False)
+    cell_y = Column(Integer, nullable=False)
+    hotspot_count = Column(Integer, nullable=False, default=0)
+    frp_max = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        UniqueConstraint('acq_date', 'cell_x', 'cell_y', name='_grid_stats_uc'),
     )
 
 class Notification(Base):
@@ -48,6 +143,14 @@ class Notification(Base):
     error_message = Column(String)
     line_response = Column(String)
 
+class NotificationHotspot(Base):
+    """Hotspots covered by each notification (alert audit: which alert included which detection)"""
+    __tablename__ = "notification_hotspots"
+
+    notification_id = Column(Integer, primary_key=True)
+    # Primary key leads with notification_id; this index serves hotspot -> alerts lookups
+    hotspot_id = Column(Integer, primary_key=True, index=True)
+
 class CheckLog(Base):
     __tablename__ = "check_logs"
 
@@ -55,9 +158,12 @@ class CheckLog(Base):
     checked_at = Column(DateTime, server_default=func.now())
     hotspots_found = Column(Integer, default=0)
     new_hotspots = Column(Integer, default=0)
+    # Whole check_and_notify duration (fetch through notify)
     api_response_time_ms = Column(Integer)
     status = Column(String, default="success")
     error_message = Column(String)
+    # Per-stage spans: [{"stage": "fetch.VIIRS_SNPP_NRT", "ms": 812.3, "bytes": ...}, ...]
+    stage_timings = Column(JSON)
 
 class Setting(Base):
     __tablename__ = "settings"
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date, datetime, timedelta
+from ..database import get_db
+from ..services.analytics_service import AnalyticsService
+from ..services.cache_service import response_cache
+from ..utils.pagination import parse_bbox
+from .dashboard import THAI_TZ
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+# Seasons per /compare request
+MAX_COMPARE_YEARS = 20
+
+def _date_range(start_date: Optional[date], end_date: Optional[date], default_days: int = 365):
+    """Default to the last `default_days` days (Thai time)"""
+    today = datetime.now(THAI_TZ).date()
+    end_date = end_date or today
+    start_date = start_date or end_date - timedelta(days=default_days - 1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+    return start_date, end_date
+
+@router.get("/timeseries")
+async def get_timeseries(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    interval: str = "day",
+    satellite: Optional[str] = None,
+    province: Optional[str] = None,
+    district: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    if interval not in AnalyticsService.INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of {AnalyticsService.INTERVALS}")
+    start_date, end_date = _date_range(start_date, end_date)
+    
+    async def build():
+        return await AnalyticsService(db).timeseries(start_date, end_date, interval, satellite, province, district)
+    
+    return await response_cache.respond(request, build, key_suffix=f"#{start_date}:{end_date}")
+
+@router.get("/districts")
+async def get_district_ranking(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(20, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    start_date, end_date = _date_range(start_date, end_date)
+    
+    async def build():
+        return await AnalyticsService(db).district_ranking(start_date, end_date, limit)
+    
+    return await response_cache.respond(request, build, key_suffix=f"#{start_date}:{end_date}")
+
+@router.get("/hours")
+async def get_hour_histogram(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    start_date, end_date = _date_range(start_date, end_date)
+    
+    async def build():
+        return await AnalyticsService(db).hour_histogram(start_date, end_date)
+    
+    return await response_cache.respond(request, build, key_suffix=f"#{start_date}:{end_date}")
+
+@router.get("/heatmap")
+async def get_heatmap(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    zoom: int = 10,
+    bbox: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        box = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    start_date, end_date = _date_range(start_date, end_date)
+    
+    async def build():
+        return await AnalyticsService(db).heatmap(start_date, end_date, zoom, box)
+    
+    return await response_cache.respond(request, build, key_suffix=f"#{start_date}:{end_date}")
+
+@router.get("/compare")
+async def compare_seasons(
+    request: Request,
+    season_start: str = "01-01",
+    season_end: str = "04-30",
+    years: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Compare a season (MM-DD..MM-DD) across years, e.g.
+    ?season_start=02-01&season_end=02-29&years=2025,2026
+    """
+    try:
+        if years:
+            year_list = [int(y) for y in years.split(",")]
+            if len(year_list) > MAX_COMPARE_YEARS:
+                raise ValueError(f"at most {MAX_COMPARE_YEARS} years")
+            for year in year_list:
+                # A season may start in the previous year
+                if not 2 <= year <= 9999:
+                    raise ValueError(f"year {year} out of range")
+        else:
+            this_year = datetime.now(THAI_TZ).year
+            year_list = [this_year - 2, this_year - 1, this_year]
+        # Validate MM-DD early for a clean 400
+        for md in (season_start, season_end):
+            AnalyticsService._month_day(2000, md)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid season or years: {e}")
+    
+    async def build():
+        return await AnalyticsService(db).compare_seasons(season_start, season_end, year_list)
+    
+    return await response_cache.respond(request, build)
@@ -1,17 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hmac
+from fastapi import APIRouter, Depends, HTTPException, Request, Header, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, or_
-from typing import List
+from sqlalchemy import select, desc, or_, and_, func
+from typing import List, Optional
 from ..database import get_db
 from ..config import get_settings
-from ..models import Hotspot, Notification, CheckLog, Setting
+from ..models import Hotspot, Notification, NotificationHotspot, CheckLog, Setting, FireEvent
 from ..services.notification_service import NotificationService
 from ..services.firms_service import FIRMSService
 from ..services.line_service import LINEService
+from ..services.cache_service import response_cache
+from ..services.event_service import event_broker
+from ..services.hot_window import hot_window
+from ..services.stats_service import StatsService
+from ..utils.pagination import encode_cursor, decode_cursor, parse_bbox
+from ..utils.formatting import format_acq_time
+from ..utils.timing import TIMING_STAGES, summarize_timings
 from pydantic import BaseModel
 from datetime import datetime, date, timezone, timedelta
 
-router = APIRouter(prefix="/api", tags=["Dashboard"])
+router = APIRouter(prefix="/api", tags=["Dashboard"], default_response_class=ORJSONResponse)
 
 # Thai timezone (UTC+7)
 THAI_TZ = timezone(timedelta(hours=7))
@@ -20,69 +29,296 @@ class SettingUpdate(BaseModel):
     key: str
     value: str
 
+# Hard caps for the paginated listing
+MAX_PAGE_SIZE = 1000
+COUNT_CAP = 10000
+# Today/yesterday view and check logs are unpaginated; cap what one response carries
+TODAY_CAP = 5000
+MAX_LOG_ROWS = 500
+
+# Only the columns the dashboard table actually renders
+HOTSPOT_LIST_COLUMNS = (
+    Hotspot.id,
+    Hotspot.latitude,
+    Hotspot.longitude,
+    Hotspot.acq_date,
+    Hotspot.acq_time,
+    Hotspot.satellite,
+    Hotspot.confidence,
+    Hotspot.frp,
+    Hotspot.province,
+)
+
+def shape_hotspot_rows(rows) -> List[dict]:
+    """
+    Turn HOTSPOT_LIST_COLUMNS tuples into JSON-ready dicts.
+    Dates/times are formatted here so the response can go straight to orjson
+    without a jsonable_encoder pass.
+    """
+    return [{
+        "id": hid,
+        "latitude": lat,
+        "longitude": lon,
+        "acq_date": acq_date.isoformat(),
+        "acq_time": format_acq_time(acq_time),
+        "satellite": satellite,
+        "confidence": confidence,
+        "frp": frp,
+        "province": province
+    } for hid, lat, lon, acq_date, acq_time, satellite, confidence, frp, province in rows]
+
 @router.get("/hotspots")
-async def get_hotspots(limit: int = 100, db: AsyncSession = Depends(get_db)):
-    stmt = select(Hotspot).order_by(desc(Hotspot.created_at)).limit(limit)
+async def get_hotspots(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    satellite: Optional[str] = None,
+    confidence: Optional[str] = None,
+    province: Optional[str] = None,
+    bbox: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Keyset-paginated hotspot listing, newest first.
+    Ordered by (acq_date, acq_time, id) so each page is an index range scan;
+    pass the returned next_cursor to fetch the following page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    
+    filters = []
+    if satellite:
+        filters.append(Hotspot.satellite == satellite)
+    if confidence:
+        filters.append(Hotspot.confidence == confidence)
+    if province:
+        filters.append(Hotspot.province == province)
+    if bbox:
+        try:
+            west, south, east, north = parse_bbox(bbox)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        filters.extend([
+            Hotspot.longitude.between(west, east),
+            Hotspot.latitude.between(south, north),
+        ])
+    
+    stmt = select(*HOTSPOT_LIST_COLUMNS).where(*filters)
+    
+    if cursor:
+        try:
+            c_date, c_time, c_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # Expanded row-value comparison: (date, time, id) < cursor
+        stmt = stmt.where(or_(
+            Hotspot.acq_date < c_date,
+            and_(Hotspot.acq_date == c_date, Hotspot.acq_time < c_time),
+            and_(Hotspot.acq_date == c_date, Hotspot.acq_time == c_time, Hotspot.id < c_id),
+        ))
+    
+    # Fetch one extra row to know whether another page exists
+    stmt = stmt.order_by(
+        desc(Hotspot.acq_date), desc(Hotspot.acq_time), desc(Hotspot.id)
+    ).limit(limit + 1)
+    
     result = await db.execute(stmt)
-    return result.scalars().all()
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    items = shape_hotspot_rows(rows)
+    
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.acq_date, last.acq_time, last.id)
+    
+    response = {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": has_more
+    }
+    
+    if include_total:
+        # Capped count: stops scanning after COUNT_CAP matches instead of
+        # walking the whole table, so cost stays bounded as data grows
+        capped = select(Hotspot.id).where(*filters).limit(COUNT_CAP + 1).subquery()
+        count_res = await db.execute(select(func.count()).select_from(capped))
+        total = count_res.scalar()
+        response["total"] = min(total, COUNT_CAP)
+        response["total_is_exact"] = total <= COUNT_CAP
+    
+    return ORJSONResponse(response)
 
 @router.get("/hotspots/today")
-async def get_hotspots_today(db: AsyncSession = Depends(get_db)):
+async def get_hotspots_today(request: Request, db: AsyncSession = Depends(get_db)):
     # Use Thai timezone to get today's date
     thai_now = datetime.now(THAI_TZ)
     today = thai_now.date()
     yesterday = today - timedelta(days=1)
     
-    # Get hotspots from today AND yesterday
-    stmt = select(Hotspot).where(
-        or_(Hotspot.acq_date == today, Hotspot.acq_date == yesterday)
-    ).order_by(desc(Hotspot.acq_date), desc(Hotspot.acq_time))
-    
-    result = await db.execute(stmt)
-    hotspots_raw = result.scalars().all()
-    
-    # Standardize time format for JS to display easily
-    hotspots = []
-    for h in hotspots_raw:
-        # Robust time string extraction
-        if hasattr(h.acq_time, "strftime"):
-            time_display = h.acq_time.strftime("%H:%M")
+    async def build():
+        # Get hotspots from today AND yesterday
+        if hot_window.covers(yesterday):
+            hotspots = hot_window.listing([today, yesterday])
+            # Calculate today's count strictly for the summary card
+            today_str = today.isoformat()
+            today_count = sum(1 for h in hotspots if h["acq_date"] == today_str)
+            truncated = len(hotspots) > TODAY_CAP
+            hotspots = hotspots[:TODAY_CAP]
         else:
-            ts = str(h.acq_time or "")
-            if len(ts) == 4 and ":" not in ts:
-                time_display = f"{ts[:2]}:{ts[2:]}"
+            stmt = select(*HOTSPOT_LIST_COLUMNS).where(
+                or_(Hotspot.acq_date == today, Hotspot.acq_date == yesterday)
+            ).order_by(desc(Hotspot.acq_date), desc(Hotspot.acq_time)).limit(TODAY_CAP + 1)
+            
+            result = await db.execute(stmt)
+            hotspots = shape_hotspot_rows(result.all())
+            truncated = len(hotspots) > TODAY_CAP
+            hotspots = hotspots[:TODAY_CAP]
+            # Today's rows come first, so only a truncated listing needs a count query
+            if truncated:
+                count_res = await db.execute(select(func.count(Hotspot.id)).where(Hotspot.acq_date == today))
+                today_count = count_res.scalar()
             else:
-                time_display = ts[:5]
+                today_str = today.isoformat()
+                today_count = sum(1 for h in hotspots if h["acq_date"] == today_str)
         
-        hotspots.append({
-            "id": h.id,
-            "latitude": h.latitude,
-            "longitude": h.longitude,
-            "acq_date": str(h.acq_date),
-            "acq_time": time_display,
-            "satellite": h.satellite,
-            "confidence": h.confidence,
-            "frp": h.frp
-        })
-    
-    # Calculate today's count strictly for the summary card
-    today_count = sum(1 for h in hotspots if h["acq_date"] == str(today))
-    
-    return {
-        "today_count": today_count,
-        "hotspots": hotspots
-    }
+        return {
+            "today_count": today_count,
+            "hotspots": hotspots,
+            # Newest TODAY_CAP rows only; the full set is on /api/hotspots
+            "truncated": truncated
+        }
+    
+    # Key on the Thai date too, so the window rolls over at midnight
+    return await response_cache.respond(request, build, key_suffix=f"#{today.isoformat()}")
+
+@router.get("/hotspots/stats")
+async def get_hotspot_stats(
+    request: Request,
+    days: int = 30,
+    db: AsyncSession = Depends(get_db)
+):
+    """Daily / satellite / district totals for the last `days` days"""
+    today = datetime.now(THAI_TZ).date()
+    start_date = today - timedelta(days=max(days, 1) - 1)
+    
+    async def build():
+        return await StatsService(db).summary(start_date, today)
+    
+    return await response_cache.respond(request, build, key_suffix=f"#{today.isoformat()}")
 
 @router.get("/logs")
-async def get_logs(limit: int = 100, db: AsyncSession = Depends(get_db)):
-    stmt = select(CheckLog).order_by(desc(CheckLog.checked_at)).limit(limit)
-    result = await db.execute(stmt)
-    logs = result.scalars().all()
-    return [{
-        "checked_at": l.checked_at.isoformat() if l.checked_at else datetime.now().isoformat(),
-        "status": l.status,
-        "hotspots_found": l.hotspots_found
-    } for l in logs]
+async def get_logs(
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_LOG_ROWS),
+    db: AsyncSession = Depends(get_db)
+):
+    async def build():
+        stmt = select(
+            CheckLog.checked_at, CheckLog.status, CheckLog.hotspots_found
+        ).order_by(desc(CheckLog.checked_at)).limit(limit)
+        result = await db.execute(stmt)
+        return [{
+            "checked_at": checked_at.isoformat() if checked_at else datetime.now().isoformat(),
+            "status": status,
+            "hotspots_found": hotspots_found
+        } for checked_at, status, hotspots_found in result.all()]
+    
+    return await response_cache.respond(request, build)
+
+@router.get("/logs/timings")
+async def get_log_timings(
+    request: Request,
+    limit: int = Query(50, ge=1, le=MAX_LOG_ROWS),
+    db: AsyncSession = Depends(get_db)
+):
+    """Per-stage durations of recent checks, oldest first (for the stacked chart)"""
+    async def build():
+        stmt = select(
+            CheckLog.checked_at, CheckLog.status, CheckLog.api_response_time_ms, CheckLog.stage_timings
+        ).where(CheckLog.stage_timings.is_not(None)).order_by(desc(CheckLog.checked_at), desc(CheckLog.id)).limit(limit)
+        result = await db.execute(stmt)
+        
+        checks = [
+            summarize_timings(checked_at.isoformat() if checked_at else None, status, total_ms, stages)
+            for checked_at, status, total_ms, stages in reversed(result.all())
+        ]
+        return {"stages": TIMING_STAGES, "checks": checks}
+    
+    return await response_cache.respond(request, build)
+
+@router.get("/fire-events")
+async def get_fire_events(request: Request, hours: int = 48, db: AsyncSession = Depends(get_db)):
+    """Fire events with a detection in the last `hours` (Thai time), most recent first"""
+    since = datetime.now(THAI_TZ).replace(tzinfo=None) - timedelta(hours=hours)
+    
+    async def build():
+        stmt = select(
+            FireEvent.id, FireEvent.first_seen, FireEvent.last_seen, FireEvent.hotspot_count,
+            FireEvent.max_frp, FireEvent.area_km2, FireEvent.satellites,
+            FireEvent.latitude, FireEvent.longitude, FireEvent.province, FireEvent.district
+        ).where(FireEvent.last_seen >= since).order_by(desc(FireEvent.last_seen))
+        result = await db.execute(stmt)
+        return [{
+            "id": eid,
+            "first_seen": first_seen.isoformat(),
+            "last_seen": last_seen.isoformat(),
+            "hotspot_count": count,
+            "max_frp": max_frp,
+            "area_km2": area_km2,
+            "satellites": satellites.split(",") if satellites else [],
+            "latitude": lat,
+            "longitude": lon,
+            "province": province,
+            "district": district
+        } for eid, first_seen, last_seen, count, max_frp, area_km2, satellites, lat, lon, province, district in result.all()]
+    
+    return await response_cache.respond(request, build, key_suffix=f"#{since:%Y-%m-%dT%H}")
+
+@router.get("/fire-events/{event_id}/notifications")
+async def get_fire_event_notifications(request: Request, event_id: int, db: AsyncSession = Depends(get_db)):
+    """Alerts that included detections of this fire, oldest first (indexed joins via notification_hotspots)"""
+    async def build():
+        stmt = select(
+            Notification.id, Notification.batch_id, Notification.sent_at, Notification.status,
+            func.count(NotificationHotspot.hotspot_id)
+        ).join(
+            NotificationHotspot, NotificationHotspot.notification_id == Notification.id
+        ).join(
+            Hotspot, Hotspot.id == NotificationHotspot.hotspot_id
+        ).where(Hotspot.fire_event_id == event_id).group_by(
+            Notification.id, Notification.batch_id, Notification.sent_at, Notification.status
+        ).order_by(Notification.sent_at, Notification.id)
+        result = await db.execute(stmt)
+        return [{
+            "id": nid,
+            "batch_id": batch_id,
+            "sent_at": sent_at.isoformat() if sent_at else None,
+            "status": status,
+            "hotspot_count": count
+        } for nid, batch_id, sent_at, status, count in result.all()]
+    
+    return await response_cache.respond(request, build)
+
+@router.get("/stream")
+async def stream_events(
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events feed of hotspot deltas and check-log events.
+    EventSource resends Last-Event-ID on reconnect to resume the stream;
+    an id from before a restart gets a resync event instead.
+    """
+    return StreamingResponse(
+        event_broker.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable proxy buffering (nginx / Railway edge)
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 @router.post("/test-line")
 async def test_line():
@@ -124,14 +360,25 @@ async def trigger_check(db: AsyncSession = Depends(get_db)):
     # manual_trigger=True ensures it sends a LINE alert immediately
     result = await notif_service.check_and_notify(manual_trigger=True)
     
-    # Add total count in DB for debugging
-    from sqlalchemy import func
-    stmt = select(func.count()).select_from(Hotspot)
-    count_res = await db.execute(stmt)
-    result["total_in_db"] = count_res.scalar()
+    # Add total count in DB for debugging (from the rollup, not a table scan)
+    result["total_in_db"] = await StatsService(db).total_hotspots()
     
     return result
 
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Shared-secret guard for maintenance endpoints: X-Admin-Token must equal SECRET_KEY"""
+    secret = get_settings().SECRET_KEY
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), secret.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@router.post("/cache/invalidate", dependencies=[Depends(require_admin_token)])
+async def invalidate_cache(db: AsyncSession = Depends(get_db)):
+    """Drop cached responses after data was written outside this process (scripts)"""
+    # Backfills also replace NRT rows in place; reload the hot window if they did
+    await hot_window.verify(db)
+    response_cache.bump()
+    return {"status": "success", "version": response_cache.version}
+
 @router.post("/settings")
 async def update_setting(update: SettingUpdate, db: AsyncSession = Depends(get_db)):
     stmt = select(Setting).where(Setting.key == update.key)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from ..database import get_db
+from ..utils.metrics import REGISTRY
 import time
 
 router = APIRouter(tags=["Support"])
@@ -21,3 +23,8 @@ async def get_status():
         "version": "1.0.0",
         "current_time": time.ctime()
     }
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus text exposition; rendered from in-process counters, no DB access
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
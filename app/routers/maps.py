@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date, datetime, timedelta
+from ..database import get_db
+from ..services.map_service import MapService
+from ..services.cache_service import response_cache
+from ..utils.geo_utils import GRID_ZOOM
+from ..utils.pagination import parse_bbox
+from .dashboard import THAI_TZ
+
+router = APIRouter(tags=["Map"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+def _default_dates(start_date: Optional[date], end_date: Optional[date]):
+    """Default window matches the dashboard table: yesterday and today (Thai time)"""
+    if start_date is None and end_date is None:
+        today = datetime.now(THAI_TZ).date()
+        return today - timedelta(days=1), today
+    return start_date, end_date
+
+@router.get("/api/hotspots.geojson")
+async def get_hotspots_geojson(
+    request: Request,
+    bbox: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    satellite: Optional[str] = None,
+    limit: int = Query(MapService.MAX_GEOJSON_FEATURES, ge=1, le=MapService.MAX_GEOJSON_FEATURES),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        box = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    start_date, end_date = _default_dates(start_date, end_date)
+    
+    async def build():
+        return await MapService(db).get_geojson(box, start_date, end_date, satellite, limit)
+    
+    return await response_cache.respond(
+        request, build,
+        key_suffix=f"#{start_date}:{end_date}",
+        media_type="application/geo+json"
+    )
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+async def get_hotspot_tile(
+    request: Request,
+    z: int,
+    x: int,
+    y: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    if not 0 <= z <= GRID_ZOOM or not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    start_date, end_date = _default_dates(start_date, end_date)
+    
+    async def build():
+        return await MapService(db).get_tile(z, x, y, start_date, end_date)
+    
+    return await response_cache.respond(
+        request, build,
+        key_suffix=f"#{start_date}:{end_date}",
+        media_type=MVT_MEDIA_TYPE
+    )
@@ -0,0 +1,285 @@
+import logging
+import calendar
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from ..models import HotspotDailyStats, HotspotHourlyStats, HotspotGridStats
+from ..utils.geo_utils import STATS_GRID_ZOOM, grid_cell_center
+
+logger = logging.getLogger(__name__)
+
+class AnalyticsService:
+    """
+    Historical analytics over the hotspot rollups.
+
+    Each query pulls the (already aggregated) rollup rows for the requested
+    range with a single SELECT and does the ad-hoc grouping with NumPy,
+    so multi-season queries touch a few thousand rows, not every detection.
+    """
+
+    INTERVALS = ("day", "week", "month")
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    @staticmethod
+    def _date_filters(model, start_date: Optional[date], end_date: Optional[date]) -> List[Any]:
+        filters = []
+        if start_date:
+            filters.append(model.acq_date >= start_date)
+        if end_date:
+            filters.append(model.acq_date <= end_date)
+        return filters
+
+    @staticmethod
+    def _bucket(days: np.ndarray, interval: str) -> np.ndarray:
+        """Truncate datetime64[D] values to the start of their interval"""
+        if interval == "month":
+            return days.astype("datetime64[M]").astype("datetime64[D]")
+        if interval == "week":
+            # 1970-01-01 was a Thursday; shift so buckets start on Monday
+            weekday = (days.astype(np.int64) + 3) % 7
+            return days - weekday.astype("timedelta64[D]")
+        return days
+
+    async def timeseries(
+        self,
+        start_date: date,
+        end_date: date,
+        interval: str = "day",
+        satellite: Optional[str] = None,
+        province: Optional[str] = None,
+        district: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Dense count/FRP series over the range, zero-filled"""
+        filters = self._date_filters(HotspotDailyStats, start_date, end_date)
+        if satellite:
+            filters.append(HotspotDailyStats.satellite == satellite)
+        if province:
+            filters.append(HotspotDailyStats.province == province)
+        if district:
+            filters.append(HotspotDailyStats.district == district)
+
+        result = await self.db.execute(
+            select(
+                HotspotDailyStats.acq_date,
+                HotspotDailyStats.hotspot_count,
+                HotspotDailyStats.frp_sum
+            ).where(*filters)
+        )
+        rows = result.all()
+
+        bounds = self._bucket(np.array([start_date, end_date], dtype="datetime64[D]"), interval)
+        if interval == "month":
+            buckets = np.arange(bounds[0].astype("datetime64[M]"), bounds[1].astype("datetime64[M]") + 1)
+            buckets = buckets.astype("datetime64[D]")
+        else:
+            step = 7 if interval == "week" else 1
+            buckets = np.arange(bounds[0], bounds[1] + 1, step)
+
+        counts = np.zeros(len(buckets), dtype=np.int64)
+        frp = np.zeros(len(buckets), dtype=np.float64)
+        if rows:
+            days = np.array([r[0] for r in rows], dtype="datetime64[D]")
+            idx = np.searchsorted(buckets, self._bucket(days, interval))
+            counts = np.bincount(idx, weights=[r[1] for r in rows], minlength=len(buckets)).astype(np.int64)
+            frp = np.bincount(idx, weights=[r[2] for r in rows], minlength=len(buckets))
+
+        return {
+            "interval": interval,
+            "total": int(counts.sum()),
+            "series": [{
+                "date": str(b),
+                "count": int(c),
+                "frp_sum": round(float(f), 2)
+            } for b, c, f in zip(buckets, counts, frp)]
+        }
+
+    async def district_ranking(
+        self,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Districts ordered by detections, with FRP and active-day counts"""
+        result = await self.db.execute(
+            select(
+                HotspotDailyStats.province,
+                HotspotDailyStats.district,
+                HotspotDailyStats.acq_date,
+                HotspotDailyStats.hotspot_count,
+                HotspotDailyStats.frp_sum,
+                HotspotDailyStats.frp_max
+            ).where(*self._date_filters(HotspotDailyStats, start_date, end_date))
+        )
+        rows = result.all()
+        if not rows:
+            return []
+
+        names = np.array([f"{r[0]}\x1f{r[1]}" for r in rows])
+        keys, inverse = np.unique(names, return_inverse=True)
+        n = len(keys)
+
+        counts = np.bincount(inverse, weights=[r[3] for r in rows], minlength=n)
+        frp_sum = np.bincount(inverse, weights=[r[4] for r in rows], minlength=n)
+        frp_max = np.zeros(n)
+        np.maximum.at(frp_max, inverse, np.array([r[5] for r in rows], dtype=np.float64))
+
+        # Active days: distinct (district, date) pairs
+        days = np.array([r[2] for r in rows], dtype="datetime64[D]").astype(np.int64)
+        pairs = np.unique(np.stack([inverse, days], axis=1), axis=0)
+        active_days = np.bincount(pairs[:, 0], minlength=n)
+
+        order = np.argsort(-counts, kind="stable")[:limit]
+        ranking = []
+        for rank, i in enumerate(order, start=1):
+            province, district = keys[i].split("\x1f")
+            ranking.append({
+                "rank": rank,
+                "province": province,
+                "district": district,
+                "count": int(counts[i]),
+                "frp_sum": round(float(frp_sum[i]), 2),
+                "frp_max": float(frp_max[i]),
+                "active_days": int(active_days[i])
+            })
+        return ranking
+
+    async def hour_histogram(
+        self,
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ) -> Dict[str, List[int]]:
+        """Detections per hour of day (Thai time) for each satellite"""
+        result = await self.db.execute(
+            select(
+                HotspotHourlyStats.satellite,
+                HotspotHourlyStats.hour,
+                HotspotHourlyStats.hotspot_count
+            ).where(*self._date_filters(HotspotHourlyStats, start_date, end_date))
+        )
+        rows = result.all()
+        if not rows:
+            return {}
+
+        satellites, sat_idx = np.unique(np.array([r[0] for r in rows]), return_inverse=True)
+        hist = np.zeros((len(satellites), 24), dtype=np.int64)
+        np.add.at(
+            hist,
+            (sat_idx, np.array([r[1] for r in rows])),
+            np.array([r[2] for r in rows], dtype=np.int64)
+        )
+        return {str(sat): hist[i].tolist() for i, sat in enumerate(satellites)}
+
+    async def heatmap(
+        self,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        zoom: int = 10,
+        bbox: Optional[Tuple[float, float, float, float]] = None
+    ) -> Dict[str, Any]:
+        """Grid heat map: detections and max FRP per cell at the given zoom"""
+        zoom = max(0, min(zoom, STATS_GRID_ZOOM))
+        result = await self.db.execute(
+            select(
+                HotspotGridStats.cell_x,
+                HotspotGridStats.cell_y,
+                HotspotGridStats.hotspot_count,
+                HotspotGridStats.frp_max
+            ).where(*self._date_filters(HotspotGridStats, start_date, end_date))
+        )
+        rows = result.all()
+        cells = []
+        if rows:
+            data = np.array(rows, dtype=np.float64)
+            shift = STATS_GRID_ZOOM - zoom
+            cx = data[:, 0].astype(np.int64) >> shift
+            cy = data[:, 1].astype(np.int64) >> shift
+            keys, inverse = np.unique((cx << 32) | cy, return_inverse=True)
+
+            counts = np.bincount(inverse, weights=data[:, 2], minlength=len(keys))
+            frp_max = np.zeros(len(keys))
+            np.maximum.at(frp_max, inverse, data[:, 3])
+
+            for key, count, frp in zip(keys, counts, frp_max):
+                lon, lat = grid_cell_center(int(key >> 32), int(key & 0xFFFFFFFF), zoom)
+                if bbox and not (bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]):
+                    continue
+                cells.append({
+                    "longitude": round(lon, 5),
+                    "latitude": round(lat, 5),
+                    "count": int(count),
+                    "frp_max": float(frp)
+                })
+
+        return {
+            "zoom": zoom,
+            "max_count": max((c["count"] for c in cells), default=0),
+            "cells": cells
+        }
+
+    @staticmethod
+    def _month_day(year: int, month_day: str) -> date:
+        """'MM-DD' in a given year; Feb 29 falls back to Feb 28"""
+        month, day = (int(p) for p in month_day.split("-"))
+        return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+    async def compare_seasons(
+        self,
+        season_start: str,
+        season_end: str,
+        years: List[int]
+    ) -> Dict[str, Any]:
+        """
+        Compare the same season across years. A season whose start is later
+        in the calendar than its end (e.g. 11-01..04-30) starts in the
+        previous year; `years` names the year the season ends in.
+        """
+        ranges = []
+        for year in sorted(set(years)):
+            end = self._month_day(year, season_end)
+            start = self._month_day(year, season_start)
+            if start > end:
+                start = self._month_day(year - 1, season_start)
+            ranges.append((year, start, end))
+
+        result = await self.db.execute(
+            select(HotspotDailyStats.acq_date, HotspotDailyStats.hotspot_count).where(
+                *self._date_filters(HotspotDailyStats, ranges[0][1], ranges[-1][2])
+            )
+        )
+        rows = result.all()
+        days = np.array([r[0] for r in rows], dtype="datetime64[D]")
+        counts = np.array([r[1] for r in rows], dtype=np.int64)
+
+        seasons = []
+        for year, start, end in ranges:
+            start64 = np.datetime64(start, "D")
+            length = (end - start).days + 1
+            mask = (days >= start64) & (days <= np.datetime64(end, "D"))
+            offsets = (days[mask] - start64).astype(np.int64)
+            daily = np.bincount(offsets, weights=counts[mask], minlength=length).astype(np.int64)
+            active = daily > 0
+            seasons.append({
+                "year": year,
+                "start_date": start.isoformat(),
+                "end_date": end.isoformat(),
+                "total": int(daily.sum()),
+                "active_days": int(active.sum()),
+                "peak_day": (start64 + int(daily.argmax())).item().isoformat() if active.any() else None,
+                "peak_count": int(daily.max()) if length else 0,
+                "cumulative": np.cumsum(daily).tolist()
+            })
+
+        if len(seasons) >= 2 and seasons[-2]["total"]:
+            change = (seasons[-1]["total"] - seasons[-2]["total"]) / seasons[-2]["total"] * 100
+        else:
+            change = None
+
+        return {
+            "season": f"{season_start}..{season_end}",
+            "seasons": seasons,
+            "change_vs_previous_pct": round(change, 1) if change is not None else None
+        }
@@ -0,0 +1,373 @@
+"""
+Backfill past seasons from FIRMS archive downloads.
+
+FIRMS "archive download" requests produce large CSV files (optionally
+zipped) of standard-quality VIIRS or MODIS detections for a whole country
+and date span. They use the same columns as the area API, except that
+VIIRS/MODIS brightness columns keep their band names and acq_time may be
+unpadded.
+
+Plain CSVs are memory-mapped and cut into newline-aligned byte ranges that
+worker processes parse and geo-filter on their own; ZIP members are
+streamed through the decompressor in blocks. Chunks are written in file
+order, so a checkpoint is just the byte offset after the last committed
+chunk.
+"""
+import asyncio
+import csv
+import json
+import logging
+import mmap
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Hotspot
+from ..utils.bulk_insert import bulk_insert
+from ..utils.geo_utils import lonlat_to_grid_array
+from .reconcile_service import ReconcileService
+from .cache_service import response_cache
+from .source_registry import source_registry, generic_confidence
+from .stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+BBox = Tuple[float, float, float, float]
+
+# Archive satellite codes -> the satellite names live checks store
+SATELLITE_NAMES = source_registry.satellite_codes()
+
+# First matching header wins (VIIRS band names, then MODIS)
+COLUMN_ALIASES = {
+    "brightness": ("brightness", "bright_ti4"),
+    "bright_t31": ("bright_t31", "bright_ti5"),
+}
+
+# Same placeholder location the live check assigns
+PROVINCE = "กาญจนบุรี"
+DISTRICT = "-"
+
+THAI_OFFSET = timedelta(hours=7)
+
+
+def _satellite_name(instrument: str, satellite: str) -> str:
+    name = SATELLITE_NAMES.get((instrument, satellite))
+    if name:
+        return name
+    if instrument == "MODIS":
+        return "MODIS"
+    return f"{instrument}_{satellite}" if satellite else instrument
+
+
+def parse_chunk(header: List[str], data: bytes, bbox: BBox) -> Dict[str, Any]:
+    """
+    Parse newline-aligned archive CSV bytes into Hotspot columns, keeping
+    only rows inside bbox. Runs in worker processes, so everything it
+    needs comes in through its arguments.
+    """
+    west, south, east, north = bbox
+    index = {name: i for i, name in enumerate(header)}
+
+    def column(name: str) -> Optional[int]:
+        for alias in COLUMN_ALIASES.get(name, (name,)):
+            if alias in index:
+                return index[alias]
+        return None
+
+    i_lat, i_lon = index["latitude"], index["longitude"]
+    i_date, i_time = index["acq_date"], index["acq_time"]
+    i_sat, i_inst = column("satellite"), column("instrument")
+    i_conf, i_version, i_daynight = column("confidence"), column("version"), column("daynight")
+    floats = {name: column(name) for name in ("brightness", "scan", "track", "bright_t31", "frp")}
+
+    columns: Dict[str, List[Any]] = {
+        name: [] for name in (
+            "latitude", "longitude", "acq_date", "acq_time", "satellite", "instrument",
+            "confidence", "version", "daynight", *floats
+        )
+    }
+    # Dates, times, satellites and confidences repeat heavily; convert each once
+    stamps: Dict[Tuple[str, str], Tuple[date, time]] = {}
+    satellites: Dict[Tuple[str, str], str] = {}
+    confidences: Dict[Tuple[str, str], str] = {}
+    rows = errors = 0
+
+    for row in csv.reader(data.decode("utf-8").splitlines()):
+        if not row:
+            continue
+        rows += 1
+        try:
+            lat, lon = float(row[i_lat]), float(row[i_lon])
+            if not (west <= lon <= east and south <= lat <= north):
+                continue
+
+            stamp_key = (row[i_date], row[i_time])
+            stamp = stamps.get(stamp_key)
+            if stamp is None:
+                # Archive times are UTC; stored times are Thailand local like the live check
+                utc_dt = datetime.strptime(f"{row[i_date]} {row[i_time].zfill(4)}", "%Y-%m-%d %H%M")
+                th_dt = utc_dt + THAI_OFFSET
+                stamp = stamps[stamp_key] = (th_dt.date(), th_dt.time())
+
+            instrument = row[i_inst] if i_inst is not None else "VIIRS"
+            sat_key = (instrument, row[i_sat] if i_sat is not None else "")
+            satellite = satellites.get(sat_key)
+            if satellite is None:
+                satellite = satellites[sat_key] = _satellite_name(*sat_key)
+
+            conf = row[i_conf] if i_conf is not None else ""
+            conf_key = (satellite, conf)
+            confidence = confidences.get(conf_key)
+            if confidence is None:
+                # Each product reads its own scale (VIIRS l/n/h, MODIS 0-100, Landsat L/M/H)
+                source = source_registry.by_satellite(satellite)
+                mapper = source.confidence if source else generic_confidence
+                confidence = confidences[conf_key] = mapper(conf)
+
+            values = {name: float(row[i]) if i is not None and row[i] else 0.0 for name, i in floats.items()}
+        except (IndexError, ValueError):
+            errors += 1
+            continue
+
+        columns["latitude"].append(lat)
+        columns["longitude"].append(lon)
+        columns["acq_date"].append(stamp[0])
+        columns["acq_time"].append(stamp[1])
+        columns["satellite"].append(satellite)
+        columns["instrument"].append(instrument)
+        columns["confidence"].append(confidence)
+        columns["version"].append(row[i_version] if i_version is not None else "")
+        columns["daynight"].append(row[i_daynight] if i_daynight is not None else "D")
+        for name, value in values.items():
+            columns[name].append(value)
+
+    return {"columns": columns, "rows": rows, "errors": errors}
+
+
+def parse_file_range(path: str, header: List[str], start: int, end: int, bbox: BBox) -> Dict[str, Any]:
+    """Worker entry point for plain CSVs: map the file and parse [start, end)"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return parse_chunk(header, mm[start:end], bbox)
+
+
+class ArchiveBackfillService:
+    """
+    Load FIRMS archive CSV/ZIP files into hotspots.
+
+    Each parsed chunk is deduplicated against rows already stored for its
+    dates, merged into the NRT detections it reprocesses (ReconcileService),
+    bulk-inserted together with its rollup updates in one transaction, and
+    then checkpointed in
+    <archive>.checkpoint.json so an interrupted run resumes where it
+    stopped.
+    """
+
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        bbox: BBox,
+        workers: Optional[int] = None,
+        chunk_bytes: int = 16 * 1024 * 1024
+    ):
+        self.db = db_session
+        self.bbox = bbox
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_bytes = chunk_bytes
+
+    @staticmethod
+    def checkpoint_path(path: str) -> str:
+        return f"{path}.checkpoint.json"
+
+    def _load_checkpoint(self, path: str, resume: bool) -> Dict[str, Any]:
+        stat = os.stat(path)
+        fresh = {
+            "size": stat.st_size, "mtime": stat.st_mtime, "members": {},
+            "rows_read": 0, "rows_inserted": 0, "rows_updated": 0
+        }
+        checkpoint_file = self.checkpoint_path(path)
+        if not resume or not os.path.exists(checkpoint_file):
+            return fresh
+        with open(checkpoint_file) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("size") != stat.st_size or checkpoint.get("mtime") != stat.st_mtime:
+            logger.warning(f"{path} changed since its checkpoint was written; starting over")
+            return fresh
+        return checkpoint
+
+    def _save_checkpoint(self, path: str, checkpoint: Dict[str, Any]):
+        checkpoint_file = self.checkpoint_path(path)
+        tmp = f"{checkpoint_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, checkpoint_file)
+
+    def _csv_chunks(self, path: str, offset: int) -> Iterator[Tuple[Any, ...]]:
+        """(header, start, end) newline-aligned ranges of a plain CSV"""
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_end = mm.find(b"\n") + 1 or len(mm)
+            header = mm[:header_end].decode("utf-8").strip().split(",")
+            start = max(offset, header_end)
+            while start < len(mm):
+                end = mm.find(b"\n", start + self.chunk_bytes)
+                end = len(mm) if end < 0 else end + 1
+                yield header, start, end
+                start = end
+
+    def _zip_chunks(self, member: zipfile.ZipExtFile, offset: int) -> Iterator[Tuple[Any, ...]]:
+        """(header, data, end offset) blocks of a ZIP member, cut at line ends"""
+        header = member.readline().decode("utf-8").strip().split(",")
+        if offset > member.tell():
+            member.seek(offset)
+        position, remainder = member.tell(), b""
+        while True:
+            block = member.read(self.chunk_bytes)
+            if not block:
+                break
+            data = remainder + block
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                remainder = data
+                continue
+            data, remainder = data[:cut], data[cut:]
+            position += len(data)
+            yield header, data, position
+        if remainder:
+            yield header, remainder, position + len(remainder)
+
+    async def _existing_keys(self, columns: Dict[str, List[Any]]) -> set:
+        dates, satellites = columns["acq_date"], set(columns["satellite"])
+        result = await self.db.execute(
+            select(
+                Hotspot.latitude, Hotspot.longitude, Hotspot.acq_date, Hotspot.acq_time, Hotspot.satellite
+            ).where(
+                and_(
+                    Hotspot.acq_date.between(min(dates), max(dates)),
+                    Hotspot.satellite.in_(satellites)
+                )
+            )
+        )
+        return set(result.all())
+
+    async def _store(self, columns: Dict[str, List[Any]]) -> Tuple[int, int]:
+        """
+        Store one parsed chunk: skip rows already stored, let
+        standard-processing records replace their NRT detections, insert
+        the rest, and keep the rollups in step. Returns (inserted, updated).
+        """
+        if not columns["latitude"]:
+            return 0, 0
+        existing = await self._existing_keys(columns)
+        keep = []
+        for i, key in enumerate(zip(
+            columns["latitude"], columns["longitude"], columns["acq_date"],
+            columns["acq_time"], columns["satellite"]
+        )):
+            if key not in existing:
+                existing.add(key)
+                keep.append(i)
+        if not keep:
+            return 0, 0
+
+        grid_x, grid_y = lonlat_to_grid_array(np.array(columns["longitude"]), np.array(columns["latitude"]))
+        columns["grid_x"], columns["grid_y"] = grid_x.tolist(), grid_y.tolist()
+
+        merged, touched = await ReconcileService(self.db).merge(columns, keep)
+        keep = [i for i in keep if i not in merged]
+        if len(keep) < len(columns["latitude"]):
+            columns = {name: [values[i] for i in keep] for name, values in columns.items()}
+
+        count = len(keep)
+        columns.update({
+            "province": [PROVINCE] * count,
+            "district": [DISTRICT] * count,
+            # History, not something to alert on
+            "notified": [True] * count,
+        })
+        if count:
+            conn = await self.db.connection()
+            await bulk_insert(conn, Hotspot.__table__, columns)
+
+        stats = StatsService(self.db)
+        # Days with replaced rows are recomputed (that covers rows inserted on them too)
+        await stats.rebuild_dates(touched)
+        names = ("acq_date", "acq_time", "satellite", "province", "district", "confidence", "frp", "latitude", "longitude")
+        await stats.record(
+            row for row in (dict(zip(names, values)) for values in zip(*(columns[n] for n in names)))
+            if row["acq_date"] not in touched
+        )
+        return count, len(merged)
+
+    async def _run(self, path: str, checkpoint: Dict[str, Any], member_name: str, chunks, submit) -> None:
+        """Parse chunks in the pool (bounded read-ahead) and commit them in order"""
+        loop = asyncio.get_running_loop()
+        in_flight = deque()
+        state = checkpoint["members"].setdefault(member_name, {"offset": 0, "done": False})
+
+        async def drain_one():
+            future, end = in_flight.popleft()
+            parsed = await future
+            inserted, updated = await self._store(parsed["columns"])
+            await self.db.commit()
+            # Hotspots and rollups changed; drop cached reads in this process
+            response_cache.bump()
+            state["offset"] = end
+            checkpoint["rows_read"] += parsed["rows"]
+            checkpoint["rows_inserted"] += inserted
+            checkpoint["rows_updated"] = checkpoint.get("rows_updated", 0) + updated
+            self._save_checkpoint(path, checkpoint)
+            if parsed["errors"]:
+                logger.warning(f"{path}:{member_name or '-'} skipped {parsed['errors']} malformed rows")
+            logger.info(
+                f"{os.path.basename(path)}{':' + member_name if member_name else ''} @ {end:,} bytes: "
+                f"{checkpoint['rows_read']:,} read, {checkpoint['rows_inserted']:,} inserted, "
+                f"{checkpoint['rows_updated']:,} replaced NRT"
+            )
+
+        for chunk in chunks:
+            future, end = submit(loop, chunk)
+            in_flight.append((future, end))
+            if len(in_flight) >= self.workers * 2:
+                await drain_one()
+        while in_flight:
+            await drain_one()
+        state["done"] = True
+        self._save_checkpoint(path, checkpoint)
+
+    async def backfill(self, path: str, resume: bool = True) -> Dict[str, int]:
+        """Load one archive file (.csv or .zip); returns rows read / inserted / updated"""
+        checkpoint = self._load_checkpoint(path, resume)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            if zipfile.is_zipfile(path):
+                with zipfile.ZipFile(path) as archive:
+                    for name in archive.namelist():
+                        if not name.lower().endswith(".csv"):
+                            continue
+                        state = checkpoint["members"].get(name, {})
+                        if state.get("done"):
+                            continue
+                        with archive.open(name) as member:
+                            await self._run(
+                                path, checkpoint, name,
+                                self._zip_chunks(member, state.get("offset", 0)),
+                                lambda loop, c: (loop.run_in_executor(pool, parse_chunk, c[0], c[1], self.bbox), c[2])
+                            )
+            else:
+                state = checkpoint["members"].get("", {})
+                if not state.get("done"):
+                    await self._run(
+                        path, checkpoint, "",
+                        self._csv_chunks(path, state.get("offset", 0)),
+                        lambda loop, c: (
+                            loop.run_in_executor(pool, parse_file_range, path, c[0], c[1], c[2], self.bbox), c[2]
+                        )
+                    )
+        return {
+            "rows_read": checkpoint["rows_read"],
+            "rows_inserted": checkpoint["rows_inserted"],
+            "rows_updated": checkpoint.get("rows_updated", 0)
+        }
@@ -0,0 +1,176 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Hotspot
+from ..utils.metrics import DATA_ARRIVAL_LATENCY
+
+logger = logging.getLogger(__name__)
+
+THAI_OFFSET = timedelta(hours=7)
+MINUTES_PER_DAY = 24 * 60
+
+
+@dataclass
+class ArrivalProfile:
+    """When one satellite's day or night pass tends to show up in our DB"""
+    satellite: str
+    daynight: str
+    passes: int
+    # Acquisition -> first seen, minutes
+    latency_p10: float
+    latency_p50: float
+    latency_p90: float
+    # Thai-local minute of day; start > end wraps past midnight
+    window_start: int
+    window_end: int
+
+    def covers(self, minute: int) -> bool:
+        if self.window_start <= self.window_end:
+            return self.window_start <= minute <= self.window_end
+        return minute >= self.window_start or minute <= self.window_end
+
+
+def _minute_of_day(dt: datetime) -> int:
+    return dt.hour * 60 + dt.minute
+
+
+class ArrivalModel:
+    """
+    Per-satellite data-arrival model learned from our own ingest history.
+
+    Every stored NRT pass (satellite, acq_date, day/night) gives one
+    sample: its earliest acq_time and the created_at of the first of its
+    rows to reach the DB. From the last few weeks of samples the model
+    keeps, per satellite and pass, the latency quantiles and the
+    Thai-local time-of-day window (p10-p90 of first arrival) in which new
+    data is likely. The scheduler checks densely inside those windows and
+    backs off outside them; until every expected satellite has enough
+    samples the fixed CHECK_INTERVAL_PEAK applies.
+
+    created_at is the DB's now() and taken as UTC, like the rest of the
+    ingest timestamps.
+    """
+
+    LOW_Q = 10
+    HIGH_Q = 90
+    # Latencies beyond this are backfills or reprocessing, not NRT arrival
+    MAX_LATENCY_MINUTES = 12 * 60
+
+    def __init__(
+        self,
+        profiles: Optional[List[ArrivalProfile]] = None,
+        expected: Iterable[str] = (),
+        built_at: Optional[datetime] = None
+    ):
+        self.profiles = profiles or []
+        self.expected = list(expected)
+        self.built_at = built_at
+
+    @property
+    def ready(self) -> bool:
+        """Every expected satellite has a learned window"""
+        learned = {p.satellite for p in self.profiles}
+        return bool(self.profiles) and all(s in learned for s in self.expected)
+
+    @classmethod
+    async def build(
+        cls,
+        db: AsyncSession,
+        expected: Iterable[str],
+        lookback_days: int,
+        min_passes: int,
+        pad_minutes: int = 0,
+        now: Optional[datetime] = None
+    ) -> "ArrivalModel":
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        stmt = (
+            select(
+                Hotspot.satellite, Hotspot.daynight, Hotspot.acq_date,
+                func.min(Hotspot.acq_time), func.min(Hotspot.created_at)
+            )
+            .where(
+                Hotspot.created_at >= now - timedelta(days=lookback_days),
+                Hotspot.created_at <= now,
+                Hotspot.version.like("%NRT")
+            )
+            .group_by(Hotspot.satellite, Hotspot.daynight, Hotspot.acq_date)
+        )
+        samples: Dict[Tuple[str, str], List[Tuple[float, int]]] = {}
+        for satellite, daynight, acq_date, acq_time, first_seen in (await db.execute(stmt)).all():
+            if acq_time is None or first_seen is None:
+                continue
+            if first_seen.tzinfo is not None:
+                first_seen = first_seen.astimezone(timezone.utc).replace(tzinfo=None)
+            acquired = datetime.combine(acq_date, acq_time) - THAI_OFFSET
+            latency = (first_seen - acquired).total_seconds() / 60.0
+            if not 0 <= latency <= cls.MAX_LATENCY_MINUTES:
+                continue
+            arrival = _minute_of_day(first_seen + THAI_OFFSET)
+            samples.setdefault((satellite, daynight or "?"), []).append((latency, arrival))
+
+        profiles = []
+        for (satellite, daynight), rows in sorted(samples.items()):
+            if len(rows) < min_passes:
+                continue
+            latencies = np.array([r[0] for r in rows])
+            arrivals = np.array([r[1] for r in rows])
+            # Arrivals near midnight: measure around noon so the window does not split
+            wraps = arrivals.max() - arrivals.min() > MINUTES_PER_DAY // 2
+            if wraps:
+                arrivals = (arrivals + MINUTES_PER_DAY // 2) % MINUTES_PER_DAY
+            low, high = np.percentile(arrivals, [cls.LOW_Q, cls.HIGH_Q])
+            start, end = int(low) - pad_minutes, int(np.ceil(high)) + pad_minutes
+            if wraps:
+                start, end = start - MINUTES_PER_DAY // 2, end - MINUTES_PER_DAY // 2
+            p10, p50, p90 = np.percentile(latencies, [cls.LOW_Q, 50, cls.HIGH_Q])
+            profiles.append(ArrivalProfile(
+                satellite=satellite,
+                daynight=daynight,
+                passes=len(rows),
+                latency_p10=round(float(p10), 1),
+                latency_p50=round(float(p50), 1),
+                latency_p90=round(float(p90), 1),
+                window_start=start % MINUTES_PER_DAY,
+                window_end=end % MINUTES_PER_DAY
+            ))
+        return cls(profiles, expected, now)
+
+    def export_metrics(self):
+        for p in self.profiles:
+            for quantile, value in (("0.1", p.latency_p10), ("0.5", p.latency_p50), ("0.9", p.latency_p90)):
+                DATA_ARRIVAL_LATENCY.set(value, satellite=p.satellite, daynight=p.daynight, quantile=quantile)
+
+    def active(self, now: datetime) -> List[ArrivalProfile]:
+        """Profiles whose arrival window contains `now` (Thai local)"""
+        minute = _minute_of_day(now)
+        return [p for p in self.profiles if p.covers(minute)]
+
+    def interval_at(self, now: datetime, dense: int, sparse: int, default: int) -> int:
+        """Check interval in minutes for `now` (Thai local)"""
+        if not self.ready:
+            return default
+        return dense if self.active(now) else sparse
+
+    def grace(self, default: timedelta) -> timedelta:
+        """
+        How long to keep checking once every satellite has reported: the
+        widest p50-p90 latency spread (the tail of a pass still being
+        published), capped at the fixed grace period
+        """
+        if not self.ready:
+            return default
+        spread = max(p.latency_p90 - p.latency_p50 for p in self.profiles)
+        return min(default, timedelta(minutes=max(spread, 10.0)))
+
+    def describe(self) -> List[str]:
+        def hhmm(minute: int) -> str:
+            return f"{minute // 60:02d}:{minute % 60:02d}"
+        return [
+            f"{p.satellite}/{p.daynight}: {p.passes} passes, latency p50 {p.latency_p50:.0f}m "
+            f"p90 {p.latency_p90:.0f}m, arrives {hhmm(p.window_start)}-{hhmm(p.window_end)}"
+            for p in self.profiles
+        ]
@@ -0,0 +1,120 @@
+import asyncio
+import csv
+import io
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+import httpx
+from ..config import get_settings
+from ..utils.metrics import FIRMS_QUOTA_SPENT, FIRMS_FETCHES_SKIPPED
+from .key_pool import key_pool, key_error
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+THAI_OFFSET = timedelta(hours=7)
+
+
+class AvailabilityProbe:
+    """
+    FIRMS data-availability check ahead of area pulls.
+
+    One request (sensor "ALL") returns the newest date published for every
+    product. It is cached for ttl_seconds and shared by concurrent callers,
+    so a check's parallel fetch workers cost one probe between them.
+
+    The endpoint reports dates only (UTC), so the probe can tell that a
+    product has published nothing inside the area request's day window,
+    counted back from the newest date any product has (e.g. a satellite
+    outage), but not whether a new overpass landed today. A source is
+    skipped only then; anything else, including a failed probe, falls
+    through to the normal pull. Rows already ingested with a later date
+    than the probe reports mean the cache is behind, and the pull goes
+    ahead as well.
+
+    With daily products that all publish normally nothing is ever skipped
+    while the probe still spends a transaction per TTL, so it is off by
+    default (FIRMS_AVAILABILITY_PROBE) and meant for setups with sparse
+    sources such as Landsat, whose newest date is usually outside the window.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float):
+        self.url = url.rstrip("/")
+        self.ttl_seconds = ttl_seconds
+        self._latest: Dict[str, date] = {}
+        self._fetched_at: Optional[float] = None
+        self._inflight: Optional["asyncio.Future[Dict[str, date]]"] = None
+        # Newest UTC acq_date ingested per product
+        self._marks: Dict[str, date] = {}
+
+    def _fresh(self) -> bool:
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl_seconds
+
+    async def _fetch(self) -> Dict[str, date]:
+        latest: Dict[str, date] = {}
+        key = key_pool.acquire(1)
+        try:
+            if key is None:
+                raise httpx.HTTPError("no MAP_KEY available")
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(f"{self.url}/{key.key}/ALL")
+            FIRMS_QUOTA_SPENT.inc(source="data_availability")
+            key_status = key_error(response)
+            key_pool.report(key, key_status or ("ok" if response.is_success else "error"))
+            response.raise_for_status()
+            for row in csv.DictReader(io.StringIO(response.text)):
+                try:
+                    latest[row["data_id"]] = date.fromisoformat(row["max_date"][:10])
+                except (KeyError, TypeError, ValueError):
+                    continue
+            if not latest:
+                logger.warning(f"FIRMS availability probe returned no products: {response.text[:200]}")
+        except httpx.HTTPError as e:
+            logger.warning(f"FIRMS availability probe failed, pulling every source: {e}")
+        # Failures are cached too, so a FIRMS outage costs one probe per ttl
+        self._latest = latest
+        self._fetched_at = time.monotonic()
+        return latest
+
+    async def latest(self) -> Dict[str, date]:
+        """Newest published date per product, probing at most once per ttl"""
+        if self._fresh():
+            return self._latest
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        # A caller cut by its deadline must not cancel the probe the others wait on
+        return await asyncio.shield(self._inflight)
+
+    def note_ingested(self, source: str, rows: Iterable[Dict[str, Any]]):
+        """Record the newest acq_date pulled for source (rows carry Thai-local date/time strings)"""
+        newest = max(((r["acq_date"], r["acq_time"]) for r in rows), default=None)
+        if newest is None:
+            return
+        utc_day = (datetime.strptime(f"{newest[0]} {newest[1]}", "%Y-%m-%d %H%M") - THAI_OFFSET).date()
+        if utc_day > self._marks.get(source, date.min):
+            self._marks[source] = utc_day
+
+    async def should_fetch(self, source: str, day_range: int) -> bool:
+        """False only when FIRMS has published nothing for source inside the request's days"""
+        products = await self.latest()
+        latest = products.get(source)
+        if latest is None:
+            return True
+        # The request's days end at FIRMS's newest date, not at our clock
+        window_start = max(products.values()) - timedelta(days=day_range - 1)
+        if latest >= window_start or self._marks.get(source, date.min) > latest:
+            return True
+        logger.info(f"Skipping {source}: FIRMS has nothing newer than {latest}")
+        FIRMS_FETCHES_SKIPPED.inc(source=source)
+        return False
+
+
+def _availability_url() -> str:
+    if settings.FIRMS_AVAILABILITY_URL:
+        return settings.FIRMS_AVAILABILITY_URL
+    # Same host as the area API (keeps emulator setups self-contained)
+    return settings.FIRMS_BASE_URL.rstrip("/").replace("/api/area/", "/api/data_availability/")
+
+
+availability_probe = AvailabilityProbe(_availability_url(), settings.FIRMS_AVAILABILITY_TTL_SECONDS)
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import httpx
+import orjson
+from fastapi import Request, Response
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    In-process cache for read-only dashboard responses.
+
+    Entries are tagged with a data version. The ingestion path calls bump()
+    after each committed check, which invalidates every entry at once; until
+    then, repeated polls are served from memory (or answered with 304).
+    Writers in other processes (backfill, seed and reset scripts) bump it
+    through POST /api/cache/invalidate, see notify_running_app().
+
+    Misses are single-flight: concurrent requests for the same key and
+    version wait on one build() instead of each querying the database.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.version = 0
+        # Versions restart at 0 with the process; keep old ETags from matching
+        self._boot_id = f"{int(time.time()):x}"
+        self._entries: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        # Builds in progress, shared by every request that misses on the same entry
+        self._inflight: Dict[Tuple[str, int], "asyncio.Future[bytes]"] = {}
+
+    def bump(self):
+        """Invalidate all cached responses (call after new data is committed)"""
+        self.version += 1
+        self._entries.clear()
+        logger.debug(f"Response cache invalidated, data version={self.version}")
+
+    def etag(self, key: str, version: Optional[int] = None) -> str:
+        if version is None:
+            version = self.version
+        return f'W/"{self._boot_id}-{version}-{zlib.crc32(key.encode()):08x}"'
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self.version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, version: int, body: bytes):
+        # Data changed while the response was being built; don't cache it
+        if version != self.version:
+            return
+        self._entries[key] = (version, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def respond(
+        self,
+        request: Request,
+        build: Callable[[], Awaitable[Any]],
+        key_suffix: str = "",
+        media_type: str = "application/json"
+    ) -> Response:
+        """
+        Serve a response for the current request from cache, building it
+        with build() on a miss. build() may return raw bytes or anything
+        orjson can serialize. Honors If-None-Match with a 304.
+        """
+        key = f"{request.url.path}?{request.url.query}{key_suffix}"
+        version = self.version
+        etag = self.etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        body = self.get(key)
+        if body is None:
+            body = await self._build_once(key, version, build)
+
+        return Response(content=body, media_type=media_type, headers=headers)
+
+    async def _build_once(self, key: str, version: int, build: Callable[[], Awaitable[Any]]) -> bytes:
+        """Run build() for (key, version) once; concurrent callers await the same result"""
+        flight = (key, version)
+        pending = self._inflight.get(flight)
+        if pending is not None:
+            try:
+                # Shielded: a waiter disconnecting must not cancel the shared build
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The building request was itself cancelled; build here instead
+                return await self._build_once(key, version, build)
+
+        future: "asyncio.Future[bytes]" = asyncio.get_running_loop().create_future()
+        # Mark failures retrieved even when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[flight] = future
+        try:
+            content = await build()
+            if isinstance(content, bytes):
+                body = content
+            else:
+                body = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+            self.set(key, version, body)
+            future.set_result(body)
+            return body
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if self._inflight.get(flight) is future:
+                del self._inflight[flight]
+
+response_cache = ResponseCache()
+
+async def notify_running_app(app_url: Optional[str], admin_token: Optional[str] = None) -> bool:
+    """
+    Tell a running app that data changed outside it (scripts). Without this
+    its cached dashboard and analytics responses stay stale until the next
+    check commits. The endpoint is guarded by the app's SECRET_KEY, sent as
+    X-Admin-Token (defaults to this process's SECRET_KEY).
+    """
+    if not app_url:
+        logger.warning("No APP_URL set; a running app keeps serving cached responses until its next check")
+        return False
+    url = f"{app_url.rstrip('/')}/api/cache/invalidate"
+    try:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            if admin_token is None:
+                admin_token = get_settings().SECRET_KEY
+            response = await client.post(url, headers={"X-Admin-Token": admin_token})
+            response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning(f"Could not invalidate the app's response cache at {url}: {e}")
+        return False
+    logger.info(f"Invalidated the app's response cache at {url}")
+    return True
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, List, Optional, Set, Tuple
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class Subscriber:
+    """One connected SSE client: a bounded queue plus an overflow flag"""
+
+    def __init__(self, max_queue: int):
+        self.queue: "asyncio.Queue[Tuple[int, str, bytes]]" = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+class EventBroker:
+    """
+    In-process pub/sub for dashboard push updates.
+
+    check_and_notify publishes hotspot deltas and check-log events; every
+    connected /api/stream client gets them through its own bounded queue.
+    A ring buffer of recent events lets a reconnecting client resume from
+    its Last-Event-ID. Ids are "{boot}-{seq}": seq restarts with the
+    process, so an id from another boot always forces a resync. Slow
+    clients whose queue fills up are told to resync (reload full data)
+    instead of blocking the publisher.
+    """
+
+    HEARTBEAT_SECONDS = 15
+
+    def __init__(self, history_size: int = 500, max_queue: int = 100):
+        self.max_queue = max_queue
+        self.last_id = 0
+        # Sequence numbers restart with the process; ids carry the boot they came from
+        self.boot_id = f"{int(time.time()):x}"
+        self._history: Deque[Tuple[int, str, bytes]] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscriber] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: Any):
+        """Broadcast an event to all subscribers (never blocks)"""
+        self.last_id += 1
+        item = (self.last_id, event, orjson.dumps(data))
+        self._history.append(item)
+
+        for sub in self._subscribers:
+            if sub.overflowed:
+                continue
+            try:
+                sub.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Drop the backlog and replace it with a single resync marker
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.queue.put_nowait((self.last_id, "resync", b"{}"))
+                sub.overflowed = True
+                logger.warning("SSE subscriber fell behind, forcing resync")
+
+    def _sequence(self, event_id: str) -> Optional[int]:
+        """Sequence number of an id issued by this process, else None"""
+        boot, _, seq = event_id.rpartition("-")
+        if boot != self.boot_id or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _replay(self, last_event_id: Optional[str]) -> Optional[List[Tuple[int, str, bytes]]]:
+        """
+        Events after last_event_id, or None if they are no longer buffered
+        (or the id is from a previous process) and the client must resync.
+        """
+        if not last_event_id:
+            return []
+        seq = self._sequence(last_event_id)
+        if seq is None or seq > self.last_id:
+            return None
+        if seq == self.last_id:
+            return []
+        if not self._history or self._history[0][0] > seq + 1:
+            return None
+        return [item for item in self._history if item[0] > seq]
+
+    def _format(self, event_id: int, event: str, data: bytes) -> bytes:
+        return b"id: %s-%d\nevent: %s\ndata: %s\n\n" % (self.boot_id.encode(), event_id, event.encode(), data)
+
+    def _resync(self) -> bytes:
+        return self._format(self.last_id, "resync", b"{}")
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Yield SSE-encoded frames for one client until it disconnects"""
+        # Subscribe and snapshot the replay backlog without yielding in
+        # between, so no event is both replayed and queued
+        sub = Subscriber(self.max_queue)
+        self._subscribers.add(sub)
+        backlog = self._replay(last_event_id)
+        logger.info(f"SSE client connected ({self.subscriber_count} total)")
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield b"retry: 5000\n\n"
+
+            if backlog is None:
+                yield self._resync()
+            else:
+                for item in backlog:
+                    yield self._format(*item)
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(sub.queue.get(), timeout=self.HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment frame keeps proxies from closing an idle stream
+                    yield b": ping\n\n"
+                    continue
+                if item[1] == "resync":
+                    sub.overflowed = False
+                yield self._format(*item)
+        finally:
+            self._subscribers.discard(sub)
+            logger.info(f"SSE client disconnected ({self.subscriber_count} left)")
+
+event_broker = EventBroker()
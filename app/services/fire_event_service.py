@@ -0,0 +1,292 @@
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete
+from ..models import Hotspot, FireEvent
+from ..utils.geo_utils import haversine_km, KM_PER_DEG_LAT
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Nominal VIIRS I-band pixel size, used as the minimum footprint of an event
+PIXEL_KM = 0.375
+
+def detection_time(acq_date, acq_time) -> datetime:
+    return datetime.combine(acq_date, acq_time)
+
+class FireEventService:
+    """
+    Incremental spatio-temporal clustering of detections into FireEvents.
+
+    DBSCAN-style with min_points=1: a new detection joins every event that
+    has a member within FIRE_EVENT_DISTANCE_KM and FIRE_EVENT_GAP_HOURS of
+    it (merging those events if there are several), otherwise it starts a
+    new event. Members of recently active events are bucketed in a spatial
+    hash whose cells are one distance-threshold wide, so each new point only
+    compares against the 3x3 neighbouring cells.
+    """
+
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        distance_km: Optional[float] = None,
+        gap_hours: Optional[int] = None
+    ):
+        self.db = db_session
+        self.distance_km = distance_km or settings.FIRE_EVENT_DISTANCE_KM
+        self.gap = timedelta(hours=gap_hours or settings.FIRE_EVENT_GAP_HOURS)
+
+        # Cell size in degrees. Longitude degrees shrink with latitude, so
+        # size lon cells for the highest latitude of the monitored area.
+        max_lat = max(abs(settings.AREA_NORTH), abs(settings.AREA_SOUTH))
+        self.cell_lat = self.distance_km / KM_PER_DEG_LAT
+        self.cell_lon = self.cell_lat / math.cos(math.radians(min(max_lat, 80.0)))
+
+        # Cell -> [(lat, lon, detected_at, event_key)]
+        self._grid: Dict[Tuple[int, int], List[Tuple[float, float, datetime, int]]] = {}
+        # Union-find over event keys (existing ids > 0, new events < 0)
+        self._parent: Dict[int, int] = {}
+        self._events: Dict[int, FireEvent] = {}
+        self._next_temp_key = -1
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_lat)), int(math.floor(lon / self.cell_lon))
+
+    def _find(self, key: int) -> int:
+        root = key
+        while self._parent[root] != root:
+            root = self._parent[root]
+        # Path compression
+        while self._parent[key] != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def _union(self, a: int, b: int) -> int:
+        ra, rb = self._find(a), self._find(b)
+        if ra == rb:
+            return ra
+        # Keep the oldest persisted event as the survivor
+        if ra < 0 or (rb > 0 and rb < ra):
+            ra, rb = rb, ra
+        self._parent[rb] = ra
+        return ra
+
+    def _neighbours(self, lat: float, lon: float, at: datetime) -> Set[int]:
+        """Event roots with a member within the distance/time thresholds"""
+        ci, cj = self._cell(lat, lon)
+        found = set()
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for mlat, mlon, mat, key in self._grid.get((ci + di, cj + dj), ()):
+                    if abs(at - mat) > self.gap:
+                        continue
+                    if haversine_km(lat, lon, mlat, mlon) <= self.distance_km:
+                        found.add(self._find(key))
+        return found
+
+    def _index(self, lat: float, lon: float, at: datetime, key: int):
+        self._grid.setdefault(self._cell(lat, lon), []).append((lat, lon, at, key))
+
+    async def _load_active(self, earliest: datetime):
+        """Hash members of events still active around the new detections"""
+        cutoff = earliest - self.gap
+        result = await self.db.execute(
+            select(FireEvent).where(FireEvent.last_seen >= cutoff)
+        )
+        for event in result.scalars().all():
+            self._events[event.id] = event
+            self._parent[event.id] = event.id
+
+        if not self._events:
+            return
+
+        result = await self.db.execute(
+            select(
+                Hotspot.latitude, Hotspot.longitude, Hotspot.acq_date,
+                Hotspot.acq_time, Hotspot.fire_event_id
+            ).where(
+                Hotspot.fire_event_id.in_(list(self._events.keys())),
+                Hotspot.acq_date >= cutoff.date()
+            )
+        )
+        for lat, lon, acq_date, acq_time, event_id in result.all():
+            at = detection_time(acq_date, acq_time)
+            if at >= cutoff:
+                self._index(lat, lon, at, event_id)
+
+    def _new_event(self, h: Hotspot, at: datetime) -> int:
+        key = self._next_temp_key
+        self._next_temp_key -= 1
+        self._events[key] = FireEvent(
+            first_seen=at,
+            last_seen=at,
+            hotspot_count=0,
+            max_frp=0.0,
+            satellites="",
+            latitude=h.latitude,
+            longitude=h.longitude,
+            min_latitude=h.latitude,
+            max_latitude=h.latitude,
+            min_longitude=h.longitude,
+            max_longitude=h.longitude,
+            province=h.province,
+            district=h.district
+        )
+        self._parent[key] = key
+        return key
+
+    @staticmethod
+    def _add_point(event: FireEvent, h: Hotspot, at: datetime):
+        n = event.hotspot_count or 0
+        event.latitude = (event.latitude * n + h.latitude) / (n + 1)
+        event.longitude = (event.longitude * n + h.longitude) / (n + 1)
+        event.hotspot_count = n + 1
+        event.first_seen = min(event.first_seen, at)
+        event.last_seen = max(event.last_seen, at)
+        event.max_frp = max(event.max_frp or 0.0, h.frp or 0.0)
+        event.min_latitude = min(event.min_latitude, h.latitude)
+        event.max_latitude = max(event.max_latitude, h.latitude)
+        event.min_longitude = min(event.min_longitude, h.longitude)
+        event.max_longitude = max(event.max_longitude, h.longitude)
+        sats = set(filter(None, (event.satellites or "").split(",")))
+        if h.satellite and h.satellite not in sats:
+            sats.add(h.satellite)
+            event.satellites = ",".join(sorted(sats))
+
+    @staticmethod
+    def _absorb(event: FireEvent, other: FireEvent):
+        """Fold other's stats into event (used when two fires connect)"""
+        n, m = event.hotspot_count or 0, other.hotspot_count or 0
+        if n + m:
+            event.latitude = (event.latitude * n + other.latitude * m) / (n + m)
+            event.longitude = (event.longitude * n + other.longitude * m) / (n + m)
+        event.hotspot_count = n + m
+        event.first_seen = min(event.first_seen, other.first_seen)
+        event.last_seen = max(event.last_seen, other.last_seen)
+        event.max_frp = max(event.max_frp or 0.0, other.max_frp or 0.0)
+        event.min_latitude = min(event.min_latitude, other.min_latitude)
+        event.max_latitude = max(event.max_latitude, other.max_latitude)
+        event.min_longitude = min(event.min_longitude, other.min_longitude)
+        event.max_longitude = max(event.max_longitude, other.max_longitude)
+        sats = set(filter(None, (event.satellites or "").split(",")))
+        sats |= set(filter(None, (other.satellites or "").split(",")))
+        event.satellites = ",".join(sorted(sats))
+
+    @staticmethod
+    def _update_area(event: FireEvent):
+        """Approximate burning area: member bounding box padded by one pixel"""
+        lat_km = (event.max_latitude - event.min_latitude) * KM_PER_DEG_LAT
+        lon_km = (event.max_longitude - event.min_longitude) * KM_PER_DEG_LAT * math.cos(math.radians(event.latitude))
+        event.area_km2 = round((lat_km + PIXEL_KM) * (lon_km + PIXEL_KM), 3)
+
+    async def refresh(self, event_ids: Iterable[int]) -> int:
+        """
+        Recompute the stats of existing events from their member rows, for
+        members updated in place (ReconcileService). Membership is kept;
+        returns the number of events recomputed.
+        """
+        event_ids = sorted(set(filter(None, event_ids)))
+        if not event_ids:
+            return 0
+        result = await self.db.execute(select(FireEvent).where(FireEvent.id.in_(event_ids)))
+        events = {event.id: event for event in result.scalars().all()}
+        result = await self.db.execute(
+            select(
+                Hotspot.latitude, Hotspot.longitude, Hotspot.acq_date, Hotspot.acq_time,
+                Hotspot.satellite, Hotspot.frp, Hotspot.fire_event_id
+            ).where(Hotspot.fire_event_id.in_(list(events.keys())))
+        )
+        fresh: Set[int] = set()
+        for h in result.all():
+            event = events[h.fire_event_id]
+            at = detection_time(h.acq_date, h.acq_time)
+            if event.id not in fresh:
+                fresh.add(event.id)
+                event.hotspot_count = 0
+                event.max_frp = 0.0
+                event.satellites = ""
+                event.first_seen = event.last_seen = at
+                event.min_latitude = event.max_latitude = h.latitude
+                event.min_longitude = event.max_longitude = h.longitude
+            self._add_point(event, h, at)
+        for event_id in fresh:
+            self._update_area(events[event_id])
+        await self.db.flush()
+        return len(fresh)
+
+    async def assign(self, hotspots: Iterable[Hotspot]) -> Dict[str, Any]:
+        """
+        Cluster newly flushed hotspots into fire events and set their
+        fire_event_id. Runs inside the caller's transaction.
+        """
+        hotspots = sorted(
+            hotspots, key=lambda h: detection_time(h.acq_date, h.acq_time)
+        )
+        if not hotspots:
+            return {"fire_event_ids": [], "new_fire_events": 0, "merged_fire_events": 0, "merged_fire_event_ids": []}
+
+        await self._load_active(detection_time(hotspots[0].acq_date, hotspots[0].acq_time))
+
+        assignments: List[Tuple[Hotspot, int]] = []
+        for h in hotspots:
+            at = detection_time(h.acq_date, h.acq_time)
+            roots = self._neighbours(h.latitude, h.longitude, at)
+            if roots:
+                root = roots.pop()
+                for other in roots:
+                    root = self._union(root, other)
+            else:
+                root = self._new_event(h, at)
+            self._index(h.latitude, h.longitude, at, root)
+            assignments.append((h, root))
+
+        # Fold merged events into their survivors
+        merged_ids = []
+        for key in list(self._events.keys()):
+            root = self._find(key)
+            if root != key:
+                self._absorb(self._events[root], self._events[key])
+                if key > 0:
+                    merged_ids.append(key)
+
+        touched: Dict[int, FireEvent] = {}
+        for h, key in assignments:
+            root = self._find(key)
+            event = self._events[root]
+            self._add_point(event, h, detection_time(h.acq_date, h.acq_time))
+            touched[root] = event
+
+        new_events = [e for k, e in touched.items() if k < 0]
+        for event in touched.values():
+            self._update_area(event)
+        self.db.add_all(new_events)
+        await self.db.flush()
+
+        for h, key in assignments:
+            h.fire_event_id = self._events[self._find(key)].id
+
+        if merged_ids:
+            # Re-point earlier detections of merged events, then drop them
+            for old_id in merged_ids:
+                survivor = self._events[self._find(old_id)].id
+                await self.db.execute(
+                    update(Hotspot).where(Hotspot.fire_event_id == old_id).values(fire_event_id=survivor)
+                )
+            await self.db.execute(delete(FireEvent).where(FireEvent.id.in_(merged_ids)))
+            logger.info(f"Merged {len(merged_ids)} fire events into connected fires")
+
+        fire_event_ids = sorted(e.id for e in touched.values())
+        logger.info(
+            f"Clustered {len(hotspots)} detections into {len(fire_event_ids)} fire events "
+            f"({len(new_events)} new)"
+        )
+        return {
+            "fire_event_ids": fire_event_ids,
+            "new_fire_events": len(new_events),
+            "merged_fire_events": len(merged_ids),
+            # Deleted by this call; callers holding event ids should drop them
+            "merged_fire_event_ids": sorted(merged_ids)
+        }
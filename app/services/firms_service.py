@@ -1,79 +1,183 @@
+import asyncio
 import httpx
 import csv
 import logging
 import io
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from ..config import get_settings
+from ..utils.timing import StageTimer
+from ..utils.metrics import FIRMS_REQUESTS, FIRMS_REQUEST_DURATION, FIRMS_RESPONSE_BYTES, FIRMS_QUOTA_SPENT
+from ..utils.shared_batch import SharedBatch, share_records, batch_to_records
+from .offload_service import process_offloader
+from .source_registry import source_registry
+from .availability_service import availability_probe
+from .key_pool import key_pool, key_error
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Columnar layout of parsed rows for shared-memory batches
+FLOAT_FIELDS = ("latitude", "longitude", "brightness", "scan", "track", "bright_t31", "frp")
+CATEGORY_FIELDS = ("acq_date", "acq_time", "satellite", "instrument", "confidence", "version", "daynight")
+
 class FIRMSService:
     """
     NASA FIRMS API Integration
     Documentation: https://firms.modaps.eosdis.nasa.gov/api/area/
     """
     
-    BASE_URL = "https://firms.modaps.eosdis.nasa.gov/api/area/csv"
+    BASE_URL = settings.FIRMS_BASE_URL.rstrip("/")
     
-    SOURCES = [
-        "VIIRS_SNPP_NRT",
-        "VIIRS_NOAA20_NRT",
-        "VIIRS_NOAA21_NRT"
-    ]
+    # Enabled products (FIRMS_SOURCES), see source_registry
+    SOURCES = source_registry.products()
     
     def __init__(self):
-        self.map_key = settings.FIRMS_MAP_KEY
         self.area = f"{settings.AREA_WEST},{settings.AREA_SOUTH},{settings.AREA_EAST},{settings.AREA_NORTH}"
         
-    async def get_hotspots(
+    async def fetch_csv(
         self,
         source: str = "VIIRS_SNPP_NRT",
-        day_range: int = 2
-    ) -> List[Dict[str, Any]]:
+        day_range: int = 2,
+        timer: Optional[StageTimer] = None
+    ) -> Optional[str]:
         """
-        Fetch hotspots from FIRMS API for a specific source
+        Download the raw area CSV for one source; None on HTTP errors or an
+        error body
         """
-        url = f"{self.BASE_URL}/{self.map_key}/{source}/{self.area}/{day_range}"
+        spec = source_registry.get(source)
+        timer = timer or StageTimer()
         
         logger.info(f"Fetching hotspots from FIRMS: {source} (range: {day_range})")
         
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                content = response.text
-                if not content or "invalid key" in content.lower():
-                    logger.error(f"FIRMS API Error: {content}")
-                    return []
-                
-                return self._parse_csv(content, source)
-                
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP Error fetching FIRMS data: {e}")
+        # A key FIRMS rejects is quarantined and the request retried on the next one
+        for _ in range(max(1, len(key_pool))):
+            key = key_pool.acquire(spec.quota_cost)
+            if key is None:
+                return None
+            url = f"{self.BASE_URL}/{key.key}/{source}/{self.area}/{day_range}"
+            try:
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    try:
+                        with timer.span(f"fetch.{source}", key=key.label) as span:
+                            response = await client.get(url)
+                            span["status"] = response.status_code
+                            span["bytes"] = len(response.content)
+                    finally:
+                        FIRMS_REQUESTS.inc(source=source, status=span.get("status", "error"))
+                        FIRMS_QUOTA_SPENT.inc(spec.quota_cost, source=source)
+                        FIRMS_REQUEST_DURATION.observe(span.get("ms", 0) / 1000.0, source=source)
+                        FIRMS_RESPONSE_BYTES.inc(span.get("bytes", 0), source=source)
+                    
+                    key_status = key_error(response)
+                    if key_status:
+                        key_pool.report(key, key_status)
+                        logger.error(f"FIRMS API Error ({key.label}): {response.text[:200]}")
+                        continue
+                    response.raise_for_status()
+                    key_pool.report(key, "ok")
+                    
+                    content = response.text
+                    if not content:
+                        logger.error("FIRMS API Error: empty response")
+                        return None
+                    return content
+                    
+            except httpx.HTTPError as e:
+                key_pool.report(key, "error")
+                logger.error(f"HTTP Error fetching FIRMS data: {e}")
+                return None
+            except Exception as e:
+                logger.error(f"Unexpected error fetching FIRMS data: {e}")
+                return None
+        return None
+
+    async def should_fetch(self, source: str, day_range: int = 2) -> bool:
+        """Ask the (shared, cached) availability probe whether an area pull can find anything"""
+        if not settings.FIRMS_AVAILABILITY_PROBE:
+            return True
+        return await availability_probe.should_fetch(source, day_range)
+
+    def parse(self, content: str, source: str, timer: Optional[StageTimer] = None) -> List[Dict[str, Any]]:
+        """Parse a downloaded CSV, recorded as the parse.<source> span"""
+        timer = timer or StageTimer()
+        with timer.span(f"parse.{source}") as span:
+            hotspots = self._parse_csv(content, source)
+            span["rows"] = len(hotspots)
+        availability_probe.note_ingested(source, hotspots)
+        return hotspots
+
+    async def parse_async(
+        self,
+        content: str,
+        source: str,
+        timer: Optional[StageTimer] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        parse() that keeps large payloads off the event loop: above the
+        offload threshold the CSV is parsed in a worker process and comes
+        back as a shared-memory batch
+        """
+        if not process_offloader.should_offload(len(content)):
+            return self.parse(content, source, timer)
+        timer = timer or StageTimer()
+        with timer.span(f"parse.{source}", offloaded=True) as span:
+            try:
+                batch = await process_offloader.run(parse_csv_shared, content, source)
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning(f"Parse offload failed, parsing {source} inline: {e}")
+                process_offloader.shutdown()
+                batch = None
+                hotspots = self._parse_csv(content, source)
+            else:
+                hotspots = await batch_to_records(batch)
+            span["rows"] = len(hotspots)
+        availability_probe.note_ingested(source, hotspots)
+        return hotspots
+
+    async def get_hotspots(
+        self,
+        source: str = "VIIRS_SNPP_NRT",
+        day_range: int = 2,
+        timer: Optional[StageTimer] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch hotspots from FIRMS API for a specific source
+        """
+        if not await self.should_fetch(source, day_range):
             return []
+        content = await self.fetch_csv(source, day_range, timer)
+        if content is None:
+            return []
+        try:
+            return self.parse(content, source, timer)
         except Exception as e:
             logger.error(f"Unexpected error fetching FIRMS data: {e}")
             return []
 
-    async def get_all_sources(self, day_range: int = 2) -> List[Dict[str, Any]]:
+    async def get_all_sources(
+        self,
+        day_range: int = 2,
+        timer: Optional[StageTimer] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Fetch from all VIIRS sources and combine
+        Fetch from all enabled sources and combine
         """
-        all_hotspots = []
-        for source in self.SOURCES:
-            hotspots = await self.get_hotspots(source, day_range)
-            all_hotspots.extend(hotspots)
+        # Concurrent, so each extra source costs quota but not wall time
+        results = await asyncio.gather(*(self.get_hotspots(s, day_range, timer) for s in self.SOURCES))
+        all_hotspots = [h for hotspots in results for h in hotspots]
             
         logger.info(f"Combined {len(all_hotspots)} hotspots from all sources")
         return all_hotspots
 
     def _parse_csv(self, csv_data: str, source: str) -> List[Dict[str, Any]]:
         """
-        Parse CSV response from FIRMS API
+        Parse CSV response from FIRMS API, reading columns and confidence
+        the way the source's registry entry describes
         """
+        spec = source_registry.get(source)
+        brightness, bright_t31 = spec.column("brightness"), spec.column("bright_t31")
         f = io.StringIO(csv_data)
         reader = csv.DictReader(f)
         
@@ -88,17 +192,17 @@ class FIRMSService:
                 hotspot = {
                     "latitude": float(row["latitude"]),
                     "longitude": float(row["longitude"]),
-                    "brightness": float(row.get("brightness", 0)),
-                    "scan": float(row.get("scan", 0)),
-                    "track": float(row.get("track", 0)),
+                    "brightness": float(row.get(brightness) or 0),
+                    "scan": float(row.get("scan") or 0),
+                    "track": float(row.get("track") or 0),
                     "acq_date": th_dt.strftime("%Y-%m-%d"),
                     "acq_time": th_dt.strftime("%H%M"),
-                    "satellite": source.replace("_NRT", ""),
-                    "instrument": row.get("instrument", ""),
-                    "confidence": self._map_confidence(row.get("confidence", "")),
+                    "satellite": spec.satellite,
+                    "instrument": row.get("instrument", spec.instrument),
+                    "confidence": spec.confidence(row.get("confidence", "")),
                     "version": row.get("version", ""),
-                    "bright_t31": float(row.get("bright_t31", 0)),
-                    "frp": float(row.get("frp", 0)),
+                    "bright_t31": float(row.get(bright_t31) or 0),
+                    "frp": float(row.get("frp") or 0),
                     "daynight": row.get("daynight", "D")
                 }
                 hotspots.append(hotspot)
@@ -108,21 +212,7 @@ class FIRMSService:
                 
         return hotspots
 
-    def _map_confidence(self, conf: str) -> str:
-        """Map confidence values to human readable strings"""
-        if not conf:
-            return "nominal"
-        
-        # VIIRS uses l, n, h
-        if conf.lower() == 'h': return 'high'
-        if conf.lower() == 'n': return 'nominal'
-        if conf.lower() == 'l': return 'low'
-        
-        # MODIS uses 0-100
-        try:
-            val = int(conf)
-            if val >= 80: return 'high'
-            if val >= 30: return 'nominal'
-            return 'low'
-        except ValueError:
-            return conf
+
+def parse_csv_shared(csv_data: str, source: str) -> Optional[SharedBatch]:
+    """Process-pool entry point: FIRMSService._parse_csv into a shared batch"""
+    return share_records(FIRMSService()._parse_csv(csv_data, source), FLOAT_FIELDS, CATEGORY_FIELDS)
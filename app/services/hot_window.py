@@ -0,0 +1,190 @@
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Hotspot
+from ..utils.formatting import format_acq_time
+from .reconcile_service import is_nrt
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+THAI_TZ = timezone(timedelta(hours=7))
+
+# (latitude, longitude, acq_date, acq_time, satellite): the _hotspot_uc identity
+HotspotKey = Tuple[float, float, date, time, str]
+
+# Per-day columns, in the order of the dashboard listing
+COLUMNS = ("id", "latitude", "longitude", "acq_time", "satellite", "confidence", "frp", "province")
+
+
+class HotWindowStore:
+    """
+    The last few days of detections, held in memory.
+
+    Checks only ever re-fetch the last ~48 hours and the dashboard's
+    today/yesterday view reads the same range, so both are answered from
+    here instead of the database: a hash set of dedup keys plus one
+    columnar bucket per Thai-local acq_date. Buckets older than `days`
+    are evicted as the date rolls over.
+
+    The database stays the source of truth. The store is warmed from it at
+    startup, the ingest path adds rows after each commit, and a periodic
+    resync picks up writes from other processes (backfills, scripts). Each
+    check also verify()s the window against the database first, and the
+    hotspot insert skips conflicting rows, so a stale window never fails
+    a check or drops a detection.
+    Until warm() has run, covers() is False and callers use the database.
+    """
+
+    def __init__(self, days: int = 3):
+        self.days = days
+        self.ready = False
+        self._buckets: Dict[date, Dict[str, List[Any]]] = {}
+        self._keys: Set[HotspotKey] = set()
+        # Per-day count of standard-processing rows, which reconcile writes in place
+        self._reprocessed: Dict[date, int] = {}
+        # Rows added while a warm() query is in flight, replayed onto its result
+        self._pending: Optional[List[Tuple]] = None
+
+    def cutoff(self) -> date:
+        return datetime.now(THAI_TZ).date() - timedelta(days=self.days - 1)
+
+    def covers(self, acq_date: date) -> bool:
+        """True if the store can answer for this date without the database"""
+        return self.ready and acq_date >= self.cutoff()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _evict(self):
+        cutoff = self.cutoff()
+        for day in [d for d in self._buckets if d < cutoff]:
+            bucket = self._buckets.pop(day)
+            self._reprocessed.pop(day, None)
+            for lat, lon, acq_time, satellite in zip(
+                bucket["latitude"], bucket["longitude"], bucket["acq_time"], bucket["satellite"]
+            ):
+                self._keys.discard((lat, lon, day, acq_time, satellite))
+
+    def _add_row(
+        self, row: Tuple, buckets: Dict[date, Dict[str, List[Any]]], keys: Set[HotspotKey],
+        reprocessed: Dict[date, int], cutoff: date
+    ):
+        hid, lat, lon, acq_date, acq_time, satellite, confidence, frp, province, version = row
+        key = (lat, lon, acq_date, acq_time, satellite)
+        if acq_date < cutoff or key in keys:
+            return
+        keys.add(key)
+        if not is_nrt(version):
+            reprocessed[acq_date] = reprocessed.get(acq_date, 0) + 1
+        bucket = buckets.get(acq_date)
+        if bucket is None:
+            bucket = buckets[acq_date] = {name: [] for name in COLUMNS}
+        for name, value in zip(COLUMNS, (hid, lat, lon, acq_time, satellite, confidence, frp, province)):
+            bucket[name].append(value)
+
+    def add(self, hotspots: Iterable[Any]):
+        """Record committed Hotspot rows (ORM objects)"""
+        rows = [
+            (
+                h.id, h.latitude, h.longitude, h.acq_date, h.acq_time,
+                h.satellite, h.confidence, h.frp, h.province, h.version
+            )
+            for h in hotspots
+        ]
+        if self._pending is not None:
+            self._pending.extend(rows)
+        if not self.ready:
+            return
+        self._evict()
+        cutoff = self.cutoff()
+        for row in rows:
+            self._add_row(row, self._buckets, self._keys, self._reprocessed, cutoff)
+
+    async def warm(self, db: AsyncSession) -> int:
+        """(Re)load the window from the database"""
+        self._pending = []
+        try:
+            cutoff = self.cutoff()
+            result = await db.execute(
+                select(
+                    Hotspot.id, Hotspot.latitude, Hotspot.longitude, Hotspot.acq_date, Hotspot.acq_time,
+                    Hotspot.satellite, Hotspot.confidence, Hotspot.frp, Hotspot.province, Hotspot.version
+                ).where(Hotspot.acq_date >= cutoff).order_by(Hotspot.id)
+            )
+            buckets: Dict[date, Dict[str, List[Any]]] = {}
+            keys: Set[HotspotKey] = set()
+            reprocessed: Dict[date, int] = {}
+            for row in result.all():
+                self._add_row(tuple(row), buckets, keys, reprocessed, cutoff)
+            # Commits that landed while the query ran
+            for row in self._pending:
+                self._add_row(row, buckets, keys, reprocessed, cutoff)
+        finally:
+            self._pending = None
+        self._buckets, self._keys, self._reprocessed = buckets, keys, reprocessed
+        self.ready = True
+        logger.info(f"Hot window warmed: {len(keys)} hotspots since {cutoff}")
+        return len(keys)
+
+    async def verify(self, db: AsyncSession) -> bool:
+        """
+        Compare row count, highest id and the number of standard-processing
+        rows since the cutoff with the database and re-warm on any
+        difference: rows inserted or deleted by another process, or NRT rows
+        replaced in place by reconcile (same ids, new values). One aggregate
+        query; False if a reload was needed.
+        """
+        if not self.ready:
+            return True
+        self._evict()
+        cutoff = self.cutoff()
+        count, max_id, reprocessed = (await db.execute(
+            select(
+                func.count(Hotspot.id), func.max(Hotspot.id),
+                func.coalesce(func.sum(case((func.coalesce(Hotspot.version, "").like("%NRT"), 0), else_=1)), 0)
+            ).where(Hotspot.acq_date >= cutoff)
+        )).one()
+        ids = [hid for day, bucket in self._buckets.items() if day >= cutoff for hid in bucket["id"]]
+        held = sum(n for day, n in self._reprocessed.items() if day >= cutoff)
+        if count == len(ids) and max_id == (max(ids) if ids else None) and reprocessed == held:
+            return True
+        logger.warning(f"Hot window out of sync ({len(ids)} rows held, {count} in database), reloading")
+        await self.warm(db)
+        return False
+
+    def contains(self, key: HotspotKey) -> bool:
+        return key in self._keys
+
+    def listing(self, dates: Iterable[date]) -> List[Dict[str, Any]]:
+        """
+        Hotspots on the given dates shaped like the dashboard listing,
+        newest first (same order as the /api/hotspots/today query)
+        """
+        self._evict()
+        items = []
+        for day in sorted(set(dates), reverse=True):
+            bucket = self._buckets.get(day)
+            if not bucket:
+                continue
+            times = bucket["acq_time"]
+            acq_date = day.isoformat()
+            for i in sorted(range(len(times)), key=times.__getitem__, reverse=True):
+                items.append({
+                    "id": bucket["id"][i],
+                    "latitude": bucket["latitude"][i],
+                    "longitude": bucket["longitude"][i],
+                    "acq_date": acq_date,
+                    "acq_time": format_acq_time(times[i]),
+                    "satellite": bucket["satellite"][i],
+                    "confidence": bucket["confidence"][i],
+                    "frp": bucket["frp"][i],
+                    "province": bucket["province"][i]
+                })
+        return items
+
+
+hot_window = HotWindowStore(settings.HOT_WINDOW_DAYS)
@@ -0,0 +1,137 @@
+import logging
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+import httpx
+from ..config import get_settings
+from ..utils.metrics import FIRMS_KEY_REQUESTS, FIRMS_KEY_QUOTA_REMAINING, FIRMS_KEY_QUARANTINED
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class MapKey:
+    def __init__(self, key: str, weight: int, index: int):
+        self.key = key
+        self.weight = max(1, weight)
+        # Metric label / log name (position in FIRMS_MAP_KEYS), never the key itself
+        self.label = f"key{index}"
+        self.current = 0
+        self.quarantined_until = 0.0
+        self._spent: Deque[Tuple[float, int]] = deque()
+
+    def spent(self, now: float, window: float) -> int:
+        while self._spent and self._spent[0][0] <= now - window:
+            self._spent.popleft()
+        return sum(cost for _, cost in self._spent)
+
+    def spend(self, now: float, cost: int):
+        self._spent.append((now, cost))
+
+
+class MapKeyPool:
+    """
+    FIRMS MAP_KEYs shared by every request the process makes.
+
+    Each key's transactions are counted over FIRMS's rolling quota window,
+    and requests are handed out by smooth weighted round-robin among the
+    keys that still have quota for them, so parallel fetch workers spread
+    over the pool in proportion to the keys' weights. A key that FIRMS
+    rejects as invalid, or reports over quota, is quarantined and skipped
+    until it expires. When nothing is left acquire() returns None and the
+    caller skips the request.
+    """
+
+    def __init__(
+        self,
+        keys: List[Tuple[str, int]],
+        quota: int,
+        window_seconds: float,
+        invalid_quarantine_seconds: float
+    ):
+        self.keys = [MapKey(key, weight, i) for i, (key, weight) in enumerate(keys, 1)]
+        self.quota = quota
+        self.window_seconds = window_seconds
+        self.invalid_quarantine_seconds = invalid_quarantine_seconds
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def remaining(self, key: MapKey, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        return max(0, self.quota - key.spent(now, self.window_seconds))
+
+    def acquire(self, cost: int = 1) -> Optional[MapKey]:
+        """Pick a key for a request costing `cost` transactions and book them"""
+        now = time.monotonic()
+        usable = [
+            k for k in self.keys
+            if k.quarantined_until <= now and self.remaining(k, now) >= cost
+        ]
+        if not usable:
+            logger.warning(f"No FIRMS MAP_KEY with {cost} transaction(s) left (pool of {len(self.keys)})")
+            return None
+        # Smooth weighted round-robin (even interleaving, no bursts on the heaviest key)
+        total = sum(k.weight for k in usable)
+        for k in usable:
+            k.current += k.weight
+        chosen = max(usable, key=lambda k: k.current)
+        chosen.current -= total
+        chosen.spend(now, cost)
+        self._export(chosen, now)
+        return chosen
+
+    def report(self, key: MapKey, status: str):
+        """Outcome of a request made with key: ok, invalid, quota or error"""
+        FIRMS_KEY_REQUESTS.inc(key=key.label, status=status)
+        now = time.monotonic()
+        if status == "invalid":
+            key.quarantined_until = now + self.invalid_quarantine_seconds
+            logger.error(f"FIRMS rejected MAP_KEY {key.label} as invalid, quarantined")
+        elif status == "quota":
+            # FIRMS counts differently from us; stop using the key for a whole window
+            key.quarantined_until = now + self.window_seconds
+            logger.warning(f"FIRMS MAP_KEY {key.label} over quota, quarantined for {self.window_seconds:.0f}s")
+        self._export(key, now)
+
+    def _export(self, key: MapKey, now: float):
+        FIRMS_KEY_QUOTA_REMAINING.set(self.remaining(key, now), key=key.label)
+        FIRMS_KEY_QUARANTINED.set(1 if key.quarantined_until > now else 0, key=key.label)
+
+
+def key_error(response: httpx.Response) -> Optional[str]:
+    """'invalid' or 'quota' when FIRMS refused the request because of its MAP_KEY"""
+    if response.status_code == 429:
+        return "quota"
+    head = response.text[:200].lower()
+    if "invalid map_key" in head or "invalid key" in head:
+        return "invalid"
+    if "transaction limit" in head or "exceeding" in head:
+        return "quota"
+    return None
+
+
+def parse_keys(spec: str, fallback: str) -> List[Tuple[str, int]]:
+    """'key1:3,key2' -> [("key1", 3), ("key2", 1)]; the single FIRMS_MAP_KEY if spec is empty"""
+    keys = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, _, weight = item.partition(":")
+        try:
+            keys.append((key.strip(), int(weight) if weight else 1))
+        except ValueError:
+            logger.warning(f"Ignoring bad weight in FIRMS_MAP_KEYS entry {len(keys) + 1}")
+            keys.append((key.strip(), 1))
+    if not keys and fallback:
+        keys.append((fallback.strip(), 1))
+    return keys
+
+
+key_pool = MapKeyPool(
+    parse_keys(settings.FIRMS_MAP_KEYS, settings.FIRMS_MAP_KEY),
+    settings.FIRMS_KEY_QUOTA,
+    settings.FIRMS_KEY_QUOTA_WINDOW_SECONDS,
+    settings.FIRMS_KEY_INVALID_QUARANTINE_SECONDS
+)
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import json
+import time
 from typing import List, Dict, Any, Optional
 from linebot.v3.messaging import (
     Configuration,
@@ -11,11 +12,23 @@ from linebot.v3.messaging import (
     FlexMessage,
     FlexContainer
 )
+from urllib3.exceptions import MaxRetryError, ReadTimeoutError
 from ..config import get_settings
+from ..utils.metrics import LINE_PUSH_DURATION, LINE_PUSH_FAILURES
+from .source_registry import source_registry
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+class LINEDeliveryUnknown(Exception):
+    """
+    The push request was sent but no response came back within
+    LINE_PUSH_TIMEOUT_SECONDS: the message may or may not have reached
+    the chat, so callers must not treat it as unsent and retry.
+    """
+
+
 class LINEService:
     """
     LINE Messaging API Integration
@@ -23,12 +36,21 @@ class LINEService:
     """
     
     def __init__(self):
-        self.configuration = Configuration(access_token=settings.LINE_CHANNEL_ACCESS_TOKEN.strip())
+        self.configuration = Configuration(
+            host=settings.LINE_API_BASE_URL.rstrip("/"),
+            access_token=settings.LINE_CHANNEL_ACCESS_TOKEN.strip()
+        )
         
     async def push_message(self, to: str, messages: List[Any]):
         """
         Send push message to a user or group (Async wrapper for Sync SDK)
+
+        The SDK call runs in a thread and cannot be cancelled, so it is
+        bounded by its own HTTP timeout. A connect timeout means nothing was
+        sent and is raised as-is; a read timeout raises LINEDeliveryUnknown.
         """
+        timeout = settings.LINE_PUSH_TIMEOUT_SECONDS
+
         def _push():
             with ApiClient(self.configuration) as api_client:
                 line_bot_api = MessagingApi(api_client)
@@ -37,14 +59,28 @@ class LINEService:
                         to=to,
                         messages=messages
                     )
-                    line_bot_api.push_message(push_message_request)
+                    line_bot_api.push_message(push_message_request, _request_timeout=timeout)
                     logger.info(f"Successfully sent LINE push message to {to}")
+                except (ReadTimeoutError, MaxRetryError) as e:
+                    reason = getattr(e, "reason", e)
+                    if isinstance(reason, ReadTimeoutError):
+                        logger.error(f"No response from LINE within {timeout}s, delivery unknown: {e}")
+                        raise LINEDeliveryUnknown(str(e)) from e
+                    logger.error(f"Error sending LINE push message: {e}")
+                    raise e
                 except Exception as e:
                     logger.error(f"Error sending LINE push message: {e}")
                     raise e
 
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, _push)
+        start = time.perf_counter()
+        try:
+            await loop.run_in_executor(None, _push)
+        except Exception:
+            LINE_PUSH_FAILURES.inc()
+            raise
+        finally:
+            LINE_PUSH_DURATION.observe(time.perf_counter() - start)
 
     async def send_hotspot_alert(
         self,
@@ -75,7 +111,7 @@ class LINEService:
         from datetime import datetime, timezone, timedelta
         
         if all_satellites is None:
-            all_satellites = ["VIIRS_SNPP", "VIIRS_NOAA20", "VIIRS_NOAA21"]
+            all_satellites = source_registry.expected_satellites()
         
         # Robust Thai timezone (UTC+7)
         thai_tz = timezone(timedelta(hours=7))
@@ -84,15 +120,16 @@ class LINEService:
         # Build satellite summary lines
         sat_lines = []
         total = 0
-        for sat in all_satellites:
+        extra = [sat for sat in satellites_data if sat not in all_satellites]
+        for sat in all_satellites + extra:
             if sat in satellites_data:
                 data = satellites_data[sat]
-                sat_name = sat.replace("VIIRS_", "")
+                sat_name = source_registry.label(sat)
                 sat_lines.append(f"🛰️ {sat_name} - {data['count']} จุด (ถ่าย {data['time']})")
                 total += data["count"]
         
-        # Count how many satellites reported
-        reported_count = len(satellites_data)
+        # Count how many of the expected satellites reported
+        reported_count = sum(1 for sat in all_satellites if sat in satellites_data)
         
         logger.info(f"Preparing satellite alert: total={total}, sats={reported_count}")
         
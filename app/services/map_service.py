@@ -0,0 +1,171 @@
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, desc
+from ..models import Hotspot
+from ..utils.geo_utils import GRID_ZOOM, lonlat_to_grid, lonlat_to_world
+from ..utils.formatting import format_acq_time
+from ..utils.mvt import EXTENT, encode_point_layer
+
+logger = logging.getLogger(__name__)
+
+class MapService:
+    """
+    Map outputs for hotspots: GeoJSON and Mapbox Vector Tiles.
+
+    Tiles are clustered server-side on the integer grid_x/grid_y columns:
+    at low zooms points are grouped into a 2^CLUSTER_BITS square grid per tile with
+    a GROUP BY, at high zooms raw points are returned.
+    """
+
+    LAYER_NAME = "hotspots"
+
+    # 2^6 = 64x64 cluster cells per tile
+    CLUSTER_BITS = 6
+
+    MAX_GEOJSON_FEATURES = 20000
+    MAX_TILE_POINTS = 10000
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    def _date_filters(self, start_date: Optional[date], end_date: Optional[date]) -> List[Any]:
+        filters = []
+        if start_date:
+            filters.append(Hotspot.acq_date >= start_date)
+        if end_date:
+            filters.append(Hotspot.acq_date <= end_date)
+        return filters
+
+    async def get_geojson(
+        self,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        satellite: Optional[str] = None,
+        limit: int = MAX_GEOJSON_FEATURES
+    ) -> Dict[str, Any]:
+        """Hotspots as a GeoJSON FeatureCollection, newest first"""
+        filters = self._date_filters(start_date, end_date)
+        if bbox:
+            west, south, east, north = bbox
+            filters.extend([
+                Hotspot.longitude.between(west, east),
+                Hotspot.latitude.between(south, north),
+            ])
+        if satellite:
+            filters.append(Hotspot.satellite == satellite)
+
+        stmt = select(
+            Hotspot.id, Hotspot.latitude, Hotspot.longitude, Hotspot.acq_date,
+            Hotspot.acq_time, Hotspot.satellite, Hotspot.confidence, Hotspot.frp
+        ).where(*filters).order_by(
+            desc(Hotspot.acq_date), desc(Hotspot.acq_time)
+        ).limit(min(limit, self.MAX_GEOJSON_FEATURES))
+
+        result = await self.db.execute(stmt)
+        features = [{
+            "type": "Feature",
+            "id": hid,
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {
+                "acq_date": acq_date.isoformat(),
+                "acq_time": format_acq_time(acq_time),
+                "satellite": satellite,
+                "confidence": confidence,
+                "frp": frp
+            }
+        } for hid, lat, lon, acq_date, acq_time, satellite, confidence, frp in result.all()]
+
+        return {"type": "FeatureCollection", "features": features}
+
+    @staticmethod
+    def _to_tile_pixels(lon: float, lat: float, z: int, x: int, y: int) -> Tuple[int, int]:
+        wx, wy = lonlat_to_world(lon, lat)
+        n = 1 << z
+        px = int((wx * n - x) * EXTENT)
+        py = int((wy * n - y) * EXTENT)
+        return min(max(px, 0), EXTENT - 1), min(max(py, 0), EXTENT - 1)
+
+    async def get_tile(
+        self,
+        z: int,
+        x: int,
+        y: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> bytes:
+        """Encode one z/x/y tile of hotspots (clustered below max zoom)"""
+        shift = GRID_ZOOM - z
+        filters = self._date_filters(start_date, end_date) + [
+            Hotspot.grid_x.between(x << shift, ((x + 1) << shift) - 1),
+            Hotspot.grid_y.between(y << shift, ((y + 1) << shift) - 1),
+        ]
+
+        features = []
+        cluster_shift = shift - self.CLUSTER_BITS
+        if cluster_shift > 0:
+            cell = 1 << cluster_shift
+            cell_x = (Hotspot.grid_x // cell).label("cell_x")
+            cell_y = (Hotspot.grid_y // cell).label("cell_y")
+            stmt = select(
+                func.count().label("count"),
+                func.max(Hotspot.frp).label("max_frp"),
+                func.avg(Hotspot.longitude).label("lon"),
+                func.avg(Hotspot.latitude).label("lat"),
+            ).where(*filters).group_by(cell_x, cell_y)
+
+            result = await self.db.execute(stmt)
+            for count, max_frp, lon, lat in result.all():
+                px, py = self._to_tile_pixels(lon, lat, z, x, y)
+                features.append((None, px, py, {
+                    "count": int(count),
+                    "max_frp": float(max_frp or 0.0),
+                    "cluster": count > 1
+                }))
+        else:
+            stmt = select(
+                Hotspot.id, Hotspot.longitude, Hotspot.latitude, Hotspot.frp,
+                Hotspot.satellite, Hotspot.confidence, Hotspot.acq_date, Hotspot.acq_time
+            ).where(*filters).limit(self.MAX_TILE_POINTS)
+
+            result = await self.db.execute(stmt)
+            for hid, lon, lat, frp, satellite, confidence, acq_date, acq_time in result.all():
+                px, py = self._to_tile_pixels(lon, lat, z, x, y)
+                features.append((hid, px, py, {
+                    "count": 1,
+                    "max_frp": float(frp or 0.0),
+                    "cluster": False,
+                    "satellite": satellite,
+                    "confidence": confidence,
+                    "acq_date": acq_date.isoformat(),
+                    "acq_time": format_acq_time(acq_time)
+                }))
+
+        return encode_point_layer(self.LAYER_NAME, features)
+
+    async def backfill_grid(self, batch_size: int = 1000) -> int:
+        """Fill grid_x/grid_y for rows stored before the columns existed"""
+        total = 0
+        while True:
+            result = await self.db.execute(
+                select(Hotspot.id, Hotspot.longitude, Hotspot.latitude)
+                .where(Hotspot.grid_x.is_(None))
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            params = []
+            for hid, lon, lat in rows:
+                gx, gy = lonlat_to_grid(lon, lat)
+                params.append({"id": hid, "grid_x": gx, "grid_y": gy})
+            # ORM bulk UPDATE by primary key (executemany)
+            await self.db.execute(update(Hotspot), params)
+            await self.db.commit()
+            total += len(rows)
+
+        if total:
+            logger.info(f"Backfilled map grid for {total} hotspots")
+        return total
@@ -1,17 +1,36 @@
 import logging
 import uuid
-from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timezone, timedelta
+from typing import List, Dict, Any, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from ..models import Hotspot, Notification, CheckLog, Setting
+from sqlalchemy import select, update, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from ..models import Hotspot, Notification, NotificationHotspot, CheckLog, Setting
 from .firms_service import FIRMSService
-from .line_service import LINEService
+from .line_service import LINEService, LINEDeliveryUnknown
+from .cache_service import response_cache
+from .event_service import event_broker
+from .hot_window import hot_window, HotspotKey
+from .fire_event_service import FireEventService
+from .stats_service import StatsService
+from ..utils.formatting import hotspot_to_dict
+from ..utils.timing import StageTimer, summarize_timings
+from ..utils.deadline import Deadline
+from ..utils.pipeline import Pipeline
+from ..utils.bulk_insert import bulk_insert
+from ..utils.metrics import CHECK_DURATION, CHECK_ROWS, observe_stages
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Hotspot ids per UPDATE ... WHERE id IN (...) (stays under sqlite's bind-parameter limit)
+MARK_CHUNK = 500
+# Rows per multi-VALUES hotspot insert (~20 columns each)
+INSERT_CHUNK = 500
+HOTSPOT_KEY_COLUMNS = ["latitude", "longitude", "acq_date", "acq_time", "satellite"]
+
 class NotificationService:
     def __init__(
         self,
@@ -23,40 +42,46 @@ class NotificationService:
         self.line_service = line_service
         self.db = db_session
         
-    async def check_and_notify(self, manual_trigger: bool = False) -> Dict[str, Any]:
+    async def check_and_notify(
+        self,
+        manual_trigger: bool = False,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
-        Main check routine: fetch, filter, save, and notify
+        Main check routine: fetch, filter, save, and notify.
+
+        Runs within `deadline` (a fresh CHECK_DEADLINE_SECONDS budget by
+        default). Work cut by it is listed in the result's "missed" and the
+        check is logged as "partial"; whatever was stored before is still
+        committed.
         """
         start_time = datetime.now()
+        timer = StageTimer()
+        if deadline is None:
+            deadline = Deadline(settings.CHECK_DEADLINE_SECONDS, settings.CHECK_DEADLINE_RESERVE_SECONDS)
         logger.info(f"Starting {'manual' if manual_trigger else 'scheduled'} check-and-notify routine at {start_time}")
         
         try:
-            # 1. Fetch from FIRMS
-            hotspots_data = await self.firms.get_all_sources()
-            total_found = len(hotspots_data)
-            
-            # 1.5. No longer filtering by 'today' here to ensure we catch all 24h data
-            # The API call already limits to 24h (day_range=2 now)
-            # We want to save and potentially notify all hotspots returned
-            today_hotspots = hotspots_data
-            
-            logger.info(f"Processing {len(today_hotspots)} hotspots from API")
+            # Dedup trusts the hot window; reload it first if other processes
+            # have added or removed recent rows since it was loaded
+            await hot_window.verify(self.db)
             
-            # 2. Filter new hotspots (checking against DB)
-            new_hotspots_data = await self.filter_new_hotspots(today_hotspots)
+            # 1-3. Fetch, parse, enrich and store as a staged pipeline: sources
+            # download concurrently and each is stored as soon as it is parsed
+            ingested = await self._ingest(timer, deadline)
+            hotspots_data = ingested["hotspots"]
+            new_hotspots_data = ingested["new_hotspots"]
+            hotspot_objs = ingested["hotspot_objs"]
+            window_stale = ingested["window_stale"]
+            total_found = len(hotspots_data)
             new_count = len(new_hotspots_data)
+            logger.info(f"Stored {new_count} new of {total_found} hotspots from API")
             
-            # 3. Save new hotspots
-            hotspot_objs = []
-            for h in new_hotspots_data:
-                h["province"] = "กาญจนบุรี" 
-                h["district"] = "-"
-                
-                obj = Hotspot(**h)
-                self.db.add(obj)
-                hotspot_objs.append(obj)
-            
-            await self.db.flush() # Get IDs
+            # 3.5. Group new detections into fire events (whole check at once)
+            with timer.span("cluster"):
+                fire_events = await FireEventService(self.db).assign(hotspot_objs)
+            with timer.span("rollup"):
+                await StatsService(self.db).record(hotspot_objs)
             
             # 4. Handle Notification
             notification_sent = False
@@ -70,6 +95,7 @@ class NotificationService:
             
             logger.info(f"Notification check: manual={manual_trigger}, count={notify_count}")
             
+            notify_span = timer.begin("notify", rows=notify_count)
             if notify_count > 0:
                 # Build satellite summary for the alert
                 for h in notify_data:
@@ -104,26 +130,38 @@ class NotificationService:
                 
                 if target_to:
                     try:
-                        # If manual, send alert immediately here
+                        notif_status = "sent"
+                        # If manual, send alert immediately here. The push is
+                        # bounded by the LINE client's own timeout, not the
+                        # check deadline: cancelling it would not stop the request
                         if manual_trigger:
                             logger.info(f"Attempting to send manual alert to LINE for {notify_count} points...")
-                            await self.line_service.send_satellite_alert(target_to, satellites_found)
-                            notification_sent = True
-                            logger.info("Manual alert sent successfully.")
+                            try:
+                                await self.line_service.send_satellite_alert(target_to, satellites_found)
+                                notification_sent = True
+                                logger.info("Manual alert sent successfully.")
+                            except LINEDeliveryUnknown as e:
+                                # May have reached the group: record it so the
+                                # hotspots are not alerted again
+                                notif_status = "unknown"
+                                notif_error = f"LINE delivery unknown: {e}"
+                        
+                        # Every detection the alert covered: a manual alert
+                        # repeats stored rows as well as the new ones
+                        covered_ids = [obj.id for obj in hotspot_objs]
+                        if manual_trigger:
+                            covered_ids = await self._stored_ids(notify_data, covered_ids)
                         
                         # Log notification in DB
                         notif_log = Notification(
                             batch_id=batch_id,
-                            hotspot_count=notify_count,
+                            hotspot_count=len(covered_ids),
                             message_text=f"Hotspot Alert ({'Manual' if manual_trigger else 'Auto'}): {notify_count} points",
-                            status="sent"
+                            status=notif_status
                         )
                         self.db.add(notif_log)
-                        
-                        # Mark hotspots as notified
-                        for obj in hotspot_objs:
-                            obj.notified = True
-                            obj.notified_at = datetime.now()
+                        await self.db.flush() # Get notification ID
+                        await self._mark_notified(notif_log, covered_ids)
                             
                     except Exception as e:
                         notif_error = str(e)
@@ -131,18 +169,44 @@ class NotificationService:
                 else:
                     notif_error = "No LINE_GROUP_ID configured"
                     logger.warning("CRITICAL: No target_to found for notification!")
+            notify_span["sent"] = notification_sent
+            timer.end(notify_span)
             
             # 5. Log the check
-            duration = int((datetime.now() - start_time).total_seconds() * 1000)
+            status = "partial" if deadline.missed else "success"
+            if deadline.missed:
+                logger.warning(f"Check deadline ({deadline.seconds}s) cut: {', '.join(deadline.missed)}")
             check_log = CheckLog(
                 hotspots_found=total_found,
                 new_hotspots=new_count,
-                api_response_time_ms=duration,
-                status="success"
+                api_response_time_ms=timer.total_ms(),
+                status=status,
+                error_message=f"Deadline exceeded: {', '.join(deadline.missed)}" if deadline.missed else None,
+                stage_timings=timer.stages
             )
             self.db.add(check_log)
             
             await self.db.commit()
+            # New rows and a new check log are visible now; drop cached dashboard reads
+            response_cache.bump()
+            if window_stale:
+                await hot_window.warm(self.db)
+            else:
+                hot_window.add(hotspot_objs)
+            self._record_metrics(timer, manual_trigger, status, total_found, new_count)
+            
+            # Push deltas to connected dashboards
+            if hotspot_objs:
+                event_broker.publish("hotspots", [hotspot_to_dict(obj) for obj in hotspot_objs])
+            # Carries this check's chart point so dashboards don't all refetch /logs/timings
+            checked_at = datetime.now().isoformat()
+            event_broker.publish("check", {
+                "checked_at": checked_at,
+                "status": status,
+                "hotspots_found": total_found,
+                "new_hotspots": new_count,
+                "timing": summarize_timings(checked_at, status, timer.total_ms(), timer.stages)
+            })
             
             # Re-calculating satellites_found for the returned dict (it's for new hotspots only)
             new_sats_found = {}
@@ -168,16 +232,220 @@ class NotificationService:
                 "notification_sent": notification_sent,
                 "notification_error": notif_error,
                 "satellites_found": new_sats_found,
-                "all_satellites_data": satellites_found if manual_trigger else None
+                "all_satellites_data": satellites_found if manual_trigger else None,
+                "fire_event_ids": fire_events["fire_event_ids"],
+                "new_fire_events": fire_events["new_fire_events"],
+                "merged_fire_event_ids": fire_events["merged_fire_event_ids"],
+                "missed": deadline.missed,
+                "stage_timings": timer.stages
             }
             
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error in check_and_notify: {e}")
-            self.db.add(CheckLog(status="error", error_message=str(e)))
+            self.db.add(CheckLog(
+                status="error",
+                error_message=str(e),
+                api_response_time_ms=timer.total_ms(),
+                stage_timings=timer.stages
+            ))
             await self.db.commit()
+            response_cache.bump()
+            self._record_metrics(timer, manual_trigger, "error")
+            checked_at = datetime.now().isoformat()
+            event_broker.publish("check", {
+                "checked_at": checked_at,
+                "status": "error",
+                "hotspots_found": 0,
+                "new_hotspots": 0,
+                "timing": summarize_timings(checked_at, "error", timer.total_ms(), timer.stages)
+            })
             raise
 
+    async def _mark_notified(self, notif_log: Notification, ids: List[int]):
+        """Flag the covered hotspots as notified and link them to the notification, set-based"""
+        if not ids:
+            return
+        notified_at = datetime.now()
+        for start in range(0, len(ids), MARK_CHUNK):
+            # ORM-enabled UPDATE also refreshes the objects held by this session.
+            # Rows repeated by a manual alert keep their first notified_at
+            await self.db.execute(
+                update(Hotspot)
+                .where(Hotspot.id.in_(ids[start:start + MARK_CHUNK]), Hotspot.notified.is_(False))
+                .values(notified=True, notified_at=notified_at)
+            )
+        await bulk_insert(await self.db.connection(), NotificationHotspot.__table__, {
+            "notification_id": [notif_log.id] * len(ids),
+            "hotspot_id": ids
+        })
+
+    async def _stored_ids(self, hotspots: List[Dict[str, Any]], known_ids: List[int]) -> List[int]:
+        """
+        Ids of the stored rows for the given API hotspots: `known_ids` (the
+        rows just inserted) plus the earlier copies of the rest, looked up
+        per (acq_date, satellite) in one query each
+        """
+        wanted: Dict[Tuple[date, str], Set[HotspotKey]] = {}
+        for h in hotspots:
+            key = self._hotspot_key(h)
+            wanted.setdefault((key[2], key[4]), set()).add(key)
+        ids = set(known_ids)
+        for (acq_date, satellite), keys in wanted.items():
+            result = await self.db.execute(
+                select(Hotspot.id, Hotspot.latitude, Hotspot.longitude, Hotspot.acq_time)
+                .where(Hotspot.acq_date == acq_date, Hotspot.satellite == satellite)
+            )
+            for hid, lat, lon, acq_time in result.all():
+                if (lat, lon, acq_date, acq_time, satellite) in keys:
+                    ids.add(hid)
+        return sorted(ids)
+
+    async def _ingest(self, timer: StageTimer, deadline: Deadline) -> Dict[str, List[Any]]:
+        """
+        fetch -> parse -> enrich -> store over bounded queues, one item per
+        FIRMS source. Store owns the session, so it always runs one batch
+        at a time; the other stages take their concurrency from settings.
+
+        Downloads are cancelled when the deadline's ingest budget runs out;
+        parse and store are only started while budget remains, so a source
+        is either stored whole or reported as missed.
+        """
+        hotspots: List[Dict[str, Any]] = []
+        new_hotspots: List[Dict[str, Any]] = []
+        hotspot_objs: List[Hotspot] = []
+        conflicts: List[str] = []
+
+        async def fetch(source: str):
+            content = None
+            async with deadline.scope(f"fetch.{source}"):
+                if await self.firms.should_fetch(source):
+                    content = await self.firms.fetch_csv(source, timer=timer)
+            return (source, content) if content else None
+
+        async def parse(item):
+            source, content = item
+            if not deadline.admit(f"parse.{source}"):
+                return None
+            try:
+                rows = await self.firms.parse_async(content, source, timer)
+            except Exception as e:
+                logger.error(f"Error parsing FIRMS data for {source}: {e}")
+                return None
+            return (source, rows) if rows else None
+
+        async def enrich(item):
+            source, rows = item
+            with timer.span("geo_filter", rows=len(rows)):
+                for h in rows:
+                    h["province"] = "กาญจนบุรี"
+                    h["district"] = "-"
+            return source, rows
+
+        async def store(item):
+            source, rows = item
+            if not deadline.admit(f"store.{source}"):
+                return None
+            hotspots.extend(rows)
+            with timer.span("dedup", rows_in=len(rows)) as span:
+                fresh = await self.filter_new_hotspots(rows)
+                span["rows_out"] = len(fresh)
+            with timer.span("insert", rows=len(fresh)) as span:
+                objs = await self._insert_new(fresh)
+                if len(objs) < len(fresh):
+                    # Rows stored by another process since the window was
+                    # loaded: skipped by the insert, reloaded after commit
+                    inserted = {(o.latitude, o.longitude, o.acq_date, o.acq_time, o.satellite) for o in objs}
+                    fresh = [
+                        h for h in fresh
+                        if (h["latitude"], h["longitude"], h["acq_date"], h["acq_time"], h["satellite"]) in inserted
+                    ]
+                    conflicts.append(source)
+                span["rows_out"] = len(objs)
+            new_hotspots.extend(fresh)
+            hotspot_objs.extend(objs)
+            return None
+
+        queue_size = settings.PIPELINE_QUEUE_SIZE
+        sources = self.firms.SOURCES
+        fetch_workers = settings.PIPELINE_FETCH_WORKERS or len(sources)
+        pipeline = (
+            Pipeline("ingest")
+            .stage("fetch", fetch, workers=fetch_workers, queue_size=queue_size)
+            .stage("parse", parse, workers=settings.PIPELINE_PARSE_WORKERS, queue_size=queue_size)
+            .stage("enrich", enrich, workers=settings.PIPELINE_ENRICH_WORKERS, queue_size=queue_size)
+            .stage("store", store, workers=1, queue_size=queue_size)
+        )
+        await pipeline.run(sources)
+        logger.debug(f"Ingest pipeline stages: {pipeline.stats()}")
+        if conflicts:
+            logger.warning(f"Hot window missed rows already stored for {', '.join(conflicts)}; reloading after commit")
+        return {
+            "hotspots": hotspots,
+            "new_hotspots": new_hotspots,
+            "hotspot_objs": hotspot_objs,
+            "window_stale": bool(conflicts)
+        }
+
+    async def _insert_new(self, rows: List[Dict[str, Any]]) -> List[Hotspot]:
+        """
+        INSERT ... ON CONFLICT (_hotspot_uc) DO NOTHING, returning the rows
+        actually inserted as session objects. Dedup upstream is only as good
+        as the hot window, so a row another process stored meanwhile is
+        skipped here instead of failing the whole check.
+        """
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            insert = pg_insert
+        elif dialect == "sqlite":
+            insert = sqlite_insert
+        else:
+            # No portable upsert: plain ORM insert, conflicts raise
+            objs = [Hotspot(**h) for h in rows]
+            self.db.add_all(objs)
+            await self.db.flush()
+            return objs
+        objs: List[Hotspot] = []
+        for start in range(0, len(rows), INSERT_CHUNK):
+            stmt = (
+                insert(Hotspot)
+                .values(rows[start:start + INSERT_CHUNK])
+                .on_conflict_do_nothing(index_elements=HOTSPOT_KEY_COLUMNS)
+                .returning(Hotspot)
+            )
+            objs.extend((await self.db.scalars(stmt)).all())
+        return objs
+
+    @staticmethod
+    def _record_metrics(
+        timer: StageTimer,
+        manual_trigger: bool,
+        status: str,
+        found: int = 0,
+        new: int = 0
+    ):
+        CHECK_DURATION.observe(
+            timer.total_ms() / 1000.0,
+            trigger="manual" if manual_trigger else "scheduled",
+            status=status
+        )
+        observe_stages(timer.stages)
+        if found:
+            CHECK_ROWS.inc(found, kind="parsed")
+            CHECK_ROWS.inc(new, kind="new")
+            CHECK_ROWS.inc(found - new, kind="deduped")
+
+    @staticmethod
+    def _hotspot_key(h: Dict[str, Any]) -> HotspotKey:
+        """_hotspot_uc identity of a parsed API row (date/time still strings)"""
+        return (
+            h["latitude"],
+            h["longitude"],
+            datetime.strptime(h["acq_date"], "%Y-%m-%d").date(),
+            datetime.strptime(h["acq_time"], "%H%M").time(),
+            h["satellite"]
+        )
+
     async def filter_new_hotspots(self, hotspots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Filter hotspots that don't exist in the database yet
@@ -185,21 +453,27 @@ class NotificationService:
         new_items = []
         for h in hotspots:
             # Check unique constraint: lat, lon, date, time, satellite
-            stmt = select(Hotspot).where(
-                and_(
-                    Hotspot.latitude == h["latitude"],
-                    Hotspot.longitude == h["longitude"],
-                    Hotspot.acq_date == datetime.strptime(h["acq_date"], "%Y-%m-%d").date(),
-                    Hotspot.acq_time == datetime.strptime(h["acq_time"], "%H%M").time(),
-                    Hotspot.satellite == h["satellite"]
-                )
-            )
-            result = await self.db.execute(stmt)
-            if not result.scalar_one_or_none():
+            key = self._hotspot_key(h)
+            acq_date, acq_time = key[2], key[3]
+            if hot_window.covers(acq_date):
+                # Recent rows: answered from memory
+                exists = hot_window.contains(key)
+            else:
+                stmt = select(Hotspot.id).where(
+                    and_(
+                        Hotspot.latitude == h["latitude"],
+                        Hotspot.longitude == h["longitude"],
+                        Hotspot.acq_date == acq_date,
+                        Hotspot.acq_time == acq_time,
+                        Hotspot.satellite == h["satellite"]
+                    )
+                ).limit(1)
+                exists = (await self.db.execute(stmt)).first() is not None
+            if not exists:
                 # Convert date/time strings to objects for the model
                 h_copy = h.copy()
-                h_copy["acq_date"] = datetime.strptime(h["acq_date"], "%Y-%m-%d").date()
-                h_copy["acq_time"] = datetime.strptime(h["acq_time"], "%H%M").time()
+                h_copy["acq_date"] = acq_date
+                h_copy["acq_time"] = acq_time
                 new_items.append(h_copy)
         
         return new_items
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _ready() -> bool:
+    return True
+
+
+class ProcessOffloader:
+    """
+    Runs CPU-heavy work (CSV parsing, geo enrichment) in a small process
+    pool so it never holds the event loop.
+
+    Callers pass the payload size; anything under threshold_bytes runs
+    inline, where pickling it to a worker would cost more than the work.
+    Workers are spawned (not forked from the running server) on first use
+    or by start(), and kept for the life of the process.
+    """
+
+    def __init__(self, max_workers: int, threshold_bytes: int):
+        self.max_workers = max_workers
+        self.threshold_bytes = threshold_bytes
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def should_offload(self, size: int) -> bool:
+        return self.enabled and size >= self.threshold_bytes
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def start(self):
+        """Spawn the workers ahead of the first large payload"""
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            pool = self._get_pool()
+            await asyncio.gather(*(loop.run_in_executor(pool, _ready) for _ in range(self.max_workers)))
+        except (OSError, BrokenProcessPool) as e:
+            # e.g. serverless runtimes without process or /dev/shm support
+            logger.warning(f"Process offload unavailable, CPU work stays inline: {e}")
+            self.shutdown()
+            self.max_workers = 0
+            return
+        logger.info(f"Process offload pool ready ({self.max_workers} workers)")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable module-level function in the pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), fn, *args)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+process_offloader = ProcessOffloader(settings.OFFLOAD_WORKERS, settings.OFFLOAD_THRESHOLD_BYTES)
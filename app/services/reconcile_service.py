@@ -0,0 +1,130 @@
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Set, Tuple
+from sqlalchemy import select, update, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Hotspot
+from .fire_event_service import FireEventService
+
+logger = logging.getLogger(__name__)
+
+# Columns a standard-processing record overwrites on the NRT row it replaces
+MERGE_COLUMNS = (
+    "latitude", "longitude", "brightness", "scan", "track", "acq_date", "acq_time",
+    "confidence", "version", "bright_t31", "frp", "daynight", "grid_x", "grid_y"
+)
+
+
+def is_nrt(version: str) -> bool:
+    return (version or "").upper().endswith("NRT")
+
+
+def _minutes(acq_date: date, acq_time) -> int:
+    return acq_date.toordinal() * 1440 + acq_time.hour * 60 + acq_time.minute
+
+
+class ReconcileService:
+    """
+    Replaces stored NRT detections with their standard-processing (SP)
+    counterparts.
+
+    SP reprocessing shifts geolocation slightly and recomputes FRP, so the
+    records never hit _hotspot_uc. Instead each SP record is paired with the
+    nearest NRT row of the same satellite within MATCH_RADIUS_DEG and
+    MATCH_MINUTES, found through a coarse grid of candidate cells, and that
+    row is updated in place (keeping its id, fire event and notification
+    state), and the stats of the fire events it belongs to are recomputed.
+    Every NRT row is replaced at most once.
+    """
+
+    MATCH_RADIUS_DEG = 0.005  # ~550 m, over a pixel at nadir
+    MATCH_MINUTES = 10
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def _nrt_candidates(self, dates: List[date], satellites: Set[str]) -> List[Any]:
+        # Pad a day each side: a pass near midnight can land on either local date
+        result = await self.db.execute(
+            select(
+                Hotspot.id, Hotspot.latitude, Hotspot.longitude,
+                Hotspot.acq_date, Hotspot.acq_time, Hotspot.satellite, Hotspot.fire_event_id
+            ).where(
+                and_(
+                    Hotspot.acq_date.between(min(dates) - timedelta(days=1), max(dates) + timedelta(days=1)),
+                    Hotspot.satellite.in_(satellites),
+                    Hotspot.version.like("%NRT")
+                )
+            )
+        )
+        return result.all()
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(lat // self.MATCH_RADIUS_DEG), int(lon // self.MATCH_RADIUS_DEG)
+
+    def match(self, columns: Dict[str, List[Any]], indices: List[int], candidates: List[Any]) -> Dict[int, Any]:
+        """
+        Pair SP records (row indices into columns) with NRT candidates.
+        Closest pairs are taken first so a crowded cluster is matched
+        pixel to pixel rather than all onto one row.
+        """
+        grid: Dict[Tuple, List[Any]] = {}
+        for c in candidates:
+            grid.setdefault((c.satellite, *self._cell(c.latitude, c.longitude)), []).append(c)
+
+        radius2 = self.MATCH_RADIUS_DEG ** 2
+        pairs = []
+        for i in indices:
+            lat, lon, satellite = columns["latitude"][i], columns["longitude"][i], columns["satellite"][i]
+            minutes = _minutes(columns["acq_date"][i], columns["acq_time"][i])
+            cell_lat, cell_lon = self._cell(lat, lon)
+            for d_lat in (-1, 0, 1):
+                for d_lon in (-1, 0, 1):
+                    for c in grid.get((satellite, cell_lat + d_lat, cell_lon + d_lon), ()):
+                        dt = abs(_minutes(c.acq_date, c.acq_time) - minutes)
+                        if dt > self.MATCH_MINUTES:
+                            continue
+                        dist2 = (c.latitude - lat) ** 2 + (c.longitude - lon) ** 2
+                        if dist2 <= radius2:
+                            pairs.append((dist2, dt, i, c))
+
+        pairs.sort(key=lambda p: (p[0], p[1], p[2], p[3].id))
+        matches: Dict[int, Any] = {}
+        taken = set()
+        for _, _, i, c in pairs:
+            if i in matches or c.id in taken:
+                continue
+            matches[i] = c
+            taken.add(c.id)
+        return matches
+
+    async def merge(self, columns: Dict[str, List[Any]], indices: List[int]) -> Tuple[Set[int], Set[date]]:
+        """
+        Update NRT rows in place from the SP records at indices.
+        Returns the indices consumed and the dates whose rollups changed.
+        """
+        sp = [i for i in indices if not is_nrt(columns["version"][i])]
+        if not sp:
+            return set(), set()
+        candidates = await self._nrt_candidates(
+            [columns["acq_date"][i] for i in sp], {columns["satellite"][i] for i in sp}
+        )
+        if not candidates:
+            return set(), set()
+
+        matches = self.match(columns, sp, candidates)
+        if not matches:
+            return set(), set()
+
+        touched: Set[date] = set()
+        params = []
+        for i, c in matches.items():
+            params.append({"id": c.id, **{name: columns[name][i] for name in MERGE_COLUMNS}})
+            touched.add(c.acq_date)
+            touched.add(columns["acq_date"][i])
+        # ORM bulk UPDATE by primary key (one executemany)
+        await self.db.execute(update(Hotspot), params)
+        # Moved points and recomputed FRP change their events' centroid, bbox and max_frp
+        await FireEventService(self.db).refresh(c.fire_event_id for c in matches.values())
+        logger.info(f"Replaced {len(matches)} NRT detections with standard-processing records")
+        return set(matches), touched
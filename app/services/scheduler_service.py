@@ -1,10 +1,18 @@
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from .notification_service import NotificationService
-from .line_service import LINEService
+from .line_service import LINEService, LINEDeliveryUnknown
 from .firms_service import FIRMSService
 from ..config import get_settings
+from ..utils.metrics import SCHEDULER_LAG, CHECKS_SKIPPED
+from ..utils.deadline import Deadline
+from .hot_window import hot_window
+from .source_registry import source_registry
+from .arrival_model import ArrivalModel
 from linebot.v3.messaging import TextMessage
 
 logger = logging.getLogger(__name__)
@@ -16,23 +24,39 @@ class SchedulerService:
         (13, 30, 18, 0),  # 13:30 - 18:00 (Day overpass)
     ]
     
-    # All satellites we track
-    ALL_SATELLITES = ["VIIRS_SNPP", "VIIRS_NOAA20", "VIIRS_NOAA21"]
+    # Satellites expected in every peak period (enabled daily sources)
+    ALL_SATELLITES = source_registry.expected_satellites()
     
     # How long to keep checking after ALL satellites have reported
     GRACE_PERIOD_HOURS = 1
     
-    def __init__(self, notification_service: NotificationService):
-        self.notification_service = notification_service
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        firms: FIRMSService,
+        line_service: LINEService
+    ):
+        # Each check opens its own session; nothing DB-bound outlives a run
+        self.session_factory = session_factory
+        self.firms = firms
         # Robust Thai timezone (UTC+7)
         self.thai_tz = timezone(timedelta(hours=7))
         self.scheduler = AsyncIOScheduler() # Timezone handled manually in jobs
-        self.line_service = LINEService()
+        self.line_service = line_service
+        
+        # Held for the whole of a check; a trigger that finds it taken is skipped
+        self._check_lock = asyncio.Lock()
+        
+        # Learned data-arrival windows; empty (fixed cadence) until first built
+        self.arrival_model = ArrivalModel()
         
         # Track cumulative satellite data for the period
         # Format: {"VIIRS_SNPP": {"count": 3, "time": "02:15"}, ...}
         self.satellite_data = {}
         
+        # Fire events seen in the period (one fire may span many detections)
+        self.fire_event_ids = set()
+        
         # Track when all satellites have reported (for sleep timer)
         self.all_satellites_reported_at = None
         
@@ -48,11 +72,14 @@ class SchedulerService:
     def start(self):
         """Start the scheduler with adaptive intervals"""
         # Main check job (runs every minute during peak hours)
+        # Never queue up behind a slow run: late triggers are merged into one
         self.scheduler.add_job(
             self.adaptive_check_trigger,
             'cron',
             minute='*',
-            id='adaptive_check_trigger'
+            id='adaptive_check_trigger',
+            max_instances=1,
+            coalesce=True
         )
         
         # End-of-peak heartbeat jobs
@@ -71,6 +98,24 @@ class SchedulerService:
             id='end_of_afternoon_peak'
         )
         
+        # Relearn data-arrival windows from recent ingest history (now, then every 6 hours)
+        if settings.ARRIVAL_MODEL_ENABLED:
+            self.scheduler.add_job(
+                self.refresh_arrival_model,
+                'interval',
+                hours=6,
+                next_run_time=datetime.now(),
+                id='refresh_arrival_model'
+            )
+        
+        # Pick up hotspot writes made outside this process (backfills, scripts)
+        self.scheduler.add_job(
+            self.resync_hot_window,
+            'interval',
+            minutes=settings.HOT_WINDOW_RESYNC_MINUTES,
+            id='hot_window_resync'
+        )
+        
         self.scheduler.start()
         logger.info(f"Scheduler started with robust Thai Timezone (UTC+7)")
         
@@ -81,6 +126,11 @@ class SchedulerService:
         """
         now = datetime.now(self.thai_tz)
         today = now.date()
+        # The cron fires on the minute boundary; anything past it is lag
+        SCHEDULER_LAG.observe(
+            (now - now.replace(second=0, microsecond=0)).total_seconds(),
+            job="adaptive_check_trigger"
+        )
         
         # Reset data at midnight (when date changes)
         if self.current_date is not None and self.current_date != today:
@@ -98,11 +148,12 @@ class SchedulerService:
         if not is_peak:
             return
         
-        # Smart Sleep: If ALL satellites reported and 1 hour has passed, go to sleep
+        # Smart Sleep: If ALL satellites reported and the grace period (learned, at most 1 hour) has passed, go to sleep
         if self.all_satellites_reported_at:
             time_since_complete = now - self.all_satellites_reported_at
-            if time_since_complete > timedelta(hours=self.GRACE_PERIOD_HOURS):
-                # All satellites reported and 1 hour passed, sleep now
+            grace = self.arrival_model.grace(timedelta(hours=self.GRACE_PERIOD_HOURS))
+            if time_since_complete > grace:
+                # All satellites reported and the grace period passed, sleep now
                 if not self.early_sleep_sent:
                     await self._send_early_sleep_message()
                     self.early_sleep_sent = True
@@ -111,16 +162,26 @@ class SchedulerService:
         # Reset sleep if we're in a new peak and don't have current data
         # (This handles the case between morning and afternoon peak)
         
-        interval = settings.CHECK_INTERVAL_PEAK
+        # Dense around the learned arrival windows, sparse elsewhere (fixed until learned)
+        interval = self.arrival_model.interval_at(
+            now,
+            dense=settings.CHECK_INTERVAL_DENSE,
+            sparse=settings.CHECK_INTERVAL_SPARSE,
+            default=settings.CHECK_INTERVAL_PEAK
+        )
         
         # Run if it's the right minute according to the interval
         if now.minute % interval == 0:
             logger.info(f"Triggering peak-time check (Interval: {interval})")
             try:
-                result = await self.notification_service.check_and_notify()
+                deadline = Deadline(settings.CHECK_DEADLINE_SECONDS, settings.CHECK_DEADLINE_RESERVE_SECONDS)
+                result = await self.run_check(deadline)
                 
                 # Track new hotspots by satellite
                 if result and result.get("new_hotspots", 0) > 0:
+                    self.fire_event_ids.update(result.get("fire_event_ids", []))
+                    # Events merged into a connected fire no longer exist
+                    self.fire_event_ids.difference_update(result.get("merged_fire_event_ids", []))
                     new_satellites = result.get("satellites_found", {})
                     has_new_data = False
                     
@@ -142,11 +203,60 @@ class SchedulerService:
                         all_sats = set(self.ALL_SATELLITES)
                         if reported_sats >= all_sats and self.all_satellites_reported_at is None:
                             self.all_satellites_reported_at = now
-                            logger.info(f"All 3 satellites reported! Will sleep in 1 hour.")
+                            logger.info(f"All {len(all_sats)} satellites reported! Will sleep in {self.arrival_model.grace(timedelta(hours=self.GRACE_PERIOD_HOURS))}.")
                             
             except Exception as e:
                 logger.error(f"Error during scheduled check: {e}")
 
+    async def run_check(self, deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+        """
+        One scheduled check in a fresh session (one unit of work). The
+        session, its identity map and its connection are released as soon
+        as the check returns, so a season of checks does not accumulate
+        ORM objects.
+
+        Returns None without checking if the previous check is still
+        running: every check re-reads the whole FIRMS window, so the next
+        trigger picks up anything the skipped one would have seen.
+        """
+        if self._check_lock.locked():
+            logger.warning("Previous check still running, skipping this one")
+            CHECKS_SKIPPED.inc(reason="overlap")
+            return None
+        async with self._check_lock:
+            async with self.session_factory() as session:
+                service = NotificationService(self.firms, self.line_service, session)
+                return await service.check_and_notify(deadline=deadline)
+
+    async def refresh_arrival_model(self):
+        """Rebuild the data-arrival model from recent hotspots"""
+        try:
+            async with self.session_factory() as session:
+                model = await ArrivalModel.build(
+                    session,
+                    self.ALL_SATELLITES,
+                    lookback_days=settings.ARRIVAL_LOOKBACK_DAYS,
+                    min_passes=settings.ARRIVAL_MIN_PASSES,
+                    pad_minutes=settings.CHECK_INTERVAL_DENSE
+                )
+        except Exception as e:
+            logger.error(f"Arrival model refresh failed: {e}")
+            return
+        self.arrival_model = model
+        model.export_metrics()
+        if model.ready:
+            logger.info("Arrival model: " + "; ".join(model.describe()))
+        else:
+            logger.info(f"Arrival model not ready ({len(model.profiles)} passes learned), keeping fixed cadence")
+
+    async def resync_hot_window(self):
+        """Reload the in-memory hot window from the database"""
+        try:
+            async with self.session_factory() as session:
+                await hot_window.warm(session)
+        except Exception as e:
+            logger.error(f"Hot window resync failed: {e}")
+
     async def _send_cumulative_update(self):
         """Send cumulative update message with all satellites found so far"""
         target = settings.LINE_GROUP_ID.strip() if settings.LINE_GROUP_ID else None
@@ -156,31 +266,38 @@ class SchedulerService:
         try:
             now = datetime.now(self.thai_tz)
             
-            # Build satellite summary lines
+            # Build satellite summary lines (occasional sources such as Landsat after the expected ones)
             sat_lines = []
             total = 0
-            for sat in self.ALL_SATELLITES:
+            extra = [sat for sat in self.satellite_data if sat not in self.ALL_SATELLITES]
+            for sat in self.ALL_SATELLITES + extra:
                 if sat in self.satellite_data:
                     data = self.satellite_data[sat]
-                    sat_name = sat.replace("VIIRS_", "")
+                    sat_name = source_registry.label(sat)
                     sat_lines.append(f"🛰️ {sat_name} - {data['count']} จุด (ถ่าย {data['time']})")
                     total += data["count"]
             
-            # Count how many satellites reported
-            reported_count = len(self.satellite_data)
+            # Count how many of the expected satellites reported
+            reported_count = sum(1 for sat in self.ALL_SATELLITES if sat in self.satellite_data)
             
             message_text = f"""🔥 แจ้งเตือนจุดความร้อน
 📅 {now.strftime('%d/%m/%Y %H:%M')}
 ━━━━━━━━━━━━━━━━
 {chr(10).join(sat_lines)}
 ━━━━━━━━━━━━━━━━
-📍 รวม: {total} จุด ({reported_count}/3 ดาวเทียม)
+📍 รวม: {total} จุด ({reported_count}/{len(self.ALL_SATELLITES)} ดาวเทียม)
+🔥 กลุ่มไฟ: {len(self.fire_event_ids)} กลุ่ม
 🏔️ พื้นที่: กาญจนบุรี"""
 
             message = TextMessage(text=message_text)
+            # Not under the check deadline: the push cannot be cancelled once
+            # started, only bounded by the LINE client's own timeout
             await self.line_service.push_message(target, [message])
             logger.info(f"Sent cumulative update: {total} hotspots from {reported_count} satellites")
             
+        except LINEDeliveryUnknown as e:
+            # Possibly delivered; the next update carries the same totals either way
+            logger.warning(f"Cumulative update delivery unknown: {e}")
         except Exception as e:
             logger.error(f"Failed to send cumulative update: {e}")
 
@@ -192,7 +309,7 @@ class SchedulerService:
                 now = datetime.now(self.thai_tz)
                 total = sum(d["count"] for d in self.satellite_data.values())
                 message = TextMessage(
-                    text=f"😴 บอทเข้าสู่โหมดพักผ่อน\n📅 {now.strftime('%d/%m/%Y %H:%M')}\n✅ ครบ 3 ดาวเทียม พบ {total} จุดความร้อน\n💤 หลับจนถึงรอบถัดไป..."
+                    text=f"😴 บอทเข้าสู่โหมดพักผ่อน\n📅 {now.strftime('%d/%m/%Y %H:%M')}\n✅ ครบ {len(self.ALL_SATELLITES)} ดาวเทียม พบ {total} จุดความร้อน\n💤 หลับจนถึงรอบถัดไป..."
                 )
                 await self.line_service.push_message(target, [message])
                 logger.info("Sent early sleep message (all satellites done)")
@@ -212,6 +329,7 @@ class SchedulerService:
     def _reset_period_state(self):
         """Reset all tracking variables for the next period"""
         self.satellite_data = {}
+        self.fire_event_ids = set()
         self.all_satellites_reported_at = None
         self.early_sleep_sent = False
     
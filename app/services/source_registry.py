@@ -0,0 +1,171 @@
+"""
+FIRMS detection sources.
+
+Every product the bot can fetch is declared here once: its FIRMS product
+ID, the satellite name stored on Hotspot rows (part of the dedup key), how
+its CSV columns map onto Hotspot fields, how its confidence values read,
+how often it passes overhead and what one request costs in MAP_KEY quota.
+The fetch pipeline, parser, scheduler completeness ("3/3 ดาวเทียม") and
+LINE alerts all read from here.
+
+Which sources are fetched is configuration (FIRMS_SOURCES), so turning on
+MODIS_NRT is an env change; a new FIRMS product is one more
+DetectionSource below.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Hotspot field -> CSV column, for products that keep the MODIS column names
+MODIS_COLUMNS = {
+    "brightness": "brightness",
+    "bright_t31": "bright_t31",
+}
+# VIIRS reports I-band brightness temperatures under band names
+VIIRS_COLUMNS = {
+    "brightness": "bright_ti4",
+    "bright_t31": "bright_ti5",
+}
+
+
+def viirs_confidence(conf: str) -> str:
+    """VIIRS: l / n / h"""
+    return {"l": "low", "n": "nominal", "h": "high"}.get(conf.strip().lower(), "nominal")
+
+
+def modis_confidence(conf: str) -> str:
+    """MODIS: 0-100"""
+    try:
+        val = int(conf)
+    except ValueError:
+        return "nominal"
+    if val >= 80:
+        return "high"
+    if val >= 30:
+        return "nominal"
+    return "low"
+
+
+def landsat_confidence(conf: str) -> str:
+    """Landsat: L / M / H"""
+    return {"l": "low", "m": "nominal", "h": "high"}.get(conf.strip().lower(), "nominal")
+
+
+def generic_confidence(conf: str) -> str:
+    """Products not in the registry: numeric as MODIS, letters as VIIRS/Landsat"""
+    if conf.strip().isdigit():
+        return modis_confidence(conf)
+    return {"l": "low", "n": "nominal", "m": "nominal", "h": "high"}.get(conf.strip().lower(), "nominal")
+
+
+@dataclass(frozen=True)
+class DetectionSource:
+    # FIRMS area API product ID
+    product: str
+    # Stored Hotspot.satellite (part of the dedup key) and alert grouping
+    satellite: str
+    # Short name shown in LINE alerts
+    label: str
+    instrument: str
+    # Values of the CSV "satellite" column for this product (archive files)
+    codes: Tuple[str, ...]
+    confidence: Callable[[str], str]
+    # Passes over the area per day; sources with at least one per peak
+    # period count towards "all satellites reported"
+    overpasses_per_day: float
+    # MAP_KEY transactions per area request
+    quota_cost: int = 1
+    columns: Mapping[str, str] = field(default_factory=dict, hash=False)
+
+    @property
+    def expected_each_period(self) -> bool:
+        return self.overpasses_per_day >= 2
+
+    def column(self, name: str) -> str:
+        return self.columns.get(name, name)
+
+
+BUILTIN_SOURCES = (
+    DetectionSource(
+        "VIIRS_SNPP_NRT", "VIIRS_SNPP", "SNPP", "VIIRS", ("N",),
+        viirs_confidence, overpasses_per_day=2, columns=VIIRS_COLUMNS
+    ),
+    DetectionSource(
+        "VIIRS_NOAA20_NRT", "VIIRS_NOAA20", "NOAA20", "VIIRS", ("N20", "1"),
+        viirs_confidence, overpasses_per_day=2, columns=VIIRS_COLUMNS
+    ),
+    DetectionSource(
+        "VIIRS_NOAA21_NRT", "VIIRS_NOAA21", "NOAA21", "VIIRS", ("N21", "2"),
+        viirs_confidence, overpasses_per_day=2, columns=VIIRS_COLUMNS
+    ),
+    # Terra and Aqua in one product
+    DetectionSource(
+        "MODIS_NRT", "MODIS", "MODIS", "MODIS", ("T", "A", "Terra", "Aqua"),
+        modis_confidence, overpasses_per_day=4, columns=MODIS_COLUMNS
+    ),
+    # Landsat 8/9 revisit every 8 days together; never expected in a given period
+    DetectionSource(
+        "LANDSAT_NRT", "LANDSAT", "LANDSAT", "OLI", ("L8", "L9"),
+        landsat_confidence, overpasses_per_day=0.125
+    ),
+)
+
+
+class SourceRegistry:
+    def __init__(self, sources: Iterable[DetectionSource], enabled: Iterable[str]):
+        self._sources: Dict[str, DetectionSource] = {}
+        for source in sources:
+            self.register(source)
+        self._enabled: List[str] = []
+        for product in enabled:
+            if product in self._sources:
+                self._enabled.append(product)
+            else:
+                logger.warning(f"Unknown FIRMS source '{product}' in FIRMS_SOURCES, skipped")
+
+    def register(self, source: DetectionSource):
+        self._sources[source.product] = source
+
+    def get(self, product: str) -> DetectionSource:
+        return self._sources[product]
+
+    def enabled(self) -> List[DetectionSource]:
+        return [self._sources[p] for p in self._enabled]
+
+    def products(self) -> List[str]:
+        return list(self._enabled)
+
+    def expected_satellites(self) -> List[str]:
+        """Enabled satellites that should report in every peak period"""
+        return [s.satellite for s in self.enabled() if s.expected_each_period]
+
+    def by_satellite(self, satellite: str) -> Optional[DetectionSource]:
+        for source in self._sources.values():
+            if source.satellite == satellite:
+                return source
+        return None
+
+    def label(self, satellite: str) -> str:
+        source = self.by_satellite(satellite)
+        return source.label if source else satellite.replace("VIIRS_", "")
+
+    def satellite_codes(self) -> Dict[Tuple[str, str], str]:
+        """(instrument, CSV satellite code) -> stored satellite name"""
+        return {
+            (source.instrument, code): source.satellite
+            for source in self._sources.values()
+            for code in source.codes
+        }
+
+    def quota_per_check(self) -> int:
+        return sum(s.quota_cost for s in self.enabled())
+
+
+source_registry = SourceRegistry(
+    BUILTIN_SOURCES,
+    [p.strip() for p in settings.FIRMS_SOURCES.split(",") if p.strip()]
+)
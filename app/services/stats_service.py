@@ -0,0 +1,235 @@
+import logging
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, case, desc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from ..models import Hotspot, HotspotDailyStats, HotspotHourlyStats, HotspotGridStats
+from ..utils.geo_utils import lonlat_to_grid, STATS_GRID_ZOOM
+
+logger = logging.getLogger(__name__)
+
+class StatsService:
+    """
+    Maintains the hotspot rollups: daily (date, satellite, province,
+    district), hourly (date, satellite, hour) and grid (date, heat-map cell).
+
+    record() is called with each ingest batch inside the same transaction
+    and upserts the affected rollup rows. Counters, summaries and analytics
+    then read O(days x keys) rows instead of scanning hotspots.
+    """
+
+    UPSERT_CHUNK = 1000
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    def _insert(self, model):
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            return pg_insert(model)
+        if dialect == "sqlite":
+            return sqlite_insert(model)
+        raise NotImplementedError(f"Rollup upsert not supported on {dialect}")
+
+    @staticmethod
+    def _field(h: Any, name: str) -> Any:
+        return h.get(name) if isinstance(h, dict) else getattr(h, name, None)
+
+    @classmethod
+    def _aggregate(cls, hotspots: Iterable[Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Group a batch (ORM objects or row dicts) by each rollup's key"""
+        daily: Dict[Tuple, Dict[str, Any]] = {}
+        hourly: Dict[Tuple, Dict[str, Any]] = {}
+        grid: Dict[Tuple, Dict[str, Any]] = {}
+
+        for h in hotspots:
+            acq_date = cls._field(h, "acq_date")
+            satellite = cls._field(h, "satellite")
+            frp = cls._field(h, "frp") or 0.0
+
+            key = (acq_date, satellite, cls._field(h, "province") or "", cls._field(h, "district") or "")
+            row = daily.get(key)
+            if row is None:
+                row = daily[key] = {
+                    "acq_date": key[0],
+                    "satellite": key[1],
+                    "province": key[2],
+                    "district": key[3],
+                    "hotspot_count": 0,
+                    "high_confidence_count": 0,
+                    "frp_sum": 0.0,
+                    "frp_max": 0.0
+                }
+            row["hotspot_count"] += 1
+            if cls._field(h, "confidence") == "high":
+                row["high_confidence_count"] += 1
+            row["frp_sum"] += frp
+            row["frp_max"] = max(row["frp_max"], frp)
+
+            acq_time = cls._field(h, "acq_time")
+            hour = acq_time.hour if hasattr(acq_time, "hour") else int(str(acq_time)[:2])
+            key = (acq_date, satellite, hour)
+            row = hourly.get(key)
+            if row is None:
+                row = hourly[key] = {"acq_date": acq_date, "satellite": satellite, "hour": hour, "hotspot_count": 0}
+            row["hotspot_count"] += 1
+
+            cell_x, cell_y = lonlat_to_grid(cls._field(h, "longitude"), cls._field(h, "latitude"), STATS_GRID_ZOOM)
+            key = (acq_date, cell_x, cell_y)
+            row = grid.get(key)
+            if row is None:
+                row = grid[key] = {"acq_date": acq_date, "cell_x": cell_x, "cell_y": cell_y, "hotspot_count": 0, "frp_max": 0.0}
+            row["hotspot_count"] += 1
+            row["frp_max"] = max(row["frp_max"], frp)
+
+        return {
+            "daily": list(daily.values()),
+            "hourly": list(hourly.values()),
+            "grid": list(grid.values())
+        }
+
+    async def _upsert(
+        self,
+        model,
+        rows: List[Dict[str, Any]],
+        keys: List[str],
+        sum_columns: List[str],
+        max_columns: List[str] = ()
+    ):
+        """INSERT ... ON CONFLICT DO UPDATE adding counters / keeping maxima"""
+        table = model.__table__
+        # Chunked to stay under driver bind-parameter limits
+        for i in range(0, len(rows), self.UPSERT_CHUNK):
+            stmt = self._insert(model).values(rows[i:i + self.UPSERT_CHUNK])
+            set_ = {c: table.c[c] + stmt.excluded[c] for c in sum_columns}
+            for c in max_columns:
+                set_[c] = case((stmt.excluded[c] > table.c[c], stmt.excluded[c]), else_=table.c[c])
+            if "updated_at" in table.c:
+                set_["updated_at"] = func.now()
+            await self.db.execute(stmt.on_conflict_do_update(index_elements=keys, set_=set_))
+
+    async def record(self, hotspots: Iterable[Any]) -> int:
+        """Add a batch of newly stored hotspots to the rollups"""
+        rollups = self._aggregate(hotspots)
+        await self._upsert(
+            HotspotDailyStats, rollups["daily"],
+            keys=["acq_date", "satellite", "province", "district"],
+            sum_columns=["hotspot_count", "high_confidence_count", "frp_sum"],
+            max_columns=["frp_max"]
+        )
+        await self._upsert(
+            HotspotHourlyStats, rollups["hourly"],
+            keys=["acq_date", "satellite", "hour"],
+            sum_columns=["hotspot_count"]
+        )
+        await self._upsert(
+            HotspotGridStats, rollups["grid"],
+            keys=["acq_date", "cell_x", "cell_y"],
+            sum_columns=["hotspot_count"],
+            max_columns=["frp_max"]
+        )
+        return len(rollups["daily"])
+
+    async def _record_from_hotspots(self, batch_size: int, *where) -> None:
+        """Stream hotspots (optionally filtered) through the normal upsert path"""
+        columns = (
+            Hotspot.id, Hotspot.acq_date, Hotspot.acq_time, Hotspot.satellite,
+            Hotspot.province, Hotspot.district, Hotspot.confidence, Hotspot.frp,
+            Hotspot.latitude, Hotspot.longitude
+        )
+        last_id = 0
+        while True:
+            result = await self.db.execute(
+                select(*columns).where(Hotspot.id > last_id, *where).order_by(Hotspot.id).limit(batch_size)
+            )
+            rows = [r._asdict() for r in result.all()]
+            if not rows:
+                break
+            await self.record(rows)
+            last_id = rows[-1]["id"]
+
+    async def rebuild(self, batch_size: int = 5000) -> int:
+        """Recompute all rollups from the hotspots table"""
+        for model in (HotspotDailyStats, HotspotHourlyStats, HotspotGridStats):
+            await self.db.execute(delete(model))
+
+        # Stream the table once and feed it through the normal upsert path
+        await self._record_from_hotspots(batch_size)
+        await self.db.commit()
+
+        count = await self.db.scalar(select(func.count()).select_from(HotspotDailyStats))
+        logger.info(f"Rebuilt hotspot rollups: {count} daily rows")
+        return count
+
+    async def rebuild_dates(self, dates: Iterable[date], batch_size: int = 5000) -> None:
+        """
+        Recompute the rollups of some days in the caller's transaction, for
+        changes record() cannot express (rows updated in place, maxima that
+        may have gone down)
+        """
+        dates = sorted(set(dates))
+        if not dates:
+            return
+        for model in (HotspotDailyStats, HotspotHourlyStats, HotspotGridStats):
+            await self.db.execute(delete(model).where(model.acq_date.in_(dates)))
+        await self._record_from_hotspots(batch_size, Hotspot.acq_date.in_(dates))
+
+    async def rebuild_if_empty(self) -> int:
+        """Populate the rollups for databases that predate them"""
+        for model in (HotspotDailyStats, HotspotHourlyStats, HotspotGridStats):
+            if await self.db.scalar(select(model.id).limit(1)) is None:
+                break
+        else:
+            return 0
+        has_hotspots = await self.db.scalar(select(Hotspot.id).limit(1))
+        if has_hotspots is None:
+            return 0
+        return await self.rebuild()
+
+    async def total_hotspots(self) -> int:
+        result = await self.db.scalar(select(func.coalesce(func.sum(HotspotDailyStats.hotspot_count), 0)))
+        return int(result)
+
+    async def summary(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict[str, Any]:
+        """Totals per day, satellite and district for a date range"""
+        filters = []
+        if start_date:
+            filters.append(HotspotDailyStats.acq_date >= start_date)
+        if end_date:
+            filters.append(HotspotDailyStats.acq_date <= end_date)
+
+        count = func.sum(HotspotDailyStats.hotspot_count).label("count")
+
+        daily = await self.db.execute(
+            select(HotspotDailyStats.acq_date, count, func.max(HotspotDailyStats.frp_max))
+            .where(*filters)
+            .group_by(HotspotDailyStats.acq_date)
+            .order_by(desc(HotspotDailyStats.acq_date))
+        )
+        by_satellite = await self.db.execute(
+            select(HotspotDailyStats.satellite, count)
+            .where(*filters)
+            .group_by(HotspotDailyStats.satellite)
+            .order_by(desc(count))
+        )
+        by_district = await self.db.execute(
+            select(HotspotDailyStats.province, HotspotDailyStats.district, count)
+            .where(*filters)
+            .group_by(HotspotDailyStats.province, HotspotDailyStats.district)
+            .order_by(desc(count))
+        )
+
+        daily_rows = [{
+            "date": d.isoformat(),
+            "count": int(c),
+            "max_frp": m
+        } for d, c, m in daily.all()]
+
+        return {
+            "total": sum(r["count"] for r in daily_rows),
+            "daily": daily_rows,
+            "by_satellite": [{"satellite": s, "count": int(c)} for s, c in by_satellite.all()],
+            "by_district": [{"province": p, "district": d, "count": int(c)} for p, d, c in by_district.all()]
+        }
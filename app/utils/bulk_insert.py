@@ -0,0 +1,63 @@
+from typing import Any, Callable, Dict, List
+from sqlalchemy import Table, Integer, Float, String
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Types the sqlite3 driver binds natively; everything else goes through its bind processor
+_NATIVE_TYPES = (Integer, Float, String)
+
+
+def _process(values: List[Any], processor: Callable[[Any], Any]) -> List[Any]:
+    # Bulk columns (dates, times, flags) have few distinct values; convert each once
+    cache: Dict[Any, Any] = {v: processor(v) for v in set(values)}
+    return list(map(cache.__getitem__, values))
+
+
+async def bulk_insert(conn: AsyncConnection, table: Table, columns: Dict[str, List[Any]]) -> int:
+    """
+    Insert column-oriented data in one round trip per call, using the
+    fastest path the driver has:
+
+    - asyncpg: COPY via copy_records_to_table
+    - sqlite: a single DBAPI executemany with pre-processed bind values
+    - anything else: Core executemany
+
+    Runs inside the caller's transaction; callers batch rows so each
+    transaction carries a large chunk.
+    """
+    names = list(columns)
+    if not names or not columns[names[0]]:
+        return 0
+    count = len(columns[names[0]])
+    dialect = conn.dialect
+
+    if dialect.name == "postgresql" and dialect.driver == "asyncpg":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            schema_name=table.schema,
+            columns=names,
+            records=zip(*(columns[n] for n in names))
+        )
+        return count
+
+    if dialect.name == "sqlite":
+        values = []
+        for name in names:
+            column_type = table.c[name].type
+            # Plain numbers/strings bind as-is; only dates, times and flags need converting
+            if isinstance(column_type, _NATIVE_TYPES):
+                values.append(columns[name])
+                continue
+            processor = column_type.dialect_impl(dialect).bind_processor(dialect)
+            values.append(_process(columns[name], processor) if processor else columns[name])
+        preparer = dialect.identifier_preparer
+        sql = (
+            f"INSERT INTO {preparer.format_table(table)} "
+            f"({', '.join(preparer.quote(n) for n in names)}) "
+            f"VALUES ({', '.join('?' for _ in names)})"
+        )
+        await conn.exec_driver_sql(sql, list(zip(*values)))
+        return count
+
+    await conn.execute(table.insert(), [dict(zip(names, row)) for row in zip(*(columns[n] for n in names))])
+    return count
@@ -0,0 +1,65 @@
+"""
+Time budget for one check.
+
+    deadline = Deadline(50.0, reserve=10.0)
+    async with deadline.scope("fetch.VIIRS_SNPP_NRT"):
+        content = await firms.fetch_csv(...)    # cancelled when the budget runs out
+    if deadline.admit("store.VIIRS_SNPP_NRT"):
+        ...                                     # only started while budget remains
+
+The last `reserve` seconds are kept for committing and notifying: ingest
+work (scope() / admit()) stops there. Network waits are cancelled at expiry;
+DB and CPU work is only ever admitted or refused at a stage boundary, never
+cut half way, so whatever was already flushed can still be committed.
+Everything cut or refused is listed in `missed`.
+
+LINE pushes are never run in a scope: the SDK call runs in a thread and
+cancelling the await would not stop the request, so a push reported as cut
+could still reach the group. They are bounded by LINE_PUSH_TIMEOUT_SECONDS
+instead, which should fit inside the reserve.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+from .metrics import CHECK_DEADLINE_MISSES
+
+
+class Deadline:
+    def __init__(self, seconds: float, reserve: float = 0.0):
+        now = asyncio.get_running_loop().time()
+        self.seconds = seconds
+        self.at = now + seconds
+        self.ingest_at = self.at - min(max(reserve, 0.0), seconds)
+        self.missed: List[str] = []
+
+    def remaining(self, final: bool = False) -> float:
+        horizon = self.at if final else self.ingest_at
+        return max(0.0, horizon - asyncio.get_running_loop().time())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def miss(self, stage: str):
+        self.missed.append(stage)
+        CHECK_DEADLINE_MISSES.inc(stage=stage.split(".", 1)[0])
+
+    def admit(self, stage: str) -> bool:
+        """True if there is budget to start `stage`; records a miss otherwise"""
+        if self.expired:
+            self.miss(stage)
+            return False
+        return True
+
+    @asynccontextmanager
+    async def scope(self, stage: str) -> AsyncIterator[None]:
+        """
+        Cancel the block when the budget runs out. The timeout is swallowed
+        and recorded as a miss; code after the block sees whatever the
+        block had assigned before it was cut.
+        """
+        try:
+            async with asyncio.timeout_at(self.ingest_at):
+                yield
+        except TimeoutError:
+            self.miss(stage)
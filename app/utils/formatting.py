@@ -0,0 +1,29 @@
+from typing import Any, Dict
+
+
+def format_acq_time(t) -> str:
+    """Format acq_time as HH:MM (tolerates legacy 'HHMM' strings)"""
+    if hasattr(t, "strftime"):
+        return t.strftime("%H:%M")
+    ts = str(t or "")
+    if len(ts) == 4 and ":" not in ts:
+        return f"{ts[:2]}:{ts[2:]}"
+    return ts[:5]
+
+
+def hotspot_to_dict(h) -> Dict[str, Any]:
+    """
+    Shape a Hotspot ORM object the same way the dashboard listing endpoints
+    shape their column tuples.
+    """
+    return {
+        "id": h.id,
+        "latitude": h.latitude,
+        "longitude": h.longitude,
+        "acq_date": h.acq_date.isoformat(),
+        "acq_time": format_acq_time(h.acq_time),
+        "satellite": h.satellite,
+        "confidence": h.confidence,
+        "frp": h.frp,
+        "province": h.province
+    }
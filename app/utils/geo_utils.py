@@ -1,6 +1,8 @@
 from geopy.geocoders import Nominatim
 from typing import Tuple, Optional, Dict
 import logging
+import math
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -16,3 +18,59 @@ def get_location_info(lat: float, lon: float) -> Dict[str, str]:
         "province": "เชียงใหม่", # Sample
         "district": "แม่แจ่ม"     # Sample
     }
+
+# Web-mercator grid used for map tiles and server-side clustering.
+# Each hotspot stores its cell at GRID_ZOOM; coarser zooms are derived by
+# integer division, so clustering is a GROUP BY on indexed integer columns.
+GRID_ZOOM = 20
+# Coarser grid used by the heat-map rollup (~2.4 km cells at the equator)
+STATS_GRID_ZOOM = 14
+MAX_MERCATOR_LAT = 85.0511287798
+
+def lonlat_to_world(lon: float, lat: float) -> Tuple[float, float]:
+    """Project lon/lat to web-mercator world coordinates in [0, 1)"""
+    lat = max(min(lat, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    x = (lon + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+def lonlat_to_grid(lon: float, lat: float, zoom: int = GRID_ZOOM) -> Tuple[int, int]:
+    """Integer tile/grid cell containing the point at the given zoom"""
+    x, y = lonlat_to_world(lon, lat)
+    n = 1 << zoom
+    return min(int(x * n), n - 1), min(int(y * n), n - 1)
+
+def lonlat_to_grid_array(lon: np.ndarray, lat: np.ndarray, zoom: int = GRID_ZOOM) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorised lonlat_to_grid for bulk loads"""
+    n = 1 << zoom
+    sin_lat = np.sin(np.radians(np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)))
+    x = (np.asarray(lon) + 180.0) / 360.0
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return (
+        np.minimum((x * n).astype(np.int64), n - 1),
+        np.minimum((y * n).astype(np.int64), n - 1)
+    )
+
+def tile_to_lonlat_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(west, south, east, north) of a slippy-map tile"""
+    n = 1 << z
+    def lat_at(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+    return x / n * 360.0 - 180.0, lat_at(y + 1), (x + 1) / n * 360.0 - 180.0, lat_at(y)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def grid_cell_center(cell_x: int, cell_y: int, zoom: int) -> Tuple[float, float]:
+    """(lon, lat) of the centre of a grid cell"""
+    west, south, east, north = tile_to_lonlat_bounds(zoom, cell_x, cell_y)
+    return (west + east) / 2, (south + north) / 2
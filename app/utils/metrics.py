@@ -0,0 +1,261 @@
+"""
+Minimal in-process metrics registry with Prometheus text exposition.
+
+All updates happen on the event loop thread, so metrics are plain dicts
+with no locking; an observation is a dict lookup plus a bisect. Metrics
+are recorded per check / request / push, never per row.
+"""
+import asyncio
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._labels(k)} {_format_value(v)}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: str):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, fn: Callable[[], float]):
+        """Evaluate fn at scrape time (unlabelled gauges only)"""
+        self._function = fn
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception:
+                return []
+        return [f"{self.name}{self._labels(k)} {_format_value(v)}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(key, ('le', _format_value(bound)))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{self._labels(key, ('le', '+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Check pipeline
+CHECK_DURATION = REGISTRY.histogram(
+    "firecheck_check_duration_seconds", "Whole check_and_notify duration", ["trigger", "status"]
+)
+CHECK_STAGE_DURATION = REGISTRY.histogram(
+    "firecheck_check_stage_duration_seconds", "Duration of each check pipeline stage", ["stage"]
+)
+CHECK_ROWS = REGISTRY.counter(
+    "firecheck_check_rows_total", "Hotspot rows handled by checks (parsed, new, deduped)", ["kind"]
+)
+CHECK_DEADLINE_MISSES = REGISTRY.counter(
+    "firecheck_check_deadline_misses_total", "Check work cut or skipped by the check deadline", ["stage"]
+)
+CHECKS_SKIPPED = REGISTRY.counter(
+    "firecheck_checks_skipped_total", "Scheduled checks not started", ["reason"]
+)
+PIPELINE_QUEUE_DEPTH = REGISTRY.gauge(
+    "firecheck_pipeline_queue_depth", "Items waiting in each pipeline stage's inbox", ["pipeline", "stage"]
+)
+PIPELINE_QUEUE_MAX_DEPTH = REGISTRY.gauge(
+    "firecheck_pipeline_queue_max_depth", "Deepest inbox seen per stage during the last run", ["pipeline", "stage"]
+)
+
+# FIRMS HTTP client
+FIRMS_REQUEST_DURATION = REGISTRY.histogram(
+    "firecheck_firms_request_duration_seconds", "FIRMS API request latency", ["source"]
+)
+FIRMS_RESPONSE_BYTES = REGISTRY.counter(
+    "firecheck_firms_response_bytes_total", "Bytes downloaded from FIRMS", ["source"]
+)
+FIRMS_REQUESTS = REGISTRY.counter(
+    "firecheck_firms_requests_total", "FIRMS API requests by outcome", ["source", "status"]
+)
+FIRMS_FETCHES_SKIPPED = REGISTRY.counter(
+    "firecheck_firms_fetches_skipped_total", "Area pulls skipped because FIRMS had nothing in the window", ["source"]
+)
+FIRMS_KEY_REQUESTS = REGISTRY.counter(
+    "firecheck_firms_key_requests_total", "FIRMS requests per MAP_KEY by outcome", ["key", "status"]
+)
+FIRMS_KEY_QUOTA_REMAINING = REGISTRY.gauge(
+    "firecheck_firms_key_quota_remaining", "Transactions left in the current quota window per MAP_KEY", ["key"]
+)
+FIRMS_KEY_QUARANTINED = REGISTRY.gauge(
+    "firecheck_firms_key_quarantined", "1 while a MAP_KEY is quarantined", ["key"]
+)
+FIRMS_QUOTA_SPENT = REGISTRY.counter(
+    "firecheck_firms_quota_spent_total", "MAP_KEY transactions spent, per the source registry's cost", ["source"]
+)
+
+# LINE
+LINE_PUSH_DURATION = REGISTRY.histogram(
+    "firecheck_line_push_duration_seconds", "LINE push message latency"
+)
+LINE_PUSH_FAILURES = REGISTRY.counter(
+    "firecheck_line_push_failures_total", "Failed LINE push messages"
+)
+
+# Database
+DB_POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "firecheck_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+DB_POOL_CHECKED_OUT = REGISTRY.gauge(
+    "firecheck_db_pool_checked_out", "DB connections currently checked out"
+)
+
+# Scheduler / runtime
+DATA_ARRIVAL_LATENCY = REGISTRY.gauge(
+    "firecheck_data_arrival_latency_minutes", "Learned acquisition-to-first-seen latency quantiles",
+    ["satellite", "daynight", "quantile"]
+)
+SCHEDULER_LAG = REGISTRY.histogram(
+    "firecheck_scheduler_lag_seconds", "Delay between a job's scheduled and actual start", ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "firecheck_event_loop_lag_seconds", "Event loop scheduling delay (sampled every second)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+
+def observe_stages(stages: List[Dict]):
+    """Feed StageTimer spans into the stage histogram"""
+    for span in stages:
+        if "ms" in span:
+            stage = span["stage"].split(".", 1)[0]
+            CHECK_STAGE_DURATION.observe(span["ms"] / 1000.0, stage=stage)
+
+
+async def monitor_event_loop(interval: float = 1.0):
+    """Sleep for interval and record how late the loop woke us up"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - start - interval))
@@ -0,0 +1,103 @@
+"""
+Minimal Mapbox Vector Tile (v2.1) encoder for point layers.
+
+Hotspot tiles only ever contain points, so this writes the protobuf
+directly instead of pulling in a full geometry/protobuf toolchain.
+Spec: https://github.com/mapbox/vector-tile-spec/tree/master/2.1
+"""
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+EXTENT = 4096
+
+# Wire types
+_VARINT = 0
+_LEN = 2
+
+_GEOM_POINT = 1
+_CMD_MOVE_TO_ONE = (1 & 0x7) | (1 << 3)
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 31)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _len_field(field: int, payload: bytes) -> bytes:
+    return _key(field, _LEN) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values: List[int]) -> bytes:
+    return _len_field(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _key(7, _VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _key(5, _VARINT) + _varint(value)
+        return _key(6, _VARINT) + _varint(((value << 1) ^ (value >> 63)) & 0xFFFFFFFFFFFFFFFF)
+    if isinstance(value, float):
+        return _key(3, 1) + struct.pack("<d", value)
+    return _len_field(1, str(value).encode())
+
+
+def encode_point_layer(
+    name: str,
+    features: List[Tuple[Optional[int], int, int, Dict[str, Any]]],
+    extent: int = EXTENT
+) -> bytes:
+    """
+    Encode one point layer as a complete tile.
+    features: (id or None, tile_x, tile_y, properties) with tile_x/tile_y
+    already in [0, extent) tile pixel space.
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    encoded_features = []
+
+    for fid, px, py, props in features:
+        tags = []
+        for k, v in props.items():
+            if v is None:
+                continue
+            if k not in keys:
+                keys[k] = len(keys)
+            vkey = (type(v), v)
+            if vkey not in values:
+                values[vkey] = len(values)
+            tags.extend((keys[k], values[vkey]))
+
+        feature = b""
+        if fid is not None:
+            feature += _key(1, _VARINT) + _varint(fid)
+        if tags:
+            feature += _packed(2, tags)
+        feature += _key(3, _VARINT) + _varint(_GEOM_POINT)
+        feature += _packed(4, [_CMD_MOVE_TO_ONE, _zigzag(px), _zigzag(py)])
+        encoded_features.append(_len_field(2, feature))
+
+    layer = _key(15, _VARINT) + _varint(2)
+    layer += _len_field(1, name.encode())
+    layer += b"".join(encoded_features)
+    layer += b"".join(_len_field(3, k.encode()) for k in keys)
+    layer += b"".join(_len_field(4, _encode_value(v)) for (_, v) in values)
+    layer += _key(5, _VARINT) + _varint(extent)
+
+    return _len_field(3, layer)
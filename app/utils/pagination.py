@@ -0,0 +1,41 @@
+import base64
+from datetime import date, time
+from typing import Tuple
+
+
+def encode_cursor(acq_date: date, acq_time: time, hotspot_id: int) -> str:
+    """
+    Encode the (acq_date, acq_time, id) sort key of the last row into an
+    opaque, URL-safe cursor string.
+    """
+    raw = f"{acq_date.isoformat()}|{acq_time.strftime('%H:%M:%S')}|{hotspot_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, time, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_str, time_str, id_str = raw.split("|")
+        return date.fromisoformat(date_str), time.fromisoformat(time_str), int(id_str)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Parse a "west,south,east,north" bounding box string (same order as the
+    AREA_* settings and the FIRMS area API).
+    Raises ValueError if the box is malformed.
+    """
+    parts = bbox.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox must be 'west,south,east,north'")
+    west, south, east, north = (float(p) for p in parts)
+    if west > east or south > north:
+        raise ValueError("bbox must satisfy west <= east and south <= north")
+    return west, south, east, north
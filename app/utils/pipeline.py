@@ -0,0 +1,112 @@
+"""
+Small staged pipeline over bounded asyncio queues.
+
+    pipeline = Pipeline("check")
+    pipeline.stage("fetch", fetch, workers=3)
+    pipeline.stage("parse", parse, workers=1, queue_size=2)
+    results = await pipeline.run(sources)
+
+Each stage runs `workers` coroutines that take items from its inbox, call
+the handler and put the result (unless it is None) into the next stage's
+inbox. Inboxes are bounded, so a slow stage holds back the ones before it
+instead of letting work pile up in memory. Results of the last stage are
+returned in completion order.
+
+If a handler raises, the remaining workers are cancelled and the error is
+re-raised from run().
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from .metrics import PIPELINE_QUEUE_DEPTH, PIPELINE_QUEUE_MAX_DEPTH
+
+Handler = Callable[[Any], Awaitable[Optional[Any]]]
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, pipeline: str, name: str, handler: Handler, workers: int, queue_size: int):
+        self.pipeline = pipeline
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.inbox: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max(1, queue_size))
+        self.items = 0
+        self.max_depth = 0
+
+    async def put(self, item: Any):
+        await self.inbox.put(item)
+        depth = self.inbox.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        PIPELINE_QUEUE_DEPTH.set(depth, pipeline=self.pipeline, stage=self.name)
+
+    async def get(self) -> Any:
+        item = await self.inbox.get()
+        PIPELINE_QUEUE_DEPTH.set(self.inbox.qsize(), pipeline=self.pipeline, stage=self.name)
+        return item
+
+
+class Pipeline:
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: List[Stage] = []
+
+    def stage(self, name: str, handler: Handler, workers: int = 1, queue_size: int = 2) -> "Pipeline":
+        self.stages.append(Stage(self.name, name, handler, workers, queue_size))
+        return self
+
+    async def _worker(self, index: int, results: List[Any]):
+        stage = self.stages[index]
+        downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = await stage.get()
+            if item is _DONE:
+                return
+            output = await stage.handler(item)
+            stage.items += 1
+            if output is None:
+                continue
+            if downstream is not None:
+                await downstream.put(output)
+            else:
+                results.append(output)
+
+    async def _run_stage(self, index: int, results: List[Any]):
+        stage = self.stages[index]
+        await asyncio.gather(*(self._worker(index, results) for _ in range(stage.workers)))
+        # Everything upstream has finished; let the next stage drain and stop
+        if index + 1 < len(self.stages):
+            downstream = self.stages[index + 1]
+            for _ in range(downstream.workers):
+                await downstream.put(_DONE)
+
+    async def _feed(self, items: Iterable[Any]):
+        first = self.stages[0]
+        for item in items:
+            await first.put(item)
+        for _ in range(first.workers):
+            await first.put(_DONE)
+
+    async def run(self, items: Iterable[Any]) -> List[Any]:
+        results: List[Any] = []
+        tasks = [asyncio.ensure_future(self._feed(items))]
+        tasks += [asyncio.ensure_future(self._run_stage(i, results)) for i in range(len(self.stages))]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for stage in self.stages:
+                PIPELINE_QUEUE_MAX_DEPTH.set(stage.max_depth, pipeline=self.name, stage=stage.name)
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-stage items handled and deepest inbox seen in the last run"""
+        return {
+            stage.name: {"items": stage.items, "max_depth": stage.max_depth, "workers": stage.workers}
+            for stage in self.stages
+        }
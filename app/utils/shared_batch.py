@@ -0,0 +1,108 @@
+"""
+Columnar record batches in multiprocessing.shared_memory.
+
+A worker process turns a list of row dicts into one shared memory block:
+float fields as float64 columns, everything else as int32 codes into a
+small per-column category list (dates, times, satellites and confidences
+have few distinct values). Only the SharedBatch descriptor goes back
+through the result pipe; the parent maps the block and reads the columns
+in place.
+
+The block belongs to the parent once it is returned: open_batch() /
+batch_to_records() close and unlink it.
+"""
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+CODE_DTYPE = np.int32
+FLOAT_DTYPE = np.float64
+
+
+@dataclass
+class SharedBatch:
+    name: str
+    length: int
+    # (column, dtype, byte offset) in block order
+    columns: List[Tuple[str, str, int]]
+    categories: Dict[str, List[Any]] = field(default_factory=dict)
+
+
+def share_records(
+    records: List[Dict[str, Any]],
+    float_fields: Sequence[str],
+    category_fields: Sequence[str]
+) -> Optional[SharedBatch]:
+    """Worker side: pack records into a new shared block (None when empty)"""
+    length = len(records)
+    if not length:
+        return None
+
+    arrays: Dict[str, np.ndarray] = {}
+    categories: Dict[str, List[Any]] = {}
+    for name in float_fields:
+        arrays[name] = np.fromiter((r[name] for r in records), dtype=FLOAT_DTYPE, count=length)
+    for name in category_fields:
+        lookup: Dict[Any, int] = {}
+        arrays[name] = np.fromiter(
+            (lookup.setdefault(r[name], len(lookup)) for r in records), dtype=CODE_DTYPE, count=length
+        )
+        categories[name] = list(lookup)
+
+    layout, offset = [], 0
+    for name, array in arrays.items():
+        layout.append((name, array.dtype.str, offset))
+        offset += array.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=offset)
+    try:
+        for (name, _, start), array in zip(layout, arrays.values()):
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=start)[:] = array
+        return SharedBatch(shm.name, length, layout, categories)
+    finally:
+        shm.close()
+
+
+@contextmanager
+def open_batch(batch: SharedBatch) -> Iterator[Dict[str, np.ndarray]]:
+    """Parent side: zero-copy column views, valid inside the block only"""
+    shm = shared_memory.SharedMemory(name=batch.name)
+    try:
+        columns = {
+            name: np.ndarray((batch.length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, dtype, offset in batch.columns
+        }
+        yield columns
+        # Views must be gone before the buffer can be released
+        del columns
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+async def batch_to_records(batch: Optional[SharedBatch], chunk_rows: int = 5000) -> List[Dict[str, Any]]:
+    """
+    Rebuild row dicts from a batch, yielding to the event loop between
+    chunks so a large batch never blocks it for long
+    """
+    if batch is None:
+        return []
+    with open_batch(batch) as columns:
+        # tolist() copies out of shared memory into plain Python values
+        values = {name: array.tolist() for name, array in columns.items()}
+
+    names = list(values)
+    records: List[Dict[str, Any]] = []
+    for start in range(0, batch.length, chunk_rows):
+        end = start + chunk_rows
+        chunk = []
+        for name in names:
+            labels = batch.categories.get(name)
+            part = values[name][start:end]
+            chunk.append([labels[code] for code in part] if labels is not None else part)
+        records.extend(dict(zip(names, row)) for row in zip(*chunk))
+        if end < batch.length:
+            await asyncio.sleep(0)
+    return records
@@ -0,0 +1,231 @@
+"""
+Deterministic synthetic VIIRS detections for offline and load testing.
+
+Fires ignite around a few fixed "burn regions" inside the area (plus some
+scattered background fires), burn for several days with an intensity that
+rises and falls, and are observed by each satellite at its morning/evening
+overpass as a small cluster of 375 m pixels. Output rows use the FIRMS area
+CSV columns so they go through FIRMSService._parse_csv unchanged.
+
+Everything is derived from (seed, day), so the same request always returns
+the same rows regardless of call order.
+"""
+import math
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Approximate ascending/descending overpass times over Thailand, UTC (hour, minute)
+VIIRS_OVERPASSES_UTC: Dict[str, Tuple[Tuple[int, int], ...]] = {
+    "VIIRS_NOAA20_NRT": ((5, 40), (18, 40)),
+    "VIIRS_NOAA21_NRT": ((6, 5), (19, 5)),
+    "VIIRS_SNPP_NRT": ((6, 30), (19, 30)),
+}
+
+SATELLITE_CODES = {
+    "VIIRS_SNPP_NRT": "N",
+    "VIIRS_NOAA20_NRT": "N20",
+    "VIIRS_NOAA21_NRT": "N21",
+}
+
+VIIRS_CSV_COLUMNS = [
+    "latitude", "longitude", "bright_ti4", "scan", "track", "acq_date", "acq_time",
+    "satellite", "instrument", "confidence", "version", "bright_ti5", "frp", "daynight"
+]
+
+# One VIIRS I-band pixel at nadir, in degrees of latitude
+PIXEL_DEG = 0.375 / 111.32
+
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass
+class SyntheticFire:
+    fire_id: str
+    latitude: float
+    longitude: float
+    ignited: date
+    duration_days: int
+    intensity: float
+
+    def strength(self, day: date) -> float:
+        """0..1 burn strength on a day: ramps up, peaks mid-life, dies out"""
+        age = (day - self.ignited).days
+        if age < 0 or age >= self.duration_days:
+            return 0.0
+        return math.sin(math.pi * (age + 0.5) / self.duration_days)
+
+
+class SyntheticFireModel:
+    """
+    Seeded fire-season model over a bounding box (west, south, east, north).
+
+    fires_per_day is the mean number of new ignitions per day; with the
+    default multi-day durations the number of active fires settles at a few
+    times that, which at 40/day is in line with a busy Kanchanaburi season.
+    """
+
+    MAX_DURATION_DAYS = 7
+
+    def __init__(
+        self,
+        bbox: BBox,
+        fires_per_day: float = 40.0,
+        seed: int = 0,
+        regions: int = 6,
+        background_share: float = 0.2
+    ):
+        self.bbox = bbox
+        self.fires_per_day = fires_per_day
+        self.seed = seed
+        self.background_share = background_share
+        self._ignitions: Dict[date, List[SyntheticFire]] = {}
+
+        rng = random.Random(f"{seed}:regions")
+        west, south, east, north = bbox
+        self.regions = [
+            (rng.uniform(south, north), rng.uniform(west, east), rng.uniform(0.05, 0.25))
+            for _ in range(regions)
+        ]
+
+    def _rng(self, *parts) -> random.Random:
+        return random.Random(":".join(str(p) for p in (self.seed, *parts)))
+
+    def _clamp(self, lat: float, lon: float) -> Tuple[float, float]:
+        west, south, east, north = self.bbox
+        return min(max(lat, south), north), min(max(lon, west), east)
+
+    def ignitions(self, day: date) -> List[SyntheticFire]:
+        """Fires that start on a given day"""
+        cached = self._ignitions.get(day)
+        if cached is not None:
+            return cached
+
+        rng = self._rng("ignite", day.isoformat())
+        mean = self.fires_per_day
+        if mean > 50:
+            # Normal approximation; Knuth's method underflows for large means
+            count = max(0, round(rng.gauss(mean, math.sqrt(mean))))
+        else:
+            limit, count, p = math.exp(-mean), 0, 1.0
+            while True:
+                p *= rng.random()
+                if p <= limit:
+                    break
+                count += 1
+
+        west, south, east, north = self.bbox
+        fires = []
+        for i in range(count):
+            if rng.random() < self.background_share:
+                lat, lon = rng.uniform(south, north), rng.uniform(west, east)
+            else:
+                r_lat, r_lon, spread = rng.choice(self.regions)
+                lat, lon = self._clamp(rng.gauss(r_lat, spread), rng.gauss(r_lon, spread))
+            fires.append(SyntheticFire(
+                fire_id=f"{day.isoformat()}-{i}",
+                latitude=lat,
+                longitude=lon,
+                ignited=day,
+                duration_days=rng.randint(1, self.MAX_DURATION_DAYS),
+                intensity=rng.lognormvariate(0.0, 0.6)
+            ))
+        self._ignitions[day] = fires
+        return fires
+
+    def active_fires(self, day: date) -> Iterator[SyntheticFire]:
+        for back in range(self.MAX_DURATION_DAYS):
+            for fire in self.ignitions(day - timedelta(days=back)):
+                if fire.strength(day) > 0:
+                    yield fire
+
+    def detections(
+        self,
+        source: str,
+        day: date,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, str]]:
+        """
+        FIRMS CSV rows (strings) for one source on one UTC day.
+        Passes after `until` (naive UTC) are not yet observed and are left out.
+        """
+        overpasses = VIIRS_OVERPASSES_UTC.get(source)
+        if overpasses is None:
+            return []
+
+        rows = []
+        seen = set()
+        for hour, minute in overpasses:
+            pass_time = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+            if until is not None and pass_time > until:
+                continue
+            is_day = hour < 12
+            for fire in self.active_fires(day):
+                for row in self._observe(fire, source, pass_time, is_day):
+                    # Overlapping clusters can land on the same pixel; FIRMS reports it once
+                    key = (row["latitude"], row["longitude"], row["acq_date"], row["acq_time"])
+                    if key not in seen:
+                        seen.add(key)
+                        rows.append(row)
+        return rows
+
+    def _observe(
+        self,
+        fire: SyntheticFire,
+        source: str,
+        pass_time: datetime,
+        is_day: bool
+    ) -> List[Dict[str, str]]:
+        rng = self._rng("obs", source, fire.fire_id, pass_time.isoformat())
+        strength = fire.strength(pass_time.date())
+        # Fires burn hotter in the afternoon; night passes see fewer pixels
+        detect_p = (0.9 if is_day else 0.55) * min(1.0, 0.3 + strength)
+        if rng.random() > detect_p:
+            return []
+
+        mean_pixels = fire.intensity * strength * (3.0 if is_day else 1.5)
+        pixels = 1 + min(int(rng.expovariate(1.0 / max(mean_pixels, 0.1))), 40)
+        # Off-nadir views smear pixels; same scan offset for the whole cluster
+        scan = round(rng.uniform(0.39, 0.8), 2)
+        track = round(min(scan, rng.uniform(0.36, 0.7)), 2)
+        acq = pass_time + timedelta(seconds=rng.randint(0, 300))
+
+        rows = []
+        for _ in range(pixels):
+            lat, lon = self._clamp(
+                fire.latitude + rng.randint(-3, 3) * PIXEL_DEG * track + rng.gauss(0, PIXEL_DEG * 0.1),
+                fire.longitude + rng.randint(-3, 3) * PIXEL_DEG * scan + rng.gauss(0, PIXEL_DEG * 0.1)
+            )
+            frp = rng.lognormvariate(1.2 + fire.intensity * strength, 0.8)
+            if frp > 20 or rng.random() < 0.1:
+                confidence = "h"
+            elif rng.random() < 0.1:
+                confidence = "l"
+            else:
+                confidence = "n"
+            rows.append({
+                "latitude": f"{lat:.5f}",
+                "longitude": f"{lon:.5f}",
+                "bright_ti4": f"{rng.uniform(310, 367) if is_day else rng.uniform(295, 340):.2f}",
+                "scan": f"{scan:.2f}",
+                "track": f"{track:.2f}",
+                "acq_date": acq.strftime("%Y-%m-%d"),
+                "acq_time": acq.strftime("%H%M"),
+                "satellite": SATELLITE_CODES.get(source, "N"),
+                "instrument": "VIIRS",
+                "confidence": confidence,
+                "version": "2.0NRT",
+                "bright_ti5": f"{rng.uniform(285, 305):.2f}",
+                "frp": f"{frp:.2f}",
+                "daynight": "D" if is_day else "N"
+            })
+        return rows
+
+
+def rows_to_csv(rows: List[Dict[str, str]]) -> str:
+    """Serialise rows in FIRMS column order (header always present)"""
+    lines = [",".join(VIIRS_CSV_COLUMNS)]
+    for row in rows:
+        lines.append(",".join(row[c] for c in VIIRS_CSV_COLUMNS))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,318 @@
+"""
+Vectorised multi-season history for benchmarks and retention tests.
+
+Produces, day by day, the hotspots, check logs and notifications the bot
+would have stored over a burning season:
+
+- seasonality: ignitions follow a mid-March peak (dry season) with a small
+  wet-season floor and a per-year intensity factor
+- diurnal satellite timing: each VIIRS satellite passes once by day and
+  once by night, with the overpass drifting day to day along its orbit
+- spatial clustering: fires ignite around real burn areas (Kanchanaburi
+  districts when they fall inside the area), burn for several days and
+  show up as clusters of 375 m pixels
+- ingest bookkeeping: detections are published some time after the pass
+  and picked up by the next successful scheduled check, which also gets a
+  notification row
+
+All columns come out as plain Python lists, ready for bulk_insert().
+"""
+import math
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from .geo_utils import lonlat_to_grid_array
+from .synthetic import PIXEL_DEG, VIIRS_OVERPASSES_UTC, BBox
+
+THAI_OFFSET_MINUTES = 7 * 60
+
+# (latitude, longitude, spread in degrees, relative weight, district)
+BURN_AREAS = [
+    (15.15, 98.45, 0.15, 1.0, "สังขละบุรี"),
+    (14.73, 98.63, 0.18, 1.2, "ทองผาภูมิ"),
+    (14.83, 99.13, 0.20, 1.5, "ศรีสวัสดิ์"),
+    (14.43, 98.85, 0.15, 1.0, "ไทรโยค"),
+    (14.32, 99.52, 0.10, 0.8, "บ่อพลอย"),
+    (14.58, 99.77, 0.08, 0.6, "เลาขวัญ"),
+    (14.60, 99.45, 0.08, 0.5, "หนองปรือ"),
+    (13.85, 99.42, 0.08, 0.4, "ด่านมะขามเตี้ย"),
+    (14.30, 99.62, 0.06, 0.3, "ห้วยกระเจา"),
+]
+BURN_AREA_PROVINCE = "กาญจนบุรี"
+
+# Mirrors SchedulerService.PEAK_HOURS (local time windows checks run in)
+CHECK_WINDOWS = ((1 * 60 + 30, 6 * 60), (13 * 60 + 30, 18 * 60))
+
+PEAK_DAY_OF_YEAR = 69  # ~10 March
+MAX_DURATION_DAYS = 7
+MAX_PIXELS_PER_PASS = 40
+
+CHECK_ERRORS = (
+    "HTTP Error fetching FIRMS data: ReadTimeout",
+    "HTTP Error fetching FIRMS data: 503 Service Unavailable",
+    "(sqlite3.OperationalError) database is locked",
+)
+
+TIMES = [time(m // 60, m % 60) for m in range(24 * 60)]
+
+
+def seasonal_factor(day: date) -> float:
+    """Relative ignition rate: ~1.0 at the mid-March peak, ~0.03 in the wet season"""
+    d = (day.timetuple().tm_yday - PEAK_DAY_OF_YEAR + 182) % 365 - 182
+    return 0.03 + math.exp(-(d / 32.0) ** 2)
+
+
+def _local_passes() -> List[Tuple[str, int, bool]]:
+    """(satellite, nominal local minute-of-day, is_day) for every overpass"""
+    passes = []
+    for source, times in VIIRS_OVERPASSES_UTC.items():
+        for hour, minute in times:
+            local = (hour * 60 + minute + THAI_OFFSET_MINUTES) % (24 * 60)
+            passes.append((source.replace("_NRT", ""), local, 6 * 60 <= local < 18 * 60))
+    return sorted(passes, key=lambda p: p[1])
+
+
+class HistoryGenerator:
+    def __init__(
+        self,
+        bbox: BBox,
+        peak_fires_per_day: float = 60.0,
+        seed: int = 0,
+        check_interval_minutes: int = 10,
+        error_rate: float = 0.01
+    ):
+        self.bbox = bbox
+        self.peak_fires_per_day = peak_fires_per_day
+        self.seed = seed
+        self.check_interval = check_interval_minutes
+        self.error_rate = error_rate
+        self.rng = np.random.default_rng(seed)
+        self.passes = _local_passes()
+
+        west, south, east, north = bbox
+        areas = [a for a in BURN_AREAS if south <= a[0] <= north and west <= a[1] <= east]
+        if areas:
+            self.province = BURN_AREA_PROVINCE
+        else:
+            rng = np.random.default_rng([seed, 1])
+            areas = [
+                (rng.uniform(south, north), rng.uniform(west, east), rng.uniform(0.05, 0.2), 1.0, "")
+                for _ in range(6)
+            ]
+            self.province = ""
+        self.area_lat = np.array([a[0] for a in areas])
+        self.area_lon = np.array([a[1] for a in areas])
+        self.area_spread = np.array([a[2] for a in areas])
+        weights = np.array([a[3] for a in areas])
+        self.area_p = weights / weights.sum()
+        self.area_district = [a[4] for a in areas]
+
+        # Active fires
+        self.fire_lat = np.empty(0)
+        self.fire_lon = np.empty(0)
+        self.fire_start = np.empty(0, dtype=np.int64)
+        self.fire_duration = np.empty(0, dtype=np.int64)
+        self.fire_intensity = np.empty(0)
+        self.fire_area = np.empty(0, dtype=np.int64)
+
+        self._year_factor: Dict[int, float] = {}
+        # Detections published late in a day, picked up by the next day's checks
+        self._carry: Dict[np.datetime64, int] = {}
+        # Publish times of the last few days, for hotspots_found (a 2-day API window)
+        self._published = np.empty(0, dtype="datetime64[m]")
+
+    def _year(self, year: int) -> float:
+        if year not in self._year_factor:
+            self._year_factor[year] = float(np.random.default_rng([self.seed, year]).lognormal(0.0, 0.25))
+        return self._year_factor[year]
+
+    def _checks(self, day: date) -> Tuple[np.ndarray, np.ndarray]:
+        """Local check times for a day and which of them failed (deterministic per day)"""
+        start = np.datetime64(day, "m")
+        minutes = np.concatenate([
+            np.arange(lo, hi + 1, self.check_interval) for lo, hi in CHECK_WINDOWS
+        ])
+        times = start + minutes.astype("timedelta64[m]")
+        failed = np.random.default_rng([self.seed, day.toordinal()]).random(len(times)) < self.error_rate
+        return times, failed
+
+    def _ignite(self, day: date):
+        west, south, east, north = self.bbox
+        n = self.rng.poisson(self.peak_fires_per_day * seasonal_factor(day) * self._year(day.year))
+        area = self.rng.choice(len(self.area_p), size=n, p=self.area_p)
+        lat = self.rng.normal(self.area_lat[area], self.area_spread[area])
+        lon = self.rng.normal(self.area_lon[area], self.area_spread[area])
+        # A fifth of fires are scattered; attribute them to the nearest area
+        scattered = self.rng.random(n) < 0.2
+        lat[scattered] = self.rng.uniform(south, north, scattered.sum())
+        lon[scattered] = self.rng.uniform(west, east, scattered.sum())
+        if scattered.any():
+            d = (lat[scattered, None] - self.area_lat) ** 2 + (lon[scattered, None] - self.area_lon) ** 2
+            area[scattered] = d.argmin(axis=1)
+
+        keep = (self.fire_start + self.fire_duration) > day.toordinal()
+        self.fire_lat = np.concatenate([self.fire_lat[keep], np.clip(lat, south, north)])
+        self.fire_lon = np.concatenate([self.fire_lon[keep], np.clip(lon, west, east)])
+        self.fire_start = np.concatenate([self.fire_start[keep], np.full(n, day.toordinal())])
+        self.fire_duration = np.concatenate([self.fire_duration[keep], self.rng.integers(1, MAX_DURATION_DAYS + 1, n)])
+        self.fire_intensity = np.concatenate([self.fire_intensity[keep], self.rng.lognormal(0.0, 0.6, n)])
+        self.fire_area = np.concatenate([self.fire_area[keep], area])
+
+    def _observe(self, day: date) -> Dict[str, np.ndarray]:
+        """Pixels seen by every overpass of the day"""
+        age = day.toordinal() - self.fire_start
+        strength = np.sin(np.pi * (age + 0.5) / self.fire_duration)
+        n_fires = len(strength)
+
+        parts = []
+        for pass_index, (satellite, nominal, is_day) in enumerate(self.passes):
+            if not n_fires:
+                break
+            # Orbit drift moves the overpass by up to ~40 minutes day to day
+            minute = nominal + int(self.rng.integers(-40, 41))
+            seen = self.rng.random(n_fires) < (0.9 if is_day else 0.55) * np.minimum(1.0, 0.3 + strength)
+            fires = np.flatnonzero(seen)
+            if not len(fires):
+                continue
+            mean = self.fire_intensity[fires] * strength[fires] * (3.0 if is_day else 1.5)
+            pixels = 1 + np.minimum(self.rng.poisson(mean), MAX_PIXELS_PER_PASS)
+            scan = self.rng.uniform(0.39, 0.8, len(fires))
+            track = np.minimum(scan, self.rng.uniform(0.36, 0.7, len(fires)))
+            acq = np.clip(minute + self.rng.integers(0, 6, len(fires)), 0, 24 * 60 - 1)
+            # Detections appear on FIRMS 30-150 minutes after the pass
+            publish = minute + int(self.rng.integers(30, 151))
+
+            fire = np.repeat(fires, pixels)
+            k = len(fire)
+            scan_p, track_p = np.repeat(scan, pixels), np.repeat(track, pixels)
+            parts.append({
+                "fire": fire,
+                "latitude": self.fire_lat[fire] + self.rng.integers(-3, 4, k) * PIXEL_DEG * track_p
+                    + self.rng.normal(0, PIXEL_DEG * 0.1, k),
+                "longitude": self.fire_lon[fire] + self.rng.integers(-3, 4, k) * PIXEL_DEG * scan_p
+                    + self.rng.normal(0, PIXEL_DEG * 0.1, k),
+                "scan": scan_p,
+                "track": track_p,
+                "minute": np.repeat(acq, pixels),
+                "publish": np.full(k, publish),
+                "satellite": np.full(k, pass_index),
+                "is_day": np.full(k, is_day),
+                "frp": self.rng.lognormal(1.2 + self.fire_intensity[fire] * strength[fire], 0.8),
+            })
+
+        if not parts:
+            return {}
+        cols = {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+        cols["latitude"] = np.round(cols["latitude"], 5)
+        cols["longitude"] = np.round(cols["longitude"], 5)
+
+        # Overlapping clusters can hit the same pixel; keep one per (pixel, satellite, time)
+        key = (
+            (np.rint(cols["latitude"] * 1e5).astype(np.int64) * 10_000_000
+             + np.rint(cols["longitude"] * 1e5).astype(np.int64)) * 4096
+            + cols["satellite"] * 1440 + cols["minute"]
+        )
+        _, first = np.unique(key, return_index=True)
+        first.sort()
+        return {name: values[first] for name, values in cols.items()}
+
+    def generate_day(self, day: date) -> Dict[str, Dict[str, List[Any]]]:
+        self._ignite(day)
+        pixels = self._observe(day)
+        n = len(pixels.get("fire", ()))
+
+        day_start = np.datetime64(day, "m")
+        checks, failed = self._checks(day)
+        next_checks, next_failed = self._checks(day + timedelta(days=1))
+        schedule = np.concatenate([checks[~failed], next_checks[~next_failed]])
+
+        hotspots: Dict[str, List[Any]] = {}
+        check_new = np.zeros(len(checks), dtype=np.int64)
+        if n:
+            publish = day_start + pixels["publish"].astype("timedelta64[m]")
+            picked = schedule[np.minimum(np.searchsorted(schedule, publish), len(schedule) - 1)]
+            self._published = np.concatenate([
+                self._published[self._published >= day_start - np.timedelta64(3, "D")], publish
+            ])
+
+            # New rows per check: today's checks directly, tomorrow's via the carry
+            today = picked < day_start + np.timedelta64(1, "D")
+            idx = np.searchsorted(checks, picked[today])
+            np.add.at(check_new, idx, 1)
+            for t, c in zip(*np.unique(picked[~today], return_counts=True)):
+                self._carry[t] = self._carry.get(t, 0) + int(c)
+
+            frp = np.round(pixels["frp"], 2)
+            conf_roll = self.rng.random(n)
+            confidence = np.where(
+                (frp > 20) | (conf_roll < 0.1), "high",
+                np.where(conf_roll > 0.9, "low", "nominal")
+            )
+            is_day = pixels["is_day"]
+            gx, gy = lonlat_to_grid_array(pixels["longitude"], pixels["latitude"])
+            ingested_at = (picked - np.timedelta64(THAI_OFFSET_MINUTES, "m")).astype(datetime).tolist()
+            satellites = [p[0] for p in self.passes]
+
+            hotspots = {
+                "latitude": pixels["latitude"].tolist(),
+                "longitude": pixels["longitude"].tolist(),
+                "brightness": np.round(np.where(
+                    is_day, self.rng.uniform(310, 367, n), self.rng.uniform(295, 340, n)
+                ), 2).tolist(),
+                "scan": np.round(pixels["scan"], 2).tolist(),
+                "track": np.round(pixels["track"], 2).tolist(),
+                "acq_date": [day] * n,
+                "acq_time": [TIMES[m] for m in pixels["minute"].tolist()],
+                "satellite": [satellites[s] for s in pixels["satellite"].tolist()],
+                "instrument": ["VIIRS"] * n,
+                "confidence": confidence.tolist(),
+                "version": ["2.0NRT"] * n,
+                "bright_t31": np.round(self.rng.uniform(285, 305, n), 2).tolist(),
+                "frp": frp.tolist(),
+                "daynight": np.where(is_day, "D", "N").tolist(),
+                "province": [self.province] * n,
+                "district": [self.area_district[a] for a in self.fire_area[pixels["fire"]].tolist()],
+                "grid_x": gx.tolist(),
+                "grid_y": gy.tolist(),
+                "notified": [True] * n,
+                "notified_at": ingested_at,
+                "created_at": ingested_at,
+            }
+
+        for i, t in enumerate(checks):
+            check_new[i] += self._carry.pop(t, 0)
+
+        # hotspots_found ~ rows the 2-day FIRMS query returned at that moment
+        published = np.sort(self._published)
+        found = (
+            np.searchsorted(published, checks, side="right")
+            - np.searchsorted(published, checks - np.timedelta64(2, "D"), side="right")
+        )
+        found[failed] = 0
+        check_new[failed] = 0
+
+        checked_at = (checks - np.timedelta64(THAI_OFFSET_MINUTES, "m")).astype(datetime).tolist()
+        duration = self.rng.lognormal(math.log(1500), 0.4, len(checks)) + found * 0.5 + check_new * 40
+        duration[failed] = self.rng.uniform(5000, 30000, failed.sum())
+        errors = self.rng.integers(0, len(CHECK_ERRORS), len(checks))
+
+        check_logs = {
+            "checked_at": checked_at,
+            "hotspots_found": found.tolist(),
+            "new_hotspots": check_new.tolist(),
+            "api_response_time_ms": duration.astype(np.int64).tolist(),
+            "status": np.where(failed, "error", "success").tolist(),
+            "error_message": [CHECK_ERRORS[e] if f else None for e, f in zip(errors.tolist(), failed.tolist())],
+        }
+
+        notify = np.flatnonzero(check_new > 0)
+        notifications = {
+            "batch_id": [str(uuid.UUID(bytes=self.rng.bytes(16), version=4)) for _ in notify],
+            "hotspot_count": check_new[notify].tolist(),
+            "message_text": [f"Hotspot Alert (Auto): {c} points" for c in check_new[notify].tolist()],
+            "sent_at": [checked_at[i] for i in notify],
+            "status": ["sent"] * len(notify),
+        }
+
+        return {"hotspots": hotspots, "check_logs": check_logs, "notifications": notifications}
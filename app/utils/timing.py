@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Stage groups for the latency chart, in pipeline order
+TIMING_STAGES = ("fetch", "parse", "dedup", "geo_filter", "insert", "cluster", "rollup", "notify")
+
+
+class StageTimer:
+    """
+    Lightweight span recorder for one pipeline run.
+
+    Usage:
+        timer = StageTimer()
+        with timer.span("dedup") as span:
+            ...
+            span["rows"] = 42          # optional attributes
+
+    or, around a long block:
+        span = timer.begin("notify")
+        ...
+        timer.end(span)
+
+    stages is a flat list of {"stage", "ms", **attrs} in completion order,
+    ready to be stored as JSON.
+    """
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    def begin(self, name: str, **attrs: Any) -> Dict[str, Any]:
+        span = {"stage": name, **attrs}
+        span["_t0"] = time.perf_counter()
+        return span
+
+    def end(self, span: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = span.pop("_t0", None)
+        if t0 is not None:
+            span["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            self.stages.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        span = self.begin(name, **attrs)
+        try:
+            yield span
+        finally:
+            self.end(span)
+
+    def total_ms(self) -> int:
+        return int((time.perf_counter() - self._started) * 1000)
+
+    def stage_ms(self, prefix: str) -> Optional[float]:
+        """Summed duration of stages named prefix or prefix.*"""
+        matched = [
+            s["ms"] for s in self.stages
+            if s["stage"] == prefix or s["stage"].startswith(prefix + ".")
+        ]
+        return round(sum(matched), 1) if matched else None
+
+
+def summarize_timings(
+    checked_at: Optional[str],
+    status: str,
+    total_ms: Optional[int],
+    stages: Optional[List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """One check's spans grouped into TIMING_STAGES (a point on the latency chart)"""
+    grouped = dict.fromkeys(TIMING_STAGES, 0.0)
+    bytes_downloaded = 0
+    for span in stages or []:
+        group = span.get("stage", "").split(".", 1)[0]
+        if group in grouped:
+            grouped[group] += span.get("ms", 0.0)
+        bytes_downloaded += span.get("bytes", 0)
+    return {
+        "checked_at": checked_at,
+        "status": status,
+        "total_ms": total_ms,
+        "bytes": bytes_downloaded,
+        "stages": {k: round(v, 1) for k, v in grouped.items()},
+        "spans": stages
+    }
@@ -0,0 +1,172 @@
+"""
+Memory soak test for scheduled checks.
+
+Drives thousands of SchedulerService.run_check() calls against the local
+FIRMS/LINE stand-ins and samples the process RSS as it goes. Every
+--insert-every checks the bench rows are deleted first, so that check
+stores the whole fetch again (inserts, clustering, rollups); the others see
+only duplicates. With one short-lived session per check RSS levels off
+after warm-up; --shared-session reproduces the old single long-lived
+session for comparison.
+
+    python benchmarks/scheduler_memory.py --checks 2000
+    python benchmarks/scheduler_memory.py --checks 2000 --shared-session
+    python benchmarks/scheduler_memory.py --quick    # bounded regression run (CI)
+
+Exits non-zero when RSS grows by more than --max-growth-mb between the
+end of warm-up and the last check. --quick is a short preset (300 checks,
+a couple of minutes) run by .github/workflows/memory.yml on every push.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+from check_and_notify import (  # noqa: E402 (benchmarks/ is the script dir)
+    CACHE_DIR, DEFAULT_NOW, SEED, SOURCES,
+    calibrate_fires_per_day, cleanup_bench_rows, free_port, logging_quiet, prepare_db
+)
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError):
+        # No procfs (macOS): peak RSS is the closest stand-in
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+async def soak(args) -> dict:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app.services.firms_service import FIRMSService
+    from app.services.line_service import LINEService
+    from app.services.scheduler_service import SchedulerService
+
+    now = datetime.fromisoformat(args.now)
+    window_start = now.date() - timedelta(days=2)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{CACHE_DIR / 'soak.db'}")
+    await prepare_db(engine, 0, window_start)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    shared = Session() if args.shared_session else None
+
+    @asynccontextmanager
+    async def shared_session():
+        # The old lifespan-scoped session: never closed between checks
+        yield shared
+
+    if args.shared_session:
+        session_factory = shared_session
+    else:
+        session_factory = Session
+
+    scheduler = SchedulerService(session_factory, FIRMSService(), LINEService())
+    warmup = max(1, min(args.warmup, args.checks // 2))
+    samples = []
+    started = time.perf_counter()
+    for i in range(1, args.checks + 1):
+        if (i - 1) % args.insert_every == 0:
+            await cleanup_bench_rows(engine, window_start)
+        await scheduler.run_check()
+        if i % args.sample_every == 0 or i == warmup:
+            gc.collect()
+            samples.append({"check": i, "rss_mb": current_rss_mb()})
+            print(f"  check {i:>6}  rss={samples[-1]['rss_mb']}MB", file=sys.stderr, flush=True)
+    elapsed = time.perf_counter() - started
+    if args.shared_session:
+        await shared.close()
+    await engine.dispose()
+
+    base = next(s["rss_mb"] for s in samples if s["check"] == warmup)
+    final = samples[-1]["rss_mb"]
+    return {
+        "checks": args.checks,
+        "volume": args.volume,
+        "shared_session": args.shared_session,
+        "seconds": round(elapsed, 1),
+        "rss_after_warmup_mb": base,
+        "rss_final_mb": final,
+        "growth_mb": round(final - base, 1),
+        "growth_mb_per_1000_checks": round((final - base) / max(args.checks - warmup, 1) * 1000, 2),
+        "samples": samples
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=2000)
+    parser.add_argument("--volume", type=int, default=200, help="hotspot rows per check")
+    parser.add_argument("--insert-every", type=int, default=10, help="make every Nth check store its rows")
+    parser.add_argument("--sample-every", type=int, default=100)
+    # Bounded buffers (SSE replay history, pool connections, SQLite page caches) fill up first
+    parser.add_argument("--warmup", type=int, default=500, help="checks before the RSS baseline is taken")
+    parser.add_argument("--now", default=DEFAULT_NOW, help="frozen emulator clock (UTC)")
+    parser.add_argument("--shared-session", action="store_true", help="reuse one session for all checks")
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    parser.add_argument("--quick", action="store_true", help="short bounded run for CI (overrides the sizes above)")
+    args = parser.parse_args()
+    if args.quick:
+        args.checks, args.volume, args.insert_every = 300, 100, 10
+        args.sample_every, args.warmup, args.max_growth_mb = 25, 100, 10.0
+    return args
+
+
+def main():
+    args = parse_args()
+    firms_port, line_port = free_port(), free_port()
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{CACHE_DIR / 'soak.db'}",
+        "FIRMS_BASE_URL": f"http://127.0.0.1:{firms_port}/api/area/csv",
+        "LINE_API_BASE_URL": f"http://127.0.0.1:{line_port}",
+        "FIRMS_MAP_KEY": "bench",
+        "LINE_CHANNEL_ACCESS_TOKEN": "bench",
+        "LINE_GROUP_ID": "bench-group",
+    })
+    fires_per_day = calibrate_fires_per_day(args.volume, datetime.fromisoformat(args.now))
+    emulator = subprocess.Popen(
+        [
+            sys.executable, str(ROOT / "scripts" / "run_emulators.py"),
+            "--firms-port", str(firms_port), "--line-port", str(line_port),
+            "--seed", str(SEED), "--now", args.now,
+            "--fires-per-day", str(round(fires_per_day, 3)),
+            "--max-rows", str(math.ceil(args.volume / len(SOURCES)))
+        ],
+        cwd=str(ROOT), stdout=subprocess.DEVNULL
+    )
+    try:
+        import httpx
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{firms_port}/_emulator/stats", timeout=1.0)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        logging_quiet()
+        result = asyncio.run(soak(args))
+    finally:
+        emulator.terminate()
+        emulator.wait()
+
+    print(json.dumps({k: v for k, v in result.items() if k != "samples"}, indent=2))
+    if result["growth_mb"] > args.max_growth_mb:
+        sys.exit(f"RSS grew {result['growth_mb']}MB after warm-up (limit {args.max_growth_mb}MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Micro-benchmark: dashboard hotspot payload shaping + JSON serialization"""
+import sys
+import os
+import time
+import random
+from datetime import date, time as dtime, timedelta
+
+sys.path.append(os.getcwd())
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.models import Hotspot
+from app.routers.dashboard import shape_hotspot_rows
+
+N_HOTSPOTS = 10000
+ROUNDS = 20
+
+def make_rows(n: int):
+    today = date.today()
+    rows = []
+    for i in range(n):
+        rows.append((
+            i + 1,
+            13.4 + random.random() * 2.4,
+            98.0 + random.random() * 2.0,
+            today - timedelta(days=i % 2),
+            dtime(random.randint(0, 23), random.randint(0, 59)),
+            random.choice(["VIIRS_SNPP", "VIIRS_NOAA20", "VIIRS_NOAA21"]),
+            random.choice(["low", "nominal", "high"]),
+            random.random() * 50,
+            "กาญจนบุรี",
+        ))
+    return rows
+
+def old_path(objs):
+    """Previous implementation: ORM objects, per-row hasattr, generic encoder"""
+    hotspots = []
+    for h in objs:
+        if hasattr(h.acq_time, "strftime"):
+            time_display = h.acq_time.strftime("%H:%M")
+        else:
+            ts = str(h.acq_time or "")
+            time_display = f"{ts[:2]}:{ts[2:]}" if len(ts) == 4 and ":" not in ts else ts[:5]
+        hotspots.append({
+            "id": h.id,
+            "latitude": h.latitude,
+            "longitude": h.longitude,
+            "acq_date": str(h.acq_date),
+            "acq_time": time_display,
+            "satellite": h.satellite,
+            "confidence": h.confidence,
+            "frp": h.frp
+        })
+    return JSONResponse(jsonable_encoder({"today_count": 0, "hotspots": hotspots})).body
+
+def new_path(rows):
+    """Current implementation: column tuples shaped once, dumped by orjson"""
+    return ORJSONResponse({"today_count": 0, "hotspots": shape_hotspot_rows(rows)}).body
+
+def bench(label, fn, arg):
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        body = fn(arg)
+    per_req = (time.process_time() - start) / ROUNDS * 1000
+    print(f"{label:<10} {per_req:8.2f} ms CPU/request  ({len(body) / 1024:.0f} KiB)")
+    return per_req
+
+def main():
+    rows = make_rows(N_HOTSPOTS)
+    objs = [
+        Hotspot(id=r[0], latitude=r[1], longitude=r[2], acq_date=r[3], acq_time=r[4],
+                satellite=r[5], confidence=r[6], frp=r[7], province=r[8])
+        for r in rows
+    ]
+    print(f"{N_HOTSPOTS} hotspots x {ROUNDS} rounds")
+    old = bench("old", old_path, objs)
+    new = bench("orjson", new_path, rows)
+    print(f"speedup: {old / new:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,13 @@ print("=" * 60)
 print("HOTSPOTS DATABASE CHECK")
 print("=" * 60)
 
-# Total count
-cur.execute('SELECT COUNT(*) FROM hotspots')
+# Total count (from the daily rollup)
+cur.execute('SELECT COALESCE(SUM(hotspot_count), 0) FROM hotspot_daily_stats')
 print(f"\nTotal hotspots in DB: {cur.fetchone()[0]}")
 
 # Today's data
 today = date.today().isoformat()
-cur.execute('SELECT COUNT(*) FROM hotspots WHERE acq_date = ?', (today,))
+cur.execute('SELECT COALESCE(SUM(hotspot_count), 0) FROM hotspot_daily_stats WHERE acq_date = ?', (today,))
 print(f"Hotspots for today ({today}): {cur.fetchone()[0]}")
 
 # Recent check logs
@@ -32,7 +32,7 @@ for row in cur.fetchall():
 
 # Group by date
 print("\n--- Hotspots by Date ---")
-cur.execute('SELECT acq_date, COUNT(*) FROM hotspots GROUP BY acq_date ORDER BY acq_date DESC LIMIT 7')
+cur.execute('SELECT acq_date, SUM(hotspot_count) FROM hotspot_daily_stats GROUP BY acq_date ORDER BY acq_date DESC LIMIT 7')
 for row in cur.fetchall():
     print(f"  {row[0]}: {row[1]} จุด")
 
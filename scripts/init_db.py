@@ -5,7 +5,7 @@ import os
 # Add the project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import engine, Base
+from app.database import engine, sync_schema
 from app.models import Setting
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -15,7 +15,7 @@ async def init_db():
     print("Creating tables...")
     async with engine.begin() as conn:
         # await conn.run_sync(Base.metadata.drop_all) # Optional: drop existing
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(sync_schema)
     print("Tables created successfully.")
 
     print("Inserting default settings...")
@@ -5,15 +5,25 @@ import os
 sys.path.append(os.getcwd())
 
 from app.database import AsyncSessionLocal
+from app.services.cache_service import notify_running_app
+from app.config import get_settings
 from sqlalchemy import text
 
 async def reset_data():
     print("Clearing data...")
     async with AsyncSessionLocal() as session:
+        # Link rows first: sqlite reuses ids after a full delete, so leftovers would tie new alerts to new detections
+        await session.execute(text("DELETE FROM notification_hotspots"))
         await session.execute(text("DELETE FROM hotspots"))
+        await session.execute(text("DELETE FROM hotspot_daily_stats"))
+        await session.execute(text("DELETE FROM hotspot_hourly_stats"))
+        await session.execute(text("DELETE FROM hotspot_grid_stats"))
+        await session.execute(text("DELETE FROM fire_events"))
         await session.execute(text("DELETE FROM notifications"))
         await session.execute(text("DELETE FROM check_logs"))
         await session.commit()
+    # A running app would otherwise keep serving the deleted data from cache
+    await notify_running_app(get_settings().APP_URL)
     print("Data cleared. You can now Trigger Check to test notifications.")
 
 if __name__ == "__main__":
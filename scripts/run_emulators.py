@@ -0,0 +1,77 @@
+"""
+Run the local FIRMS and LINE stand-ins for offline / load testing.
+
+    python scripts/run_emulators.py --fires-per-day 120 --firms-latency-ms 800 --line-rate-limit 50
+
+then start the bot with
+    FIRMS_BASE_URL=http://127.0.0.1:9001/api/area/csv
+    LINE_API_BASE_URL=http://127.0.0.1:9002
+"""
+import argparse
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.getcwd())
+
+import uvicorn
+from app.emulators.firms import FIRMSEmulatorConfig, create_app as create_firms_app
+from app.emulators.line import LINEEmulatorConfig, create_app as create_line_app
+from app.config import get_settings
+
+def parse_args():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--firms-port", type=int, default=9001)
+    parser.add_argument("--line-port", type=int, default=9002)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fires-per-day", type=float, default=40.0)
+    parser.add_argument("--now", type=datetime.fromisoformat, default=None,
+                        help="freeze the FIRMS clock (UTC, e.g. 2026-03-15T08:00)")
+    parser.add_argument("--publish-delay-minutes", type=int, default=60)
+    parser.add_argument("--max-rows", type=int, default=None, help="cap rows per FIRMS response")
+    parser.add_argument("--firms-latency-ms", type=float, default=0.0)
+    parser.add_argument("--firms-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--firms-failure-rate", type=float, default=0.0)
+    parser.add_argument("--map-keys", default="", help="comma-separated accepted MAP_KEYs (default: any)")
+    parser.add_argument("--key-quota", type=int, default=None, help="FIRMS transactions per key per 10 minutes")
+    parser.add_argument("--line-rate-limit", type=float, default=2000.0, help="pushes/second per token")
+    parser.add_argument("--line-latency-ms", type=float, default=0.0)
+    parser.add_argument("--line-failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    args.bbox = (settings.AREA_WEST, settings.AREA_SOUTH, settings.AREA_EAST, settings.AREA_NORTH)
+    return args
+
+async def main():
+    args = parse_args()
+    firms_app = create_firms_app(FIRMSEmulatorConfig(
+        bbox=args.bbox,
+        fires_per_day=args.fires_per_day,
+        seed=args.seed,
+        latency_ms=args.firms_latency_ms,
+        jitter_ms=args.firms_jitter_ms,
+        failure_rate=args.firms_failure_rate,
+        publish_delay_minutes=args.publish_delay_minutes,
+        now=args.now,
+        max_rows=args.max_rows,
+        map_keys=tuple(k for k in args.map_keys.split(",") if k),
+        key_quota=args.key_quota
+    ))
+    line_app = create_line_app(LINEEmulatorConfig(
+        rate_limit_per_second=args.line_rate_limit,
+        latency_ms=args.line_latency_ms,
+        failure_rate=args.line_failure_rate,
+        seed=args.seed
+    ))
+    servers = [
+        uvicorn.Server(uvicorn.Config(firms_app, host=args.host, port=args.firms_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(line_app, host=args.host, port=args.line_port, log_level="warning")),
+    ]
+    print(f"FIRMS emulator: http://{args.host}:{args.firms_port}/api/area/csv")
+    print(f"LINE emulator:  http://{args.host}:{args.line_port}")
+    await asyncio.gather(*(s.serve() for s in servers))
+
+if __name__ == "__main__":
+    asyncio.run(main())